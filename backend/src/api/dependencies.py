@@ -1,16 +1,90 @@
-from functools import lru_cache
 from pathlib import Path
 
+from fastapi import Request
+
 from src.core.config import get_settings
+from src.services.admission import AdmissionController
+from src.services.circuit_breaker import CircuitBreakerPolicy
+from src.services.hedging import RequestHedger
+from src.services.parser_pool import ParserPool
+from src.services.retry_policy import RetryPolicy
+from src.services.storage_quota import StorageQuota
 from src.services.translation_service import TranslationService
 
 
-@lru_cache
-def get_translation_service() -> TranslationService:
+def build_translation_service() -> TranslationService:
     settings = get_settings()
+    hedger = None
+    if settings.hedge_requests:
+        hedger = RequestHedger(
+            percentile=settings.hedge_percentile,
+            budget_ratio=settings.hedge_budget_ratio,
+            min_samples=settings.hedge_min_samples,
+        )
+    ade_deadline = settings.ade_deadline_seconds or None
+    ade_breaker = CircuitBreakerPolicy(
+        failure_rate=settings.ade_breaker_failure_rate,
+        slow_call_seconds=settings.ade_breaker_slow_call_seconds,
+        window=settings.ade_breaker_window,
+        min_calls=settings.ade_breaker_min_calls,
+        open_seconds=settings.ade_breaker_open_seconds,
+    )
+    parser_pool = None
+    if settings.parser_workers > 0:
+        parser_pool = ParserPool(
+            workers=settings.parser_workers,
+            vision_agent_api_key=settings.vision_agent_api_key,
+            max_queue=settings.parser_max_queue,
+            max_documents_per_worker=settings.parser_max_documents_per_worker,
+            ade_deadline=ade_deadline,
+            ade_breaker=ade_breaker,
+        )
+    quota = None
+    if settings.storage_quota_enabled:
+        quota = StorageQuota(
+            max_bytes=settings.storage_max_bytes or None,
+            max_documents=settings.storage_max_documents or None,
+            max_age_seconds=settings.storage_max_age_days * 86400 or None,
+            orphan_grace_seconds=settings.storage_orphan_grace_seconds,
+        )
     return TranslationService(
         storage_dir=Path(settings.storage_dir),
         openai_api_key=settings.openai_api_key,
         openai_model=settings.openai_model,
         vision_agent_api_key=settings.vision_agent_api_key,
+        openai_fast_model=settings.openai_fast_model or None,
+        fast_model_max_tokens=settings.fast_model_max_tokens,
+        bulk_poll_interval=settings.bulk_poll_interval_seconds,
+        hedger=hedger,
+        stream=settings.stream_translations,
+        parser_pool=parser_pool,
+        admission=AdmissionController(
+            max_documents=settings.max_inflight_documents,
+            max_bytes=settings.max_inflight_bytes,
+            max_waiting=settings.admission_max_waiting,
+            wait_timeout=settings.admission_wait_timeout_seconds,
+            retry_after=settings.admission_retry_after_seconds,
+        ),
+        quota=quota,
+        cache_bytes=settings.translation_cache_bytes,
+        document_token_budget=settings.token_budget_per_document or None,
+        daily_token_budget=settings.token_budget_per_day or None,
+        usage_retention_days=settings.token_usage_retention_days or None,
+        ade_deadline=ade_deadline,
+        ade_breaker=ade_breaker,
+        checkpoint_max_age=settings.checkpoint_max_age_hours * 3600 or None,
+        retry=RetryPolicy(
+            retries=settings.translation_retries,
+            base_delay=settings.translation_retry_base_seconds,
+            max_delay=settings.translation_retry_max_seconds,
+        ),
     )
+
+
+def get_translation_service(request: Request) -> TranslationService:
+    service = getattr(request.app.state, "translation_service", None)
+    if service is None:
+        # The app is running without its lifespan (e.g. a bare TestClient).
+        service = build_translation_service()
+        request.app.state.translation_service = service
+    return service
@@ -3,12 +3,19 @@ from typing import Annotated
 from urllib.parse import quote
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, UploadFile
-from fastapi.responses import Response
+from fastapi import APIRouter, Depends, Query, Request, UploadFile
+from fastapi.responses import FileResponse, Response
 
 from src.api.dependencies import get_translation_service
 from src.core.exceptions import InputValidationError
-from src.models.translation import TranslationResult, TranslationSummary
+from src.models.translation import (
+    ExportLayout,
+    TokenUsageReport,
+    TranslationChanges,
+    TranslationResult,
+    TranslationSummary,
+)
+from src.services.precompressed import IDENTITY, choose_encoding
 from src.services.translation_service import TranslationService
 
 router = APIRouter(prefix="/translations", tags=["translations"])
@@ -45,21 +52,84 @@ async def upload_and_translate(
 async def retranslate(
     translation_id: UUID,
     service: TranslationServiceDep,
+    upgrade: bool = False,
+    failed_only: bool = False,
 ) -> TranslationResult:
-    return await service.retranslate(str(translation_id))
+    return await service.retranslate(
+        str(translation_id), upgrade=upgrade, failed_only=failed_only
+    )
 
 
-@router.get("")
-def list_translations(service: TranslationServiceDep) -> list[TranslationSummary]:
+@router.get("", response_model=list[TranslationSummary])
+def list_translations(
+    request: Request,
+    response: Response,
+    service: TranslationServiceDep,
+) -> Response | list[TranslationSummary]:
+    # The store revision changes with every save and delete, so a client
+    # polling with If-None-Match costs no directory scan while nothing moves.
+    # The epoch changes when the change journal is compacted.
+    epoch, revision = service.translations_revision()
+    etag = f'"rev-{epoch}-{revision}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
     return service.list_translations()
 
 
-@router.get("/{translation_id}")
+@router.get("/changes")
+def list_translation_changes(
+    service: TranslationServiceDep,
+    since: Annotated[int, Query(ge=0)] = 0,
+) -> TranslationChanges:
+    return service.translation_changes(since)
+
+
+@router.get("/usage")
+def get_token_usage(
+    service: TranslationServiceDep,
+    days: Annotated[int, Query(ge=1, le=366)] = 30,
+) -> TokenUsageReport:
+    return service.usage_report(days)
+
+
+@router.get("/{translation_id}", response_model=TranslationResult)
 def get_translation(
     translation_id: UUID,
+    request: Request,
     service: TranslationServiceDep,
-) -> TranslationResult:
-    return service.get_translation(str(translation_id))
+) -> Response | TranslationResult:
+    # Serve the JSON written at save time straight from disk; translations
+    # stored before responses were kept fall back to the model.
+    stored = service.get_translation_response(str(translation_id))
+    if stored is None:
+        return service.get_translation(str(translation_id))
+
+    etag = f'"{stored.etag}"'
+    headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    encoding = choose_encoding(
+        request.headers.get("accept-encoding", ""), set(stored.variants)
+    )
+    if encoding != IDENTITY:
+        headers["Content-Encoding"] = encoding
+    return FileResponse(
+        stored.variants[encoding], media_type="application/json", headers=headers
+    )
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
 
 
 @router.delete("/{translation_id}", status_code=204)
@@ -74,9 +144,10 @@ def delete_translation(
 def download_translation(
     translation_id: UUID,
     service: TranslationServiceDep,
+    layout: ExportLayout = ExportLayout.TABLE,
 ) -> Response:
     result = service.get_translation(str(translation_id))
-    docx_bytes, filename = service.export_translation(result)
+    docx_bytes, filename = service.export_translation(result, layout)
     return Response(
         content=docx_bytes,
         media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
@@ -0,0 +1,80 @@
+"""Offline maintenance commands: ``uv run python -m src.cli <command>``."""
+
+import argparse
+import asyncio
+from pathlib import Path
+
+from src.api.dependencies import build_translation_service
+from src.core.config import get_settings
+from src.services.translation_store import TranslationStore
+
+
+def _bulk_translate(args: argparse.Namespace) -> None:
+    files = [(path.read_bytes(), path.name) for path in args.paths]
+    service = build_translation_service()
+
+    async def _run():
+        try:
+            return await service.translate_documents_bulk(files)
+        finally:
+            await service.aclose()
+
+    results = asyncio.run(_run())
+    for result in results:
+        print(f"{result.id}\t{result.filename}\t{len(result.paragraphs)} paragraphs")
+
+
+def _migrate_store(_args: argparse.Namespace) -> None:
+    store = TranslationStore(Path(get_settings().storage_dir))
+    print(f"Migrated {store.migrate()} translations")
+
+
+def _compact_store(_args: argparse.Namespace) -> None:
+    service = build_translation_service()
+
+    async def _run():
+        try:
+            return await service.compact_storage()
+        finally:
+            await service.aclose()
+
+    report = asyncio.run(_run())
+    if report is None:
+        print("No storage quota configured")
+        return
+    print(
+        f"Removed {report.orphans_removed} orphans, dropped {report.uploads_dropped} "
+        f"uploads, evicted {report.translations_evicted} translations; "
+        f"{report.bytes_used} bytes in use"
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    bulk = commands.add_parser(
+        "bulk-translate",
+        help="Translate documents through the OpenAI Batch API (slow, half cost)",
+    )
+    bulk.add_argument("paths", nargs="+", type=Path)
+    bulk.set_defaults(handler=_bulk_translate)
+
+    migrate = commands.add_parser(
+        "migrate-store",
+        help="Rewrite legacy JSON translations in the compact storage format",
+    )
+    migrate.set_defaults(handler=_migrate_store)
+
+    compact = commands.add_parser(
+        "compact-store",
+        help="Enforce the configured storage quota once",
+    )
+    compact.set_defaults(handler=_compact_store)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,17 +10,87 @@ class Settings(BaseSettings):
 
     openai_api_key: str
     openai_model: str = "gpt-4o-mini"
+    # Cheaper model for headings, short groups, repairs and language
+    # detection; unset sends everything to openai_model.
+    openai_fast_model: str | None = None
+    # Size limit, in estimated tokens, of groups sent to openai_fast_model.
+    fast_model_max_tokens: int = 80
     vision_agent_api_key: str | None = None
 
     cors_origins: str = "http://localhost:2321"
     storage_dir: str = "data/translations"
 
+    # Memory for validated translations kept by each worker; 0 disables.
+    translation_cache_bytes: int = 64 * 1024 * 1024
+
+    # Storage quotas; 0 disables a limit. Age counts from last access.
+    storage_max_bytes: int = 0
+    storage_max_documents: int = 0
+    storage_max_age_days: float = 0
+    storage_orphan_grace_seconds: float = 3600.0
+    storage_compaction_interval_seconds: float = 600.0
+
+    bulk_poll_interval_seconds: float = 30.0
+
+    # After this many seconds of waiting on ADE the local PDF parser starts
+    # alongside it; 0 waits for ADE however long it takes.
+    ade_deadline_seconds: float = 30.0
+    # ADE is skipped for ade_breaker_open_seconds once this share of recent
+    # calls failed or took longer than ade_breaker_slow_call_seconds.
+    ade_breaker_failure_rate: float = 0.5
+    ade_breaker_slow_call_seconds: float = 90.0
+    ade_breaker_window: int = 20
+    ade_breaker_min_calls: int = 5
+    ade_breaker_open_seconds: float = 60.0
+
+    # 0 parses on the default thread pool; >0 uses that many worker processes.
+    parser_workers: int = 0
+    parser_max_queue: int = 16
+    parser_max_documents_per_worker: int = 50
+
+    stream_translations: bool = False
+
+    # OpenAI token budgets; 0 disables a limit. Days are counted in UTC.
+    token_budget_per_document: int = 0
+    token_budget_per_day: int = 0
+    # Daily usage files older than this are deleted; 0 keeps them all.
+    token_usage_retention_days: int = 400
+
+    # Checkpoints of interrupted translations are kept this long for a
+    # resubmission to resume from; 0 keeps them until then.
+    checkpoint_max_age_hours: float = 24.0
+
+    max_inflight_documents: int = 8
+    max_inflight_bytes: int = 64 * 1024 * 1024
+    admission_max_waiting: int = 32
+    admission_wait_timeout_seconds: float = 30.0
+    admission_retry_after_seconds: int = 10
+
+    # Retries of a failed translation call, with exponential backoff and
+    # jitter; groups still failing are stored flagged. 0 disables retries.
+    translation_retries: int = 3
+    translation_retry_base_seconds: float = 1.0
+    translation_retry_max_seconds: float = 30.0
+
+    hedge_requests: bool = False
+    hedge_percentile: float = 0.95
+    hedge_budget_ratio: float = 0.05
+    hedge_min_samples: int = 20
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
         case_sensitive=False,
     )
 
+    @property
+    def storage_quota_enabled(self) -> bool:
+        return bool(
+            self.storage_max_bytes
+            or self.storage_max_documents
+            or self.storage_max_age_days
+        )
+
     @property
     def cors_origins_list(self) -> list[str]:
         return [origin.strip() for origin in self.cors_origins.split(",") if origin.strip()]
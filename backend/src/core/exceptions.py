@@ -1,7 +1,13 @@
 class AppException(Exception):
-    def __init__(self, message: str, status_code: int = 400) -> None:
+    def __init__(
+        self,
+        message: str,
+        status_code: int = 400,
+        headers: dict[str, str] | None = None,
+    ) -> None:
         self.message = message
         self.status_code = status_code
+        self.headers = headers
         super().__init__(message)
 
 
@@ -16,3 +22,26 @@ class NotFoundError(AppException):
 class InputValidationError(AppException):
     def __init__(self, message: str) -> None:
         super().__init__(message=message, status_code=422)
+
+
+class ConflictError(AppException):
+    def __init__(self, message: str) -> None:
+        super().__init__(message=message, status_code=409)
+
+
+class ServiceUnavailableError(AppException):
+    def __init__(self, message: str, retry_after: int = 5) -> None:
+        super().__init__(
+            message=message,
+            status_code=503,
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class TokenBudgetExceededError(AppException):
+    def __init__(self, message: str, retry_after: int | None = None) -> None:
+        super().__init__(
+            message=message,
+            status_code=429,
+            headers={"Retry-After": str(retry_after)} if retry_after else None,
+        )
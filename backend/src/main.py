@@ -1,10 +1,63 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
+from src.api.dependencies import build_translation_service
 from src.api.v1.router import router as v1_router
 from src.core.config import get_settings
 from src.core.exceptions import AppException
+from src.services.translation_service import TranslationService
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(application: FastAPI) -> AsyncIterator[None]:
+    # Construction is cheap; heavy imports and clients warm up in the
+    # background so /health answers as soon as the process is up.
+    service = build_translation_service()
+    application.state.translation_service = service
+    warm_up = asyncio.create_task(asyncio.to_thread(service.warm_up))
+    warm_up.add_done_callback(_log_warm_up_failure)
+    compaction = asyncio.create_task(
+        _compact_periodically(
+            service, get_settings().storage_compaction_interval_seconds
+        )
+    )
+    try:
+        yield
+    finally:
+        warm_up.cancel()
+        compaction.cancel()
+        await service.aclose()
+
+
+async def _compact_periodically(service: TranslationService, interval: float) -> None:
+    while True:
+        try:
+            report = await service.compact_storage()
+        except Exception:
+            logger.exception("Storage compaction failed")
+        else:
+            if report is None:
+                return
+            if (
+                report.orphans_removed
+                or report.uploads_dropped
+                or report.translations_evicted
+            ):
+                logger.info("Storage compaction: %s", report)
+        await asyncio.sleep(interval)
+
+
+def _log_warm_up_failure(task: asyncio.Task[None]) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Service warm-up failed", exc_info=task.exception())
 
 
 def create_app() -> FastAPI:
@@ -14,6 +67,7 @@ def create_app() -> FastAPI:
         title=settings.app_name,
         version=settings.app_version,
         redirect_slashes=False,
+        lifespan=lifespan,
     )
 
     application.add_middleware(
@@ -31,6 +85,7 @@ def create_app() -> FastAPI:
         return JSONResponse(
             status_code=exc.status_code,
             content={"detail": exc.message},
+            headers=exc.headers,
         )
 
     @application.get("/health")
@@ -1,4 +1,4 @@
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from enum import Enum
 from uuid import UUID, uuid4
 
@@ -21,11 +21,45 @@ class TranslationDirection(str, Enum):
     ZH_TO_EN = "zh_to_en"
 
 
+class ExportLayout(str, Enum):
+    TABLE = "table"
+    INLINE = "inline"
+
+
+class TokenUsage(BaseModel):
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def __add__(self, other: "TokenUsage") -> "TokenUsage":
+        return TokenUsage(
+            prompt_tokens=self.prompt_tokens + other.prompt_tokens,
+            completion_tokens=self.completion_tokens + other.completion_tokens,
+            cached_tokens=self.cached_tokens + other.cached_tokens,
+        )
+
+    def __sub__(self, other: "TokenUsage") -> "TokenUsage":
+        return TokenUsage(
+            prompt_tokens=self.prompt_tokens - other.prompt_tokens,
+            completion_tokens=self.completion_tokens - other.completion_tokens,
+            cached_tokens=self.cached_tokens - other.cached_tokens,
+        )
+
+
 class TranslatedParagraph(BaseModel):
     original: str
     translated: str
     style: ParagraphStyle = ParagraphStyle.NORMAL
     image: str | None = None
+    # Model that produced ``translated``; None when nothing was sent.
+    model: str | None = None
+    # Set when the translation call kept failing; ``translated`` is then
+    # empty until a retranslation of the failed paragraphs succeeds.
+    failed: bool = False
 
 
 class TranslationResult(BaseModel):
@@ -34,6 +68,7 @@ class TranslationResult(BaseModel):
     direction: TranslationDirection = TranslationDirection.EN_TO_ZH
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     paragraphs: list[TranslatedParagraph]
+    usage: TokenUsage = Field(default_factory=TokenUsage)
 
 
 class TranslationSummary(BaseModel):
@@ -41,3 +76,29 @@ class TranslationSummary(BaseModel):
     filename: str
     created_at: datetime
     paragraph_count: int
+    usage: TokenUsage = Field(default_factory=TokenUsage)
+
+
+class DailyTokenUsage(BaseModel):
+    day: date
+    usage: TokenUsage
+
+
+class TokenUsageReport(BaseModel):
+    total: TokenUsage
+    days: list[DailyTokenUsage]
+    daily_budget: int | None = None
+
+
+class TranslationChanges(BaseModel):
+    """Summaries changed after a revision of the translation store.
+
+    With ``reset`` set, ``created`` holds every translation and the client
+    should replace what it has rather than merge.
+    """
+
+    revision: int
+    created: list[TranslationSummary] = Field(default_factory=list)
+    updated: list[TranslationSummary] = Field(default_factory=list)
+    deleted: list[UUID] = Field(default_factory=list)
+    reset: bool = False
@@ -0,0 +1,77 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from src.core.exceptions import ServiceUnavailableError
+
+
+class AdmissionController:
+    """Cap in-flight translations by document count and source bytes.
+
+    Requests that don't fit wait in a bounded queue for up to
+    ``wait_timeout`` seconds. When the queue is full, or the wait times out,
+    ``admit`` raises a 503 with ``Retry-After`` straight away so an overloaded
+    worker keeps answering instead of piling up work.
+    """
+
+    def __init__(
+        self,
+        max_documents: int,
+        max_bytes: int,
+        max_waiting: int,
+        wait_timeout: float = 30.0,
+        retry_after: int = 10,
+    ) -> None:
+        self._max_documents = max_documents
+        self._max_bytes = max_bytes
+        self._max_waiting = max_waiting
+        self._wait_timeout = wait_timeout
+        self._retry_after = retry_after
+        self._documents = 0
+        self._bytes = 0
+        self._waiting = 0
+        self._condition = asyncio.Condition()
+
+    @property
+    def in_flight(self) -> tuple[int, int]:
+        return self._documents, self._bytes
+
+    @asynccontextmanager
+    async def admit(self, cost_bytes: int) -> AsyncIterator[None]:
+        # A single document larger than the byte cap may still run on its own.
+        cost = min(cost_bytes, self._max_bytes)
+        async with self._condition:
+            if not self._fits(cost):
+                if self._waiting >= self._max_waiting:
+                    raise self._overloaded()
+                self._waiting += 1
+                try:
+                    await asyncio.wait_for(
+                        self._condition.wait_for(lambda: self._fits(cost)),
+                        self._wait_timeout,
+                    )
+                except TimeoutError:
+                    raise self._overloaded() from None
+                finally:
+                    self._waiting -= 1
+            self._documents += 1
+            self._bytes += cost
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._documents -= 1
+                self._bytes -= cost
+                self._condition.notify_all()
+
+    def _fits(self, cost: int) -> bool:
+        return (
+            self._documents < self._max_documents
+            and self._bytes + cost <= self._max_bytes
+        )
+
+    def _overloaded(self) -> ServiceUnavailableError:
+        return ServiceUnavailableError(
+            "Too many translations in progress, try again shortly",
+            retry_after=self._retry_after,
+        )
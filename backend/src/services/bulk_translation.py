@@ -0,0 +1,238 @@
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Protocol
+
+from src.core.exceptions import AppException
+from src.models.translation import TokenUsage
+from src.services.retry_policy import is_transient
+from src.services.token_usage import parse_usage
+from src.services.translation_strategy import BatchTranslationStrategy
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+_BATCH_ENDPOINT = "/v1/chat/completions"
+_COMPLETION_WINDOW = "24h"
+_TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+# Expired jobs still return the requests that finished inside the window;
+# anything missing goes into a follow-up job.
+_USABLE_STATUSES = frozenset({"completed", "expired"})
+
+
+@dataclass(frozen=True)
+class BatchJob:
+    id: str
+    status: str
+    output_file_id: str | None = None
+
+
+class BatchBackend(Protocol):
+    async def submit(self, requests_jsonl: bytes) -> str: ...
+
+    async def retrieve(self, job_id: str) -> BatchJob: ...
+
+    async def download(self, file_id: str) -> bytes: ...
+
+
+class OpenAIBatchBackend:
+    """Batch API endpoints: half price and a separate rate-limit pool."""
+
+    def __init__(self, client: "AsyncOpenAI") -> None:
+        self._client = client
+
+    async def submit(self, requests_jsonl: bytes) -> str:
+        input_file = await self._client.files.create(
+            file=("bulk_translation.jsonl", requests_jsonl),
+            purpose="batch",
+        )
+        batch = await self._client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=_BATCH_ENDPOINT,
+            completion_window=_COMPLETION_WINDOW,
+        )
+        return batch.id
+
+    async def retrieve(self, job_id: str) -> BatchJob:
+        batch = await self._client.batches.retrieve(job_id)
+        return BatchJob(
+            id=batch.id,
+            status=batch.status,
+            output_file_id=batch.output_file_id,
+        )
+
+    async def download(self, file_id: str) -> bytes:
+        response = await self._client.files.content(file_id)
+        return response.content
+
+
+class BulkTranslationJob:
+    """Collect numbered batches from many documents into one Batch API job.
+
+    Each ``add()`` call splits its paragraphs exactly as
+    ``BatchTranslationStrategy.translate()`` would and returns a handle.
+    After ``run()`` the translations for a handle are available through
+    ``result()``, with missing items already repaired.
+
+    Items a job leaves out (failed requests, requests an expired job never
+    reached, numbers missing from a response) are sent again in up to
+    ``resubmits`` follow-up jobs, at batch prices. Only what is still
+    missing after that is repaired with interactive calls. A repair that
+    fails, e.g. on a token budget or an error that outlasted the retries,
+    leaves its items as None instead of failing the whole job.
+    """
+
+    def __init__(
+        self, backend: BatchBackend, poll_interval: float = 30.0, resubmits: int = 1
+    ) -> None:
+        self._backend = backend
+        self._poll_interval = poll_interval
+        self._resubmits = resubmits
+        self._entries: list[tuple[BatchTranslationStrategy, list[list[str]]]] = []
+        self._results: dict[int, list[str | None]] = {}
+
+    def add(self, strategy: BatchTranslationStrategy, paragraphs: list[str]) -> int:
+        self._entries.append((strategy, strategy.split(paragraphs)))
+        return len(self._entries) - 1
+
+    def result(self, handle: int) -> list[str | None]:
+        return self._results[handle]
+
+    async def run(self) -> None:
+        translated: dict[tuple[int, int], list[str | None]] = {
+            (handle, index): [""] * len(batch)
+            for handle, (_, batches) in enumerate(self._entries)
+            for index, batch in enumerate(batches)
+        }
+        # Item positions still to translate, per (handle, batch index).
+        pending = {key: list(range(len(items))) for key, items in translated.items()}
+
+        for attempt in range(self._resubmits + 1):
+            if not pending:
+                break
+            try:
+                contents = await self._submit(pending)
+            except AppException:
+                if attempt == 0:
+                    raise
+                logger.warning(
+                    "Follow-up bulk job failed, repairing %d batches", len(pending)
+                )
+                break
+            for (handle, index), positions in list(pending.items()):
+                strategy, batches = self._entries[handle]
+                content, usage = contents.get(_custom_id(handle, index), ("", None))
+                # The job has already run, so its requests are recorded rather
+                # than checked against the budgets.
+                strategy.record_usage(usage)
+                items = [batches[index][position] for position in positions]
+                for position, text in zip(
+                    positions, strategy.parse_response(items, content)
+                ):
+                    translated[handle, index][position] = text
+                missing = [p for p in positions if not translated[handle, index][p]]
+                if missing:
+                    pending[handle, index] = missing
+                else:
+                    del pending[handle, index]
+
+        async def _repair(key: tuple[int, int], positions: list[int]) -> None:
+            # Interactive calls, metered as usual.
+            strategy, batches = self._entries[key[0]]
+            items = [batches[key[1]][position] for position in positions]
+            try:
+                repaired = await strategy.complete_batch(items, "")
+            except Exception as exc:
+                if not isinstance(exc, AppException) and not is_transient(exc):
+                    raise
+                logger.warning(
+                    "Flagging %d bulk items as failed after %s", len(items), exc
+                )
+                for position in positions:
+                    translated[key][position] = None
+                return
+            for position, text in zip(positions, repaired):
+                translated[key][position] = text
+
+        await asyncio.gather(
+            *[_repair(key, positions) for key, positions in pending.items()]
+        )
+        self._results = {
+            handle: [
+                item
+                for index in range(len(batches))
+                for item in translated[handle, index]
+            ]
+            for handle, (_, batches) in enumerate(self._entries)
+        }
+
+    async def _submit(
+        self, pending: dict[tuple[int, int], list[int]]
+    ) -> dict[str, tuple[str, TokenUsage | None]]:
+        job_id = await self._backend.submit(self._build_requests(pending))
+        logger.info(
+            "Submitted bulk translation job %s (%d requests)", job_id, len(pending)
+        )
+        job = await self._wait(job_id)
+        if not job.output_file_id:
+            return {}
+        return _parse_output(await self._backend.download(job.output_file_id))
+
+    def _build_requests(self, pending: dict[tuple[int, int], list[int]]) -> bytes:
+        lines: list[str] = []
+        for (handle, index), positions in pending.items():
+            strategy, batches = self._entries[handle]
+            batch = [batches[index][position] for position in positions]
+            lines.append(
+                json.dumps(
+                    {
+                        "custom_id": _custom_id(handle, index),
+                        "method": "POST",
+                        "url": _BATCH_ENDPOINT,
+                        "body": strategy.build_request(batch),
+                    },
+                    ensure_ascii=False,
+                )
+            )
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+    async def _wait(self, job_id: str) -> BatchJob:
+        while True:
+            job = await self._backend.retrieve(job_id)
+            if job.status in _TERMINAL_STATUSES:
+                break
+            await asyncio.sleep(self._poll_interval)
+        if job.status not in _USABLE_STATUSES:
+            raise AppException(
+                f"Bulk translation job '{job_id}' {job.status}", status_code=502
+            )
+        return job
+
+
+def _custom_id(handle: int, batch_index: int) -> str:
+    return f"{handle}-{batch_index}"
+
+
+def _parse_output(output: bytes) -> dict[str, tuple[str, TokenUsage | None]]:
+    """Map each custom id to its response content and token usage."""
+    contents: dict[str, tuple[str, TokenUsage | None]] = {}
+    for line in output.decode("utf-8").splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        response = record.get("response") or {}
+        if response.get("status_code") != 200:
+            logger.warning(
+                "Bulk request %s failed: %s", record.get("custom_id"), record.get("error")
+            )
+            continue
+        body = response["body"]
+        choices = body.get("choices") or [{}]
+        contents[record["custom_id"]] = (
+            choices[0].get("message", {}).get("content") or "",
+            parse_usage(body.get("usage")),
+        )
+    return contents
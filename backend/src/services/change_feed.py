@@ -0,0 +1,155 @@
+"""Append-only journal of translation changes, numbered by store revision.
+
+Every save or delete appends one JSON line to ``changes.jsonl``; the line's
+position in the file, counted from the journal's base revision, is its
+revision, so revisions only ever grow and all workers agree on them.
+Appends happen under a shared ``flock`` and each worker folds in only the
+lines appended since its last look, keeping just the latest change per
+translation in memory.
+
+Once ``max_entries`` changes have piled up the journal is replaced by an
+empty one whose header carries the current revision as its base and a new
+epoch. Clients asking for changes from before the base are told to reset,
+and the epoch goes into the list's ETag so cached lists are refetched.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+
+
+class ChangeKind(str, Enum):
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+
+
+@dataclass(frozen=True)
+class _Latest:
+    revision: int
+    kind: ChangeKind
+    # Revision of the most recent creation, to tell new entries from edits.
+    created: int
+
+
+class ChangeFeed:
+    def __init__(
+        self,
+        path: Path,
+        lock: Callable[[], AbstractContextManager[object]],
+        max_entries: int = 10_000,
+    ) -> None:
+        self._path = Path(path)
+        self._file_lock = lock
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._inode: int | None = None
+        self._offset = 0
+        self._epoch = 0
+        self._base = 0
+        self._revision = 0
+        self._latest: dict[str, _Latest] = {}
+
+    @property
+    def revision(self) -> int:
+        with self._lock:
+            self._refresh()
+            return self._revision
+
+    @property
+    def epoch(self) -> int:
+        """Number of times the journal has been compacted."""
+        with self._lock:
+            self._refresh()
+            return self._epoch
+
+    def record(self, translation_id: str, kind: ChangeKind) -> int:
+        """Append a change and return the revision it was given."""
+        line = json.dumps({"id": translation_id, "kind": kind.value})
+        with self._file_lock(), self._lock:
+            fd = os.open(self._path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, f"{line}\n".encode())
+            finally:
+                os.close(fd)
+            self._refresh()
+            revision = self._revision
+            if revision - self._base >= self._max_entries:
+                self._compact()
+            return revision
+
+    def since(self, revision: int) -> tuple[int, dict[str, ChangeKind] | None]:
+        """The current revision and how each translation changed after ``revision``.
+
+        A translation both created and edited since then counts as created.
+        The changes are None when ``revision`` predates the journal's base,
+        i.e. they were compacted away.
+        """
+        with self._lock:
+            self._refresh()
+            if revision < self._base:
+                return self._revision, None
+            changes = {
+                translation_id: (
+                    ChangeKind.CREATED
+                    if latest.kind is not ChangeKind.DELETED
+                    and latest.created > revision
+                    else latest.kind
+                )
+                for translation_id, latest in self._latest.items()
+                if latest.revision > revision
+            }
+            return self._revision, changes
+
+    def _compact(self) -> None:
+        # Called holding both locks, so no change can be appended meanwhile.
+        header = json.dumps({"epoch": self._epoch + 1, "base": self._revision})
+        fd, tmp_name = tempfile.mkstemp(
+            dir=self._path.parent, prefix=f".{self._path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(f"{header}\n".encode())
+            os.replace(tmp_name, self._path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self._refresh()
+
+    def _refresh(self) -> None:
+        try:
+            with self._path.open("rb") as f:
+                inode = os.fstat(f.fileno()).st_ino
+                if inode != self._inode:
+                    # Compacted (or first read): fold in the new file from
+                    # its start.
+                    self._inode = inode
+                    self._offset = self._epoch = self._base = self._revision = 0
+                    self._latest = {}
+                f.seek(self._offset)
+                appended = f.read()
+        except FileNotFoundError:
+            return
+        # Appends are whole lines under the file lock, but a reader outside
+        # it can still catch one half written.
+        complete = appended[: appended.rfind(b"\n") + 1]
+        for line in complete.splitlines():
+            entry = json.loads(line)
+            if "epoch" in entry:
+                self._epoch = entry["epoch"]
+                self._base = self._revision = entry["base"]
+                continue
+            self._revision += 1
+            kind = ChangeKind(entry["kind"])
+            previous = self._latest.get(entry["id"])
+            created = previous.created if previous is not None else 0
+            if kind is ChangeKind.CREATED:
+                created = self._revision
+            self._latest[entry["id"]] = _Latest(self._revision, kind, created)
+        self._offset += len(complete)
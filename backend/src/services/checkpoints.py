@@ -0,0 +1,231 @@
+"""Checkpoints that let an interrupted translation resume where it stopped.
+
+Each run of a document keeps a JSON Lines journal of its own, in a
+directory named after the SHA-256 of the upload. Every group appends one
+line as soon as it comes back: the detected direction, a digest of the
+group's source texts, the translations with the model behind each, and the
+run's token usage so far. Lines are single ``O_APPEND`` writes, so a worker
+killed mid-document leaves at most one torn line behind; it is skipped on
+load.
+
+A run holds an ``flock`` on its journal until it ends. When the same upload
+is translated again, every journal in the directory is merged: its
+direction is reused and groups whose source digest matches are filled from
+it instead of the API. Matching on content rather than position keeps a
+checkpoint usable when a parse comes out differently, e.g. local PDF
+parsing after ADE. Journals nobody holds belong to runs that died; the new
+run locks them, takes over their token usage and removes them with its own
+once the translation is saved. Journals of runs still going are only read,
+so concurrent uploads of one file share groups without counting their
+usage twice or deleting each other's journals. Journals nobody came back
+for are pruned after ``max_age`` seconds.
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import suppress
+from pathlib import Path
+from uuid import uuid4
+
+from src.models.translation import TokenUsage, TranslationDirection
+
+logger = logging.getLogger(__name__)
+
+
+def _digest(texts: list[str]) -> str:
+    return hashlib.sha256("\x00".join(texts).encode("utf-8")).hexdigest()[:32]
+
+
+def _lock(path: Path, flags: int) -> int | None:
+    """An fd holding ``path``'s lock, or None if another run holds it."""
+    try:
+        fd = os.open(path, flags, 0o644)
+    except FileNotFoundError:
+        return None
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        # A run that saved removes its journals while holding their locks.
+        if os.stat(path).st_ino == os.fstat(fd).st_ino:
+            return fd
+    except (BlockingIOError, FileNotFoundError):
+        pass
+    except BaseException:
+        os.close(fd)
+        raise
+    os.close(fd)
+    return None
+
+
+class DocumentCheckpoint:
+    """Completed groups of one document, loaded from and appended to its journals."""
+
+    def __init__(self, directory: Path) -> None:
+        self._directory = directory
+        self.direction: TranslationDirection | None = None
+        # Tokens spent on the document by earlier, interrupted runs.
+        self.usage = TokenUsage()
+        self._groups: dict[str, tuple[list[str], list[str | None]]] = {}
+        # Named by start time, so journals merge oldest first and the first
+        # direction detected wins.
+        self._path = self._directory / f"{time.time_ns():020d}-{uuid4().hex[:8]}.jsonl"
+        fd = None
+        while fd is None:
+            # Pruning removes the directory once it is empty, possibly
+            # between creating it and the journal.
+            self._directory.mkdir(parents=True, exist_ok=True)
+            fd = _lock(self._path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+        self._fd = fd
+        # Journals of dead runs this one took over, with the fds locking them.
+        self._adopted: dict[Path, int] = {}
+        # Serialises appends from worker threads with close().
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    def lookup(self, texts: list[str]) -> tuple[list[str], list[str | None]] | None:
+        """Translations and models recorded for a group with these texts."""
+        return self._groups.get(_digest(texts))
+
+    def record(
+        self,
+        direction: TranslationDirection,
+        texts: list[str],
+        translated: list[str],
+        models: list[str | None],
+        usage: TokenUsage,
+    ) -> None:
+        """Append a finished group; ``usage`` is the document's total so far.
+
+        Blocking file I/O, so async callers run it in a thread.
+        """
+        digest = _digest(texts)
+        line = json.dumps(
+            {
+                "direction": direction.value,
+                "sources": digest,
+                "translated": translated,
+                "models": models,
+                # Only this run's share, so merged journals add up.
+                "usage": (usage - self.usage).model_dump(),
+            },
+            ensure_ascii=False,
+        )
+        with self._lock:
+            if self._fd < 0:
+                return
+            os.write(self._fd, f"{line}\n".encode())
+            self.direction = self.direction or direction
+            self._groups[digest] = (translated, models)
+
+    def discard(self) -> None:
+        """Remove this run's journal and those it took over, then close."""
+        self._path.unlink(missing_ok=True)
+        for path in self._adopted:
+            path.unlink(missing_ok=True)
+        self.close()
+        # Fails while another run still has a journal there.
+        with suppress(OSError):
+            self._directory.rmdir()
+
+    def close(self) -> None:
+        """Release the journals, leaving them for a later run to resume from."""
+        with self._lock:
+            if self._fd >= 0:
+                os.close(self._fd)
+                self._fd = -1
+            for fd in self._adopted.values():
+                os.close(fd)
+            self._adopted = {}
+
+    def _load(self) -> None:
+        for path in sorted(self._directory.glob("*.jsonl")):
+            if path == self._path:
+                continue
+            fd = _lock(path, os.O_RDONLY)
+            try:
+                blob = path.read_bytes()
+            except FileNotFoundError:
+                if fd is not None:
+                    os.close(fd)
+                continue
+            usage = self._load_journal(blob)
+            if fd is not None:
+                self._adopted[path] = fd
+                self.usage += usage
+        if self._groups:
+            logger.info(
+                "Resuming %s with %d translated groups",
+                self._directory.name,
+                len(self),
+            )
+
+    def _load_journal(self, blob: bytes) -> TokenUsage:
+        # Groups are appended from worker threads, so lines can land out of
+        # order; the largest usage is the run's latest.
+        spent = TokenUsage()
+        for line in blob.splitlines():
+            try:
+                entry = json.loads(line)
+                direction = TranslationDirection(entry["direction"])
+                translated: list[str] = entry["translated"]
+                models: list[str | None] = entry["models"]
+                usage = TokenUsage.model_validate(entry["usage"])
+                digest: str = entry["sources"]
+            except (ValueError, KeyError, TypeError):
+                # The last line of a run that was killed while writing it.
+                continue
+            if len(translated) != len(models):
+                continue
+            if self.direction is None:
+                self.direction = direction
+            elif direction is not self.direction:
+                # A concurrent run that detected the other direction.
+                continue
+            self._groups[digest] = (translated, models)
+            if usage.total_tokens > spent.total_tokens:
+                spent = usage
+        return spent
+
+
+class CheckpointJournal:
+    def __init__(self, directory: Path, max_age: float | None = None) -> None:
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._max_age = max_age
+
+    def open(self, document_hash: str) -> DocumentCheckpoint:
+        """A new run's checkpoint of the upload with this SHA-256.
+
+        It starts with whatever earlier runs recorded. ``discard()`` it once
+        the translation is saved and ``close()`` it otherwise.
+        """
+        self._prune()
+        return DocumentCheckpoint(self._directory / document_hash)
+
+    def _prune(self) -> None:
+        # Only interrupted or in-progress documents have journals, so the
+        # directory stays small.
+        if self._max_age is None:
+            return
+        cutoff = time.time() - self._max_age
+        for path in self._directory.glob("*/*.jsonl"):
+            try:
+                if path.stat().st_mtime >= cutoff:
+                    continue
+            except FileNotFoundError:
+                continue
+            fd = _lock(path, os.O_RDONLY)
+            if fd is not None:
+                path.unlink(missing_ok=True)
+                os.close(fd)
+        for directory in self._directory.iterdir():
+            # Fails while a run still has a journal there.
+            with suppress(OSError):
+                directory.rmdir()
@@ -14,6 +14,39 @@ _STANDALONE_STYLES = frozenset(
 )
 
 
+class ParagraphGrouper:
+    """Incremental form of ``group_paragraphs`` for paragraphs that arrive
+    one at a time: ``add()`` returns the groups each paragraph completes and
+    ``finish()`` returns the last one.
+    """
+
+    def __init__(self, max_words: int = 384) -> None:
+        self._max_words = max_words
+        self._current: list[ParsedParagraph] = []
+        self._current_words = 0
+
+    def add(self, para: ParsedParagraph) -> list[list[ParsedParagraph]]:
+        if para.style in _STANDALONE_STYLES:
+            return [*self.finish(), [para]]
+
+        completed: list[list[ParsedParagraph]] = []
+        word_count = len(para.text.split())
+        if self._current and self._current_words + word_count > self._max_words:
+            completed = self.finish()
+
+        self._current.append(para)
+        self._current_words += word_count
+        return completed
+
+    def finish(self) -> list[list[ParsedParagraph]]:
+        if not self._current:
+            return []
+        group = self._current
+        self._current = []
+        self._current_words = 0
+        return [group]
+
+
 def group_paragraphs(
     paragraphs: list[ParsedParagraph], max_words: int = 384
 ) -> list[list[ParsedParagraph]]:
@@ -24,32 +57,9 @@ def group_paragraphs(
     Each group becomes one ``strategy.translate()`` call where every paragraph
     gets its own ``<<<N>>>`` number.
     """
-    if not paragraphs:
-        return []
-
+    grouper = ParagraphGrouper(max_words)
     groups: list[list[ParsedParagraph]] = []
-    current: list[ParsedParagraph] = []
-    current_words = 0
-
-    def _flush() -> None:
-        nonlocal current_words
-        if current:
-            groups.append(list(current))
-            current.clear()
-            current_words = 0
-
     for para in paragraphs:
-        if para.style in _STANDALONE_STYLES:
-            _flush()
-            groups.append([para])
-            continue
-
-        word_count = len(para.text.split())
-        if current and current_words + word_count > max_words:
-            _flush()
-
-        current.append(para)
-        current_words += word_count
-
-    _flush()
+        groups.extend(grouper.add(para))
+    groups.extend(grouper.finish())
     return groups
@@ -0,0 +1,106 @@
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from enum import Enum
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CircuitBreakerPolicy:
+    # Share of the last ``window`` calls that must fail to open the breaker.
+    failure_rate: float = 0.5
+    # Calls slower than this count as failures.
+    slow_call_seconds: float = 90.0
+    window: int = 20
+    min_calls: int = 5
+    open_seconds: float = 60.0
+
+
+class BreakerState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stop calling a dependency that keeps failing or answering too slowly.
+
+    The outcomes of recent calls are kept; a call counts as failed when it
+    raised or took longer than the policy's ``slow_call_seconds``. Once
+    ``min_calls`` outcomes are known and the failed share reaches
+    ``failure_rate`` the breaker opens and ``allow()`` refuses calls for
+    ``open_seconds``. Then a single probe is let through: its success
+    closes the breaker, its failure opens it again. Safe to share between
+    threads.
+    """
+
+    def __init__(
+        self,
+        policy: CircuitBreakerPolicy,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._policy = policy
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes: deque[bool] = deque(maxlen=policy.window)
+        self._state = BreakerState.CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> BreakerState:
+        return self._state
+
+    def allow(self) -> bool:
+        """True if a call may go ahead; its outcome must then be recorded."""
+        with self._lock:
+            if self._state is BreakerState.CLOSED:
+                return True
+            if self._state is BreakerState.OPEN:
+                if self._clock() - self._opened_at < self._policy.open_seconds:
+                    return False
+                self._state = BreakerState.HALF_OPEN
+                self._probing = False
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self, latency: float) -> None:
+        self._record(failed=latency > self._policy.slow_call_seconds)
+
+    def record_failure(self) -> None:
+        self._record(failed=True)
+
+    def _record(self, failed: bool) -> None:
+        with self._lock:
+            if self._state is BreakerState.HALF_OPEN:
+                self._probing = False
+                if failed:
+                    self._open()
+                else:
+                    logger.info("Circuit breaker closed after a successful probe")
+                    self._state = BreakerState.CLOSED
+                    self._outcomes.clear()
+                return
+            if self._state is BreakerState.OPEN:
+                # A call that started before the breaker opened.
+                return
+            self._outcomes.append(failed)
+            if (
+                len(self._outcomes) >= self._policy.min_calls
+                and sum(self._outcomes) / len(self._outcomes) >= self._policy.failure_rate
+            ):
+                self._open()
+
+    def _open(self) -> None:
+        logger.warning(
+            "Circuit breaker opened for %.0fs", self._policy.open_seconds
+        )
+        self._state = BreakerState.OPEN
+        self._opened_at = self._clock()
+        self._outcomes.clear()
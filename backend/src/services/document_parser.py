@@ -1,28 +1,51 @@
 import base64
+import importlib
 import logging
 import re
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from dataclasses import dataclass, field
 from html import escape as html_escape
 from html.parser import HTMLParser
-from io import BytesIO
-
-import pymupdf
-import pymupdf4llm
-from docx import Document
-from landingai_ade import LandingAIADE
+from types import ModuleType
+from typing import TYPE_CHECKING
 
 from src.core.exceptions import InputValidationError
 from src.models.translation import ParagraphStyle
+from src.services.circuit_breaker import CircuitBreaker, CircuitBreakerPolicy
+
+if TYPE_CHECKING:
+    import pymupdf
+    from landingai_ade import LandingAIADE
 
 logger = logging.getLogger(__name__)
 
-_DOCX_STYLE_MAP: dict[str, ParagraphStyle] = {
-    "Title": ParagraphStyle.TITLE,
-    "Heading 1": ParagraphStyle.HEADING_1,
-    "Heading 2": ParagraphStyle.HEADING_2,
-    "Heading 3": ParagraphStyle.HEADING_3,
-    "Heading 4": ParagraphStyle.HEADING_4,
-}
+# Parsing backends are imported on first use: together they take well over a
+# second to import, which would otherwise be paid by every worker at boot.
+_LAZY_BACKENDS = frozenset({"pymupdf", "pymupdf4llm", "landingai_ade"})
+
+
+def __getattr__(name: str) -> ModuleType:
+    if name in _LAZY_BACKENDS:
+        module = importlib.import_module(name)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _backend(name: str) -> ModuleType:
+    # Looked up through globals() so tests can patch the module attribute.
+    return globals().get(name) or __getattr__(name)
+
+
+def preload_backends() -> None:
+    for name in _LAZY_BACKENDS:
+        _backend(name)
+    # The DOCX reader; importing it loads lxml.etree.
+    importlib.import_module("src.services.docx_stream")
 
 _MD_STYLE_MAP: dict[int, ParagraphStyle] = {
     1: ParagraphStyle.TITLE,
@@ -32,19 +55,13 @@ _MD_STYLE_MAP: dict[int, ParagraphStyle] = {
     5: ParagraphStyle.HEADING_4,
 }
 
-_HEADING_PATTERN = re.compile(r"^(#{1,5})\s+(.+)$")
 _IMAGE_PATTERN = re.compile(r"^!\[.*?\]\(.*?\)$")
-_HORIZONTAL_RULE = re.compile(r"^-{3,}$")
-_CODE_FENCE = re.compile(r"^`{3,}")
-_TABLE_ROW = re.compile(r"^\|.+\|$")
-_LIST_ITEM = re.compile(r"^(?:[-*+]|\d+\.)\s+(.+)$")
 _INLINE_MARKERS = re.compile(r"\*{1,3}(.+?)\*{1,3}")
 _HTML_ANCHOR = re.compile(r"^<a\s+id=['\"].*?['\"]>\s*</a>$")
 _HTML_ANCHOR_PREFIX = re.compile(r"^<a\s+id=['\"].*?['\"]>\s*</a>\s*")
 _HTML_COMMENT = re.compile(r"^<!--.*?-->$")
 _HTML_TAGS = re.compile(r"</?(?:sup|sub|em|strong|span|a|i|b)[^>]*>")
 
-_ADE_DELIMITER = re.compile(r"<::.*?::>")
 _HTML_TABLE_OPEN = re.compile(r"<table[\s>]", re.IGNORECASE)
 _HTML_TABLE_CLOSE = re.compile(r"</table>", re.IGNORECASE)
 
@@ -99,8 +116,11 @@ def _sanitize_table_html(html: str) -> str:
 
 
 def _strip_inline_markers(text: str) -> str:
-    text = _HTML_TAGS.sub("", text)
-    return _INLINE_MARKERS.sub(r"\1", text).strip()
+    if "<" in text:
+        text = _HTML_TAGS.sub("", text)
+    if "*" in text:
+        text = _INLINE_MARKERS.sub(r"\1", text)
+    return text.strip()
 
 
 _FIGURE_DPI = 150
@@ -114,78 +134,203 @@ class ParsedParagraph:
 
 
 class DocumentParser:
-    def __init__(self, vision_agent_api_key: str | None = None) -> None:
-        self._ade_client: LandingAIADE | None = None
-        if vision_agent_api_key:
-            self._ade_client = LandingAIADE(
-                apikey=vision_agent_api_key,
-                environment="production",
-            )
+    """Parse uploads into paragraphs.
+
+    PDFs go to LandingAI ADE when a key is configured, with pymupdf4llm as
+    the local fallback. ``ade_breaker`` stops sending PDFs to ADE while it
+    keeps failing or answering slowly. Once an ADE request has run for
+    ``ade_deadline`` seconds the local parse starts alongside it and the
+    first usable result wins.
+    """
+
+    def __init__(
+        self,
+        vision_agent_api_key: str | None = None,
+        ade_deadline: float | None = None,
+        ade_breaker: CircuitBreakerPolicy | None = None,
+    ) -> None:
+        self._vision_agent_api_key = vision_agent_api_key
+        self._ade: LandingAIADE | None = None
+        # The service's warm-up builds the client in a thread while parses
+        # in other threads may need it.
+        self._ade_lock = threading.Lock()
+        self._ade_deadline = ade_deadline
+        self._ade_breaker = CircuitBreaker(ade_breaker) if ade_breaker else None
+        # Created up front: parses run in several threads at once. No thread
+        # is started until ADE is first given a deadline to race.
+        self._ade_executor = (
+            ThreadPoolExecutor(thread_name_prefix="ade")
+            if ade_deadline is not None
+            else None
+        )
+
+    @property
+    def _ade_client(self) -> "LandingAIADE | None":
+        with self._ade_lock:
+            if self._ade is None and self._vision_agent_api_key:
+                self._ade = _backend("landingai_ade").LandingAIADE(
+                    apikey=self._vision_agent_api_key,
+                    environment="production",
+                )
+            return self._ade
+
+    def warm_up(self) -> None:
+        """Build the ADE client ahead of the first PDF."""
+        self._ade_client  # noqa: B018
+
+    def close(self) -> None:
+        if self._ade_executor is not None:
+            self._ade_executor.shutdown(wait=False, cancel_futures=True)
+            self._ade_executor = None
+        with self._ade_lock:
+            ade, self._ade = self._ade, None
+        if ade is not None:
+            ade.close()
 
     def parse(self, file_content: bytes, filename: str) -> list[ParsedParagraph]:
+        return list(self.iter_parse(file_content, filename))
+
+    def iter_parse(
+        self, file_content: bytes, filename: str
+    ) -> Iterator[ParsedParagraph]:
+        """Yield paragraphs as they are parsed, page by page for local PDFs.
+
+        ADE returns a whole document per request, so ADE output and the
+        fallback decision still arrive in one piece.
+        """
         ext = filename.rsplit(".", maxsplit=1)[-1].lower() if "." in filename else ""
         if ext == "pdf":
-            return self._parse_pdf(file_content)
+            return self._iter_pdf(file_content)
         if ext == "docx":
-            return self._parse_docx(file_content)
+            return self._iter_docx(file_content)
         raise InputValidationError(f"Unsupported file format: .{ext}")
 
-    def _parse_docx(self, file_content: bytes) -> list[ParsedParagraph]:
-        doc = Document(BytesIO(file_content))
-        results: list[ParsedParagraph] = []
-        for p in doc.paragraphs:
-            if not p.text.strip():
-                continue
-            style_name = p.style.name
-            style = _DOCX_STYLE_MAP.get(style_name, ParagraphStyle.NORMAL)
-            results.append(ParsedParagraph(text=p.text, style=style))
-        return results
+    def _iter_docx(self, file_content: bytes) -> Iterator[ParsedParagraph]:
+        # Imported here: the streaming parser pulls in lxml and imports
+        # ParsedParagraph from this module.
+        from src.services.docx_stream import iter_docx_paragraphs
 
-    def _parse_pdf(self, file_content: bytes) -> list[ParsedParagraph]:
+        return iter_docx_paragraphs(file_content)
+
+    def _iter_pdf(self, file_content: bytes) -> Iterator[ParsedParagraph]:
         if not self._ade_client:
-            return self._parse_pdf_with_pymupdf(file_content)
+            yield from self._iter_pdf_with_pymupdf(file_content)
+            return
+        if self._ade_breaker is not None and not self._ade_breaker.allow():
+            logger.info("ADE circuit is open, parsing with pymupdf4llm")
+            yield from self._iter_pdf_with_pymupdf(file_content)
+            return
+        ade = (
+            self._ade_executor.submit(self._parse_pdf_with_ade, file_content)
+            if self._ade_executor is not None
+            else None
+        )
         try:
-            return self._parse_pdf_with_ade(file_content)
+            if ade is None:
+                results = self._parse_pdf_with_ade(file_content)
+            else:
+                results = ade.result(timeout=self._ade_deadline)
+        except FutureTimeoutError:
+            results = None
         except InputValidationError:
             raise
         except Exception as exc:
             logger.warning("ADE parsing failed, falling back to pymupdf4llm: %s", exc)
-            return self._parse_pdf_with_pymupdf(file_content)
+            yield from self._iter_pdf_with_pymupdf(file_content)
+            return
+        if results is None and ade is not None:
+            logger.info(
+                "ADE missed its %.0fs deadline, parsing locally in parallel",
+                self._ade_deadline,
+            )
+            # Past the fallback above: the race has parsed locally already,
+            # so its errors are raised as they are.
+            results = self._race_local_parse(file_content, ade)
+        yield from results
+
+    def _race_local_parse(
+        self, file_content: bytes, ade: "Future[list[ParsedParagraph]]"
+    ) -> list[ParsedParagraph]:
+        """Parse locally while ADE keeps going; whichever succeeds first wins.
+
+        ADE is checked between local paragraphs and preferred if both are
+        ready. The local result is collected rather than streamed so an ADE
+        win never follows paragraphs that were already handed out.
+        """
+        local: list[ParsedParagraph] = []
+        try:
+            for paragraph in self._iter_pdf_with_pymupdf(file_content):
+                if _succeeded(ade):
+                    return ade.result()
+                local.append(paragraph)
+        except Exception:
+            # E.g. a scanned PDF with no text layer, which ADE can still read.
+            try:
+                return ade.result()
+            # Whatever ADE failed with, the local error is the one raised.
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("ADE parsing failed as well: %s", exc)
+            raise
+        if _succeeded(ade):
+            return ade.result()
+        # ADE's outcome is still recorded by the breaker when it finishes.
+        return local
 
     def _parse_pdf_with_ade(self, file_content: bytes) -> list[ParsedParagraph]:
-        response = self._ade_client.parse(
-            document=file_content,
-            model="dpt-2-latest",
-        )
-        with pymupdf.open(stream=file_content, filetype="pdf") as doc:
-            results = _parse_ade_chunks(response.chunks, doc)
-        if not results:
-            raise ValueError("ADE returned no usable chunks")
+        started = time.monotonic()
+        try:
+            response = self._ade_client.parse(
+                document=file_content,
+                model="dpt-2-latest",
+            )
+            latency = time.monotonic() - started
+            with _backend("pymupdf").open(stream=file_content, filetype="pdf") as doc:
+                results = _parse_ade_chunks(response.chunks, doc)
+            if not results:
+                raise ValueError("ADE returned no usable chunks")
+        except Exception:
+            # A response we cannot use forces the fallback just like an
+            # error, so the breaker counts it as one.
+            if self._ade_breaker is not None:
+                self._ade_breaker.record_failure()
+            raise
+        if self._ade_breaker is not None:
+            self._ade_breaker.record_success(latency)
         return results
 
-    def _parse_pdf_with_pymupdf(self, file_content: bytes) -> list[ParsedParagraph]:
-        with pymupdf.open(stream=file_content, filetype="pdf") as doc:
+    def _iter_pdf_with_pymupdf(self, file_content: bytes) -> Iterator[ParsedParagraph]:
+        pymupdf4llm = _backend("pymupdf4llm")
+        found = False
+        with _backend("pymupdf").open(stream=file_content, filetype="pdf") as doc:
             if doc.page_count == 0:
                 raise InputValidationError("PDF file contains no pages")
             hdr_info = pymupdf4llm.IdentifyHeaders(doc, max_levels=4)
-            md_text = pymupdf4llm.to_markdown(
-                doc,
-                hdr_info=hdr_info,
-                margins=(0, 50, 0, 50),
-            )
-        results = _parse_markdown(md_text)
-        if not results:
+            for page_number in range(doc.page_count):
+                md_text = pymupdf4llm.to_markdown(
+                    doc,
+                    pages=[page_number],
+                    hdr_info=hdr_info,
+                    margins=(0, 50, 0, 50),
+                )
+                for paragraph in _parse_markdown(md_text):
+                    found = True
+                    yield paragraph
+        if not found:
             raise InputValidationError(
                 "No text could be extracted from this PDF. "
                 "It may be a scanned document — please use a text-based PDF."
             )
-        return results
+
+
+def _succeeded(future: Future) -> bool:
+    return future.done() and not future.cancelled() and future.exception() is None
 
 
 def _extract_figure_image(
-    doc: pymupdf.Document, grounding: object,
+    doc: "pymupdf.Document", grounding: object,
 ) -> str | None:
     """Crop the figure region from the PDF page and return as base64 PNG."""
+    pymupdf = _backend("pymupdf")
     try:
         box = grounding.box
         page = doc[grounding.page]
@@ -208,7 +353,7 @@ def _extract_figure_image(
 
 
 def _parse_ade_chunks(
-    chunks: list, doc: pymupdf.Document,
+    chunks: list, doc: "pymupdf.Document",
 ) -> list[ParsedParagraph]:
     results: list[ParsedParagraph] = []
     for chunk in chunks:
@@ -234,6 +379,12 @@ def _parse_ade_chunks(
 
 
 def _parse_markdown(md_text: str) -> list[ParsedParagraph]:
+    """Split pymupdf4llm or ADE markdown into paragraphs in a single pass.
+
+    Each line is classified by its first character, so most lines cost a
+    couple of string operations; the few regexes left only run on lines
+    that already look like the construct they check.
+    """
     results: list[ParsedParagraph] = []
     buffer: list[str] = []
     in_code_block = False
@@ -261,19 +412,20 @@ def _parse_markdown(md_text: str) -> list[ParsedParagraph]:
 
         if in_html_table:
             table_buffer.append(stripped)
-            if _HTML_TABLE_CLOSE.search(stripped):
+            if _closes_table(stripped):
                 flush_table()
             continue
 
-        if _HTML_TABLE_OPEN.search(stripped):
+        if "<" in stripped and _HTML_TABLE_OPEN.search(stripped):
             flush_buffer()
             in_html_table = True
             table_buffer.append(stripped)
-            if _HTML_TABLE_CLOSE.search(stripped):
+            if _closes_table(stripped):
                 flush_table()
             continue
 
-        if _CODE_FENCE.match(stripped):
+        first = stripped[:1]
+        if first == "`" and stripped.startswith("```"):
             flush_buffer()
             in_code_block = not in_code_block
             continue
@@ -281,37 +433,42 @@ def _parse_markdown(md_text: str) -> list[ParsedParagraph]:
         if in_code_block:
             continue
 
-        if not stripped or _HORIZONTAL_RULE.match(stripped):
+        if not stripped or (
+            first == "-" and len(stripped) >= 3 and not stripped.strip("-")
+        ):
+            # Blank line or horizontal rule.
             flush_buffer()
             continue
 
-        if (
-            _HTML_ANCHOR.match(stripped)
-            or _HTML_COMMENT.match(stripped)
-            or _IMAGE_PATTERN.match(stripped)
-            or _TABLE_ROW.match(stripped)
+        if first == "<" and (
+            _HTML_ANCHOR.match(stripped) or _HTML_COMMENT.match(stripped)
         ):
             continue
+        if first == "!" and _IMAGE_PATTERN.match(stripped):
+            continue
+        if first == "|" and len(stripped) >= 3 and stripped[-1] == "|":
+            # Markdown table row.
+            continue
 
-        if _ADE_DELIMITER.search(stripped):
+        if _has_ade_delimiter(stripped):
             flush_buffer()
             results.append(ParsedParagraph(text=stripped, style=ParagraphStyle.FIGURE))
             continue
 
-        heading_match = _HEADING_PATTERN.match(stripped)
-        if heading_match:
-            flush_buffer()
-            level = len(heading_match.group(1))
-            text = _strip_inline_markers(heading_match.group(2))
-            style = _MD_STYLE_MAP[level]
-            if text:
-                results.append(ParsedParagraph(text=text, style=style))
-            continue
+        if first == "#":
+            level = len(stripped) - len(stripped.lstrip("#"))
+            rest = stripped[level:]
+            if level <= 5 and rest[:1].isspace():
+                flush_buffer()
+                text = _strip_inline_markers(rest.lstrip())
+                if text:
+                    results.append(ParsedParagraph(text=text, style=_MD_STYLE_MAP[level]))
+                continue
 
-        list_match = _LIST_ITEM.match(stripped)
-        if list_match:
+        item = _list_item_text(stripped, first)
+        if item is not None:
             flush_buffer()
-            text = _strip_inline_markers(list_match.group(1))
+            text = _strip_inline_markers(item)
             if text:
                 results.append(ParsedParagraph(text=text, style=ParagraphStyle.NORMAL))
             continue
@@ -324,3 +481,34 @@ def _parse_markdown(md_text: str) -> list[ParsedParagraph]:
         flush_table()
     flush_buffer()
     return results
+
+
+def _closes_table(line: str) -> bool:
+    return "</" in line and _HTML_TABLE_CLOSE.search(line) is not None
+
+
+def _has_ade_delimiter(line: str) -> bool:
+    # Same as searching for <::.*?::>, without a regex on every line.
+    start = line.find("<::")
+    return start >= 0 and line.find("::>", start + 3) >= 0
+
+
+def _list_item_text(line: str, first: str) -> str | None:
+    """The text of a ``- item`` / ``1. item`` line, or None for other lines."""
+    if first in ("-", "*", "+"):
+        marker_end = 1
+    elif first.isdecimal():
+        marker_end = 1
+        while marker_end < len(line) and line[marker_end].isdecimal():
+            marker_end += 1
+        if line[marker_end : marker_end + 1] != ".":
+            return None
+        marker_end += 1
+    else:
+        return None
+    rest = line[marker_end:]
+    # The line is stripped, so whitespace after the marker is always
+    # followed by text.
+    if not rest[:1].isspace():
+        return None
+    return rest.lstrip()
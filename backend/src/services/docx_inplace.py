@@ -0,0 +1,188 @@
+"""Bilingual export that edits the original .docx instead of rebuilding it.
+
+Every zip part except ``word/document.xml`` is copied into the output as
+its compressed bytes, without inflating or recompressing it, so media,
+styles, headers and footers stay exactly as uploaded and cost only a copy.
+In ``document.xml`` each translated body paragraph gets a sibling holding
+its translation, with the source paragraph's formatting.
+"""
+
+import struct
+import zipfile
+from copy import copy, deepcopy
+from io import BytesIO
+from pathlib import Path
+
+from lxml import etree
+
+from src.core.exceptions import InputValidationError
+from src.models.translation import ParagraphStyle, TranslationResult
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+_XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
+_DOCUMENT_PART = "word/document.xml"
+_BODY = f"{_W}body"
+_P = f"{_W}p"
+_PPR = f"{_W}pPr"
+_R = f"{_W}r"
+_RPR = f"{_W}rPr"
+_T = f"{_W}t"
+_TAB = f"{_W}tab"
+_BR = f"{_W}br"
+_CR = f"{_W}cr"
+_TYPE = f"{_W}type"
+# Paragraph properties that must not be duplicated onto the translation:
+# list numbering would count the item twice, a section break would split
+# the section.
+_DROPPED_PPR = (f"{_W}numPr", f"{_W}sectPr")
+# Paragraphs inside these stay untouched: an extra paragraph would overflow
+# a text box or reshape a table.
+_SKIPPED_ANCESTORS = frozenset({f"{_W}tbl", f"{_W}txbxContent", _MC_FALLBACK})
+
+_NON_EXPORTABLE_STYLES = frozenset({ParagraphStyle.FIGURE, ParagraphStyle.TABLE})
+# How far ahead to look for a paragraph's stored counterpart when the
+# document has paragraphs the stored result does not (e.g. text boxes).
+_MATCH_WINDOW = 50
+_COPY_CHUNK_SIZE = 1024 * 1024
+# Fixed part of a zip local file header; the name and extra field follow.
+_LOCAL_HEADER_SIZE = 30
+_DATA_DESCRIPTOR_FLAG = 0x08
+
+
+class InPlaceDocxExporter:
+    def export(self, source: Path, result: TranslationResult) -> bytes:
+        try:
+            archive = zipfile.ZipFile(source)
+        except zipfile.BadZipFile as e:
+            raise InputValidationError("The original upload is not a valid .docx") from e
+        buf = BytesIO()
+        with archive, zipfile.ZipFile(buf, "w") as output:
+            for info in archive.infolist():
+                if info.filename == _DOCUMENT_PART:
+                    output.writestr(info, _translate_document(archive.read(info), result))
+                else:
+                    _copy_compressed(archive, output, info)
+        return buf.getvalue()
+
+
+def _copy_compressed(
+    archive: zipfile.ZipFile, output: zipfile.ZipFile, info: zipfile.ZipInfo
+) -> None:
+    """Copy one member's compressed data as is, keeping its ``ZipInfo``.
+
+    ``zipfile`` has no public API for this, so the local header is written
+    here and the member registered for the central directory the way
+    ``ZipFile.write`` does it.
+    """
+    src = archive.fp
+    if src is None or output.fp is None:
+        raise ValueError("Both archives must be open")
+    src.seek(info.header_offset)
+    header = src.read(_LOCAL_HEADER_SIZE)
+    if len(header) != _LOCAL_HEADER_SIZE or header[:4] != zipfile.stringFileHeader:
+        raise InputValidationError("The original upload is not a valid .docx")
+    name_length, extra_length = struct.unpack("<HH", header[26:30])
+    src.seek(info.header_offset + _LOCAL_HEADER_SIZE + name_length + extra_length)
+
+    member = copy(info)
+    # Sizes and CRC are known up front, so no data descriptor follows.
+    member.flag_bits &= ~_DATA_DESCRIPTOR_FLAG
+    member.header_offset = output.fp.tell()
+    output.fp.write(member.FileHeader())
+    remaining = info.compress_size
+    while remaining:
+        chunk = src.read(min(remaining, _COPY_CHUNK_SIZE))
+        if not chunk:
+            raise InputValidationError("The original upload is not a valid .docx")
+        output.fp.write(chunk)
+        remaining -= len(chunk)
+    output.filelist.append(member)
+    output.NameToInfo[member.filename] = member
+    output.start_dir = output.fp.tell()
+
+
+def _translate_document(xml: bytes, result: TranslationResult) -> bytes:
+    parser = etree.XMLParser(resolve_entities=False, huge_tree=True)
+    try:
+        root = etree.fromstring(xml, parser=parser)
+    except etree.XMLSyntaxError as e:
+        raise InputValidationError("The original upload is not a valid .docx") from e
+    body = root.find(_BODY)
+    if body is None:
+        return xml
+
+    pending = [
+        (p.original, p.translated)
+        for p in result.paragraphs
+        if p.style not in _NON_EXPORTABLE_STYLES
+    ]
+    position = 0
+    for paragraph in list(body.iter(_P)):
+        if any(a.tag in _SKIPPED_ANCESTORS for a in paragraph.iterancestors()):
+            continue
+        text = _paragraph_text(paragraph)
+        if not text.strip():
+            continue
+        for offset, (original, translated) in enumerate(
+            pending[position : position + _MATCH_WINDOW]
+        ):
+            if original == text:
+                position += offset + 1
+                # Passthrough paragraphs (numbers, URLs) read the same in
+                # both languages and are not repeated.
+                if translated != original:
+                    paragraph.addnext(_translation_paragraph(paragraph, translated))
+                break
+    return etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+def _paragraph_text(paragraph: etree._Element) -> str:
+    # Same rules as the streaming parser, so the text matches the stored
+    # originals: text-box content belongs to its own paragraphs.
+    parts: list[str] = []
+
+    def _walk(elem: etree._Element) -> None:
+        for child in elem:
+            tag = child.tag
+            if tag == _P or tag == _MC_FALLBACK:
+                continue
+            if tag == _T:
+                parts.append(child.text or "")
+            elif tag == _TAB and elem.tag == _R:
+                parts.append("\t")
+            elif tag in (_BR, _CR) and child.get(_TYPE) in (None, "textWrapping"):
+                parts.append("\n")
+            else:
+                _walk(child)
+
+    _walk(paragraph)
+    return "".join(parts)
+
+
+def _translation_paragraph(source: etree._Element, text: str) -> etree._Element:
+    paragraph = source.makeelement(_P)
+    source_ppr = source.find(_PPR)
+    if source_ppr is not None:
+        ppr = deepcopy(source_ppr)
+        for tag in _DROPPED_PPR:
+            for elem in ppr.findall(tag):
+                ppr.remove(elem)
+        paragraph.append(ppr)
+
+    run = etree.SubElement(paragraph, _R)
+    source_rpr = source.find(f"{_R}/{_RPR}")
+    if source_rpr is not None:
+        run.append(deepcopy(source_rpr))
+    for line_number, line in enumerate(text.split("\n")):
+        if line_number:
+            etree.SubElement(run, _BR)
+        for part_number, part in enumerate(line.split("\t")):
+            if part_number:
+                etree.SubElement(run, _TAB)
+            if part:
+                t = etree.SubElement(run, _T)
+                t.text = part
+                t.set(_XML_SPACE, "preserve")
+    return paragraph
@@ -0,0 +1,222 @@
+"""Streaming DOCX parsing straight from the zip with lxml ``iterparse``.
+
+python-docx builds an object for every element of the document and resolves
+each paragraph's style through the styles part, which gets slow and memory
+hungry on very large files. Here ``word/document.xml`` is decompressed and
+parsed incrementally, styles are resolved through a table built once from
+``word/styles.xml``, and elements are cleared as soon as they have been
+read, so memory stays flat however long the document is.
+"""
+
+import zipfile
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from html import escape as html_escape
+from io import BytesIO
+from typing import IO
+
+from lxml import etree
+
+from src.core.exceptions import InputValidationError
+from src.models.translation import ParagraphStyle
+from src.services.document_parser import ParsedParagraph
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+_BODY = f"{_W}body"
+_P = f"{_W}p"
+_T = f"{_W}t"
+_TAB = f"{_W}tab"
+_TABS = f"{_W}tabs"
+_BR = f"{_W}br"
+_CR = f"{_W}cr"
+_P_STYLE = f"{_W}pStyle"
+_TBL = f"{_W}tbl"
+_TR = f"{_W}tr"
+_TC = f"{_W}tc"
+_GRID_SPAN = f"{_W}gridSpan"
+_TXBX_CONTENT = f"{_W}txbxContent"
+_VAL = f"{_W}val"
+_TYPE = f"{_W}type"
+
+# Built-in style names as written in styles.xml, compared case-insensitively
+# (python-docx reports them capitalised, e.g. "heading 1" as "Heading 1").
+_STYLE_NAMES: dict[str, ParagraphStyle] = {
+    "title": ParagraphStyle.TITLE,
+    "heading 1": ParagraphStyle.HEADING_1,
+    "heading 2": ParagraphStyle.HEADING_2,
+    "heading 3": ParagraphStyle.HEADING_3,
+    "heading 4": ParagraphStyle.HEADING_4,
+}
+
+
+@dataclass
+class _Paragraph:
+    parts: list[str] = field(default_factory=list)
+    style_id: str | None = None
+
+
+@dataclass
+class _Cell:
+    paragraphs: list[str] = field(default_factory=list)
+    colspan: int = 1
+
+
+@dataclass
+class _Table:
+    rows: list[list[_Cell]] = field(default_factory=list)
+
+
+def iter_docx_paragraphs(file_content: bytes) -> Iterator[ParsedParagraph]:
+    """Yield the paragraphs of a .docx in document order.
+
+    Body and text-box paragraphs come out one by one; each top-level table
+    comes out as a single TABLE item holding escaped HTML, with nested
+    tables flattened into their cell's text.
+    """
+    try:
+        archive = zipfile.ZipFile(BytesIO(file_content))
+    except zipfile.BadZipFile as e:
+        raise InputValidationError("Invalid .docx file") from e
+    with archive:
+        try:
+            document = archive.open("word/document.xml")
+        except KeyError as e:
+            raise InputValidationError("Invalid .docx file") from e
+        try:
+            with document:
+                yield from _iter_document(document, _read_style_table(archive))
+        except etree.XMLSyntaxError as e:
+            raise InputValidationError("Invalid .docx file") from e
+
+
+def _read_style_table(archive: zipfile.ZipFile) -> dict[str | None, ParagraphStyle]:
+    table: dict[str | None, ParagraphStyle] = {}
+    try:
+        styles = archive.read("word/styles.xml")
+    except KeyError:
+        return table
+    root = etree.fromstring(styles, parser=etree.XMLParser(resolve_entities=False))
+    for style in root.iterfind(f"{_W}style"):
+        if style.get(f"{_W}type") != "paragraph":
+            continue
+        name = style.find(f"{_W}name")
+        if name is None:
+            continue
+        mapped = _STYLE_NAMES.get((name.get(_VAL) or "").lower())
+        if mapped is None:
+            continue
+        style_id = style.get(f"{_W}styleId")
+        table[style_id] = mapped
+        if style.get(f"{_W}default") in ("1", "true"):
+            table[None] = mapped
+    return table
+
+
+def _iter_document(
+    document: IO[bytes], styles: dict[str | None, ParagraphStyle]
+) -> Iterator[ParsedParagraph]:
+    paragraphs: list[_Paragraph] = []
+    # Innermost container of the paragraph being read: a table cell or None
+    # for the body and text boxes, whose paragraphs are emitted directly.
+    containers: list[_Cell | None] = [None]
+    tables: list[_Table] = []
+    fallback_depth = 0
+
+    for event, elem in etree.iterparse(
+        document, events=("start", "end"), resolve_entities=False
+    ):
+        tag = elem.tag
+        if tag == _MC_FALLBACK:
+            # Alternate renderings repeat the preferred content (e.g. VML
+            # copies of text boxes); only the mc:Choice branch is read.
+            fallback_depth += 1 if event == "start" else -1
+            if event == "end":
+                elem.clear()
+            continue
+        if fallback_depth:
+            continue
+
+        if event == "start":
+            if tag == _P:
+                paragraphs.append(_Paragraph())
+            elif tag == _TXBX_CONTENT:
+                containers.append(None)
+            elif tag == _TBL:
+                tables.append(_Table())
+            elif tag == _TR and tables:
+                tables[-1].rows.append([])
+            elif tag == _TC:
+                cell = _Cell()
+                if tables and tables[-1].rows:
+                    tables[-1].rows[-1].append(cell)
+                containers.append(cell)
+            continue
+
+        if tag == _T:
+            if paragraphs:
+                paragraphs[-1].parts.append(elem.text or "")
+        elif tag == _TAB:
+            if paragraphs and elem.getparent().tag != _TABS:
+                paragraphs[-1].parts.append("\t")
+        elif tag in (_BR, _CR):
+            if paragraphs and elem.get(_TYPE) in (None, "textWrapping"):
+                paragraphs[-1].parts.append("\n")
+        elif tag == _P_STYLE:
+            if paragraphs:
+                paragraphs[-1].style_id = elem.get(_VAL)
+        elif tag == _GRID_SPAN:
+            cell = containers[-1]
+            if cell is not None:
+                cell.colspan = int(elem.get(_VAL) or 1)
+        elif tag == _P:
+            paragraph = paragraphs.pop()
+            text = "".join(paragraph.parts)
+            cell = containers[-1]
+            if cell is not None:
+                if text.strip():
+                    cell.paragraphs.append(text.strip())
+            elif text.strip():
+                # Without a pStyle the paragraph uses the default style.
+                style = styles.get(paragraph.style_id, ParagraphStyle.NORMAL)
+                yield ParsedParagraph(text=text, style=style)
+            elem.clear()
+        elif tag == _TXBX_CONTENT:
+            containers.pop()
+        elif tag == _TC:
+            containers.pop()
+            elem.clear()
+        elif tag == _TBL:
+            table = tables.pop()
+            cell = containers[-1]
+            if cell is not None:
+                cell.paragraphs.extend(_table_text(table))
+            elif any(c.paragraphs for row in table.rows for c in row):
+                yield ParsedParagraph(
+                    text=_table_html(table), style=ParagraphStyle.TABLE
+                )
+            elem.clear()
+
+        if elem.getparent() is not None and elem.getparent().tag == _BODY:
+            # Drop finished top-level elements so the tree never grows.
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
+
+def _table_text(table: _Table) -> list[str]:
+    return [text for row in table.rows for cell in row for text in cell.paragraphs]
+
+
+def _table_html(table: _Table) -> str:
+    rows: list[str] = []
+    for row in table.rows:
+        cells = "".join(
+            (f'<td colspan="{cell.colspan}">' if cell.colspan > 1 else "<td>")
+            + html_escape(" ".join(cell.paragraphs))
+            + "</td>"
+            for cell in row
+        )
+        rows.append(f"<tr>{cells}</tr>")
+    return f"<table>{''.join(rows)}</table>"
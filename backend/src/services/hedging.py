@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+def _start[T](
+    request: Callable[[], Awaitable[T]], record: Callable[[float], None]
+) -> asyncio.Task[T]:
+    started = time.monotonic()
+    task = asyncio.ensure_future(request())
+    # Every attempt counts, timed from its own start. A loser cancelled
+    # after the winner returned adds how long it had run so far, which is
+    # less than it would have taken but keeps the slow tail in view.
+    task.add_done_callback(lambda _: record(time.monotonic() - started))
+    return task
+
+
+class RequestHedger:
+    """Send a duplicate request when the first one runs past its usual latency.
+
+    The hedge delay is the ``percentile`` of recently observed latencies of
+    the same kind of call, e.g. one model, so only the slow tail is
+    duplicated. Every request earns ``budget_ratio`` of a hedge token (capped
+    at ``max_tokens``); a hedge spends one token, which keeps the extra spend
+    at roughly ``budget_ratio`` of all calls.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        budget_ratio: float = 0.05,
+        min_samples: int = 20,
+        window: int = 200,
+        min_delay: float = 0.5,
+        max_tokens: float = 10.0,
+    ) -> None:
+        self._percentile = percentile
+        self._budget_ratio = budget_ratio
+        self._min_samples = min_samples
+        self._min_delay = min_delay
+        self._max_tokens = max_tokens
+        self._window = window
+        self._latencies: dict[str, deque[float]] = {}
+        self._tokens = 0.0
+        self.hedges_sent = 0
+
+    def hedge_delay(self, kind: str = "") -> float | None:
+        latencies = self._latencies.get(kind, ())
+        if len(latencies) < self._min_samples:
+            return None
+        ordered = sorted(latencies)
+        rank = min(len(ordered) - 1, math.ceil(self._percentile * len(ordered)) - 1)
+        return max(self._min_delay, ordered[rank])
+
+    def record(self, latency: float, kind: str = "") -> None:
+        if kind not in self._latencies:
+            self._latencies[kind] = deque(maxlen=self._window)
+        self._latencies[kind].append(latency)
+
+    async def run[T](self, request: Callable[[], Awaitable[T]], kind: str = "") -> T:
+        self._tokens = min(self._max_tokens, self._tokens + self._budget_ratio)
+        delay = self.hedge_delay(kind)
+
+        def record(latency: float) -> None:
+            self.record(latency, kind)
+
+        primary = _start(request, record)
+        attempts = {primary}
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait({primary}, timeout=delay)
+                if not done and self._tokens >= 1:
+                    self._tokens -= 1
+                    self.hedges_sent += 1
+                    logger.debug("Hedging request after %.2fs", delay)
+                    attempts.add(_start(request, record))
+                    return await self._first_success(attempts)
+            return await primary
+        finally:
+            for task in attempts:
+                if not task.done():
+                    task.cancel()
+
+    async def _first_success[T](self, attempts: set[asyncio.Task[T]]) -> T:
+        pending = set(attempts)
+        while True:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None or not pending:
+                    return task.result()
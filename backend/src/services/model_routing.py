@@ -0,0 +1,37 @@
+from dataclasses import dataclass
+
+from src.models.translation import ParagraphStyle
+from src.services.document_parser import ParsedParagraph
+from src.services.token_usage import estimate_text_tokens
+
+
+@dataclass(frozen=True)
+class ModelRouter:
+    """Pick the model for each translation group.
+
+    Without a ``fast_model`` everything goes to ``main_model``. With one,
+    standalone items (titles, headings) and groups of at most
+    ``fast_max_tokens`` estimated tokens go to the fast model, as do single-item repairs
+    and language detection; longer runs of body text keep the main model,
+    where translation quality matters most.
+    """
+
+    main_model: str
+    fast_model: str | None = None
+    # Counted in tokens rather than words: Chinese has no spaces, so a
+    # whole paragraph would count as a single word.
+    fast_max_tokens: int = 80
+
+    @property
+    def light_model(self) -> str:
+        """Model for short utility calls: repairs and language detection."""
+        return self.fast_model or self.main_model
+
+    def route(self, group: list[ParsedParagraph]) -> str:
+        if self.fast_model is None:
+            return self.main_model
+        if all(p.style is not ParagraphStyle.NORMAL for p in group):
+            return self.fast_model
+        if sum(estimate_text_tokens(p.text) for p in group) <= self.fast_max_tokens:
+            return self.fast_model
+        return self.main_model
@@ -0,0 +1,88 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from src.core.exceptions import ServiceUnavailableError
+from src.services.circuit_breaker import CircuitBreakerPolicy
+from src.services.document_parser import (
+    DocumentParser,
+    ParsedParagraph,
+    preload_backends,
+)
+
+_worker_parser: DocumentParser | None = None
+
+
+def _init_worker(
+    vision_agent_api_key: str | None,
+    ade_deadline: float | None,
+    ade_breaker: CircuitBreakerPolicy | None,
+) -> None:
+    global _worker_parser
+    # Import the parsing backends once per worker, not once per document.
+    preload_backends()
+    # Each worker keeps its own breaker state.
+    _worker_parser = DocumentParser(vision_agent_api_key, ade_deadline, ade_breaker)
+
+
+def _parse(file_content: bytes, filename: str) -> list[ParsedParagraph]:
+    return _worker_parser.parse(file_content, filename)
+
+
+def _warm_up() -> None:
+    return None
+
+
+class ParserPool:
+    """Warm worker processes that run ``DocumentParser.parse`` off the GIL.
+
+    At most ``workers + max_queue`` documents are accepted at once; beyond
+    that ``parse`` fails fast with a 503 instead of queueing without limit.
+    Each worker is replaced after ``max_documents_per_worker`` documents so
+    memory fragmentation from the native PDF libraries cannot accumulate.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        vision_agent_api_key: str | None = None,
+        max_queue: int = 16,
+        max_documents_per_worker: int = 50,
+        ade_deadline: float | None = None,
+        ade_breaker: CircuitBreakerPolicy | None = None,
+    ) -> None:
+        self._workers = workers
+        self._capacity = workers + max_queue
+        self._in_flight = 0
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(vision_agent_api_key, ade_deadline, ade_breaker),
+            max_tasks_per_child=max_documents_per_worker,
+        )
+
+    @property
+    def capacity(self) -> int:
+        """Documents accepted at once before ``parse`` refuses more."""
+        return self._capacity
+
+    def warm_up(self) -> None:
+        """Start every worker now so the first uploads don't pay for imports."""
+        futures = [self._executor.submit(_warm_up) for _ in range(self._workers)]
+        for future in futures:
+            future.result()
+
+    async def parse(self, file_content: bytes, filename: str) -> list[ParsedParagraph]:
+        if self._in_flight >= self._capacity:
+            raise ServiceUnavailableError("Document parser is busy, try again shortly")
+        self._in_flight += 1
+        try:
+            return await asyncio.wrap_future(
+                self._executor.submit(_parse, file_content, filename)
+            )
+        finally:
+            self._in_flight -= 1
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
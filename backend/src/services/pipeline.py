@@ -0,0 +1,65 @@
+import asyncio
+import threading
+from collections.abc import AsyncIterator, Callable, Iterator
+from typing import Any
+
+_END = object()
+_POLL_SECONDS = 0.1
+
+
+async def iterate_in_thread[T](
+    factory: Callable[[], Iterator[T]], max_buffered: int
+) -> AsyncIterator[T]:
+    """Run a blocking iterator in a worker thread and consume it here.
+
+    At most ``max_buffered`` items wait between the two sides: the thread
+    blocks when the consumer falls behind, and stops at its next item once
+    the consumer goes away. Errors raised by the iterator are re-raised to
+    the consumer in order.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue[tuple[Any, BaseException | None]] = asyncio.Queue()
+    slots = threading.Semaphore(max_buffered)
+    stopped = threading.Event()
+
+    def _post(item: Any, error: BaseException | None = None) -> None:
+        if not stopped.is_set():
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, (item, error))
+            except RuntimeError:
+                pass  # The loop closed while the thread was still parsing.
+
+    def _produce() -> None:
+        try:
+            for item in factory():
+                while not slots.acquire(timeout=_POLL_SECONDS):
+                    if stopped.is_set():
+                        return
+                if stopped.is_set():
+                    return
+                _post(item)
+        # Any error of the iterator, whatever its type, is the consumer's.
+        except Exception as e:  # noqa: BLE001
+            _post(_END, e)
+        except BaseException as e:
+            # Cancellation or interpreter exit, not a parse error: the
+            # consumer is still told, and the thread stops with it.
+            _post(_END, e)
+            raise
+        else:
+            _post(_END)
+
+    producer = loop.run_in_executor(None, _produce)
+    try:
+        while True:
+            item, error = await queue.get()
+            if item is _END:
+                if error is not None:
+                    raise error
+                return
+            slots.release()
+            yield item
+    finally:
+        stopped.set()
+        # Not awaited: the thread may be in the middle of a slow page.
+        producer.add_done_callback(lambda f: f.cancelled() or f.exception())
@@ -0,0 +1,50 @@
+"""Precompressed copies of stored API responses, keyed by Content-Encoding."""
+
+import gzip
+
+IDENTITY = "identity"
+
+SUFFIXES = {IDENTITY: ".json", "gzip": ".json.gz", "br": ".json.br"}
+
+_GZIP_LEVEL = 9
+_BROTLI_QUALITY = 9
+
+
+def encode_variants(data: bytes) -> dict[str, bytes]:
+    """Return ``data`` plus every compressed encoding available here.
+
+    Brotli is optional: without the ``brotli`` package only gzip is produced.
+    """
+    variants = {
+        IDENTITY: data,
+        "gzip": gzip.compress(data, compresslevel=_GZIP_LEVEL, mtime=0),
+    }
+    try:
+        import brotli
+    except ImportError:
+        return variants
+    variants["br"] = brotli.compress(data, quality=_BROTLI_QUALITY)
+    return variants
+
+
+def choose_encoding(accept_encoding: str, available: set[str]) -> str:
+    """Pick the smallest available encoding the client accepts."""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name] = quality
+    wildcard = accepted.get("*", 0.0)
+    for encoding in ("br", "gzip"):
+        if encoding in available and accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return IDENTITY
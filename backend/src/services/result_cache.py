@@ -0,0 +1,75 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+
+from src.models.translation import TranslationResult
+
+# Rough per-object overhead of a paragraph model and its strings.
+_PARAGRAPH_OVERHEAD = 400
+
+
+class ResultCache:
+    """LRU of validated ``TranslationResult``s bounded by estimated memory.
+
+    Entries are stored with a version (e.g. a file's inode, mtime and size)
+    and only returned while the caller presents the same version, so writes
+    from other processes are never served stale. Cached results are shared
+    between callers and must not be mutated. Safe to use from the thread
+    pool that serves sync endpoints.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[Hashable, TranslationResult, int]] = (
+            OrderedDict()
+        )
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(self, key: str, version: Hashable) -> TranslationResult | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] != version:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: str, version: Hashable, result: TranslationResult) -> None:
+        size = estimate_size(result)
+        if size > self._max_bytes:
+            self.invalidate(key)
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (version, result, size)
+            self._size += size
+            while self._size > self._max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[2]
+
+
+def estimate_size(result: TranslationResult) -> int:
+    size = len(result.filename) + _PARAGRAPH_OVERHEAD
+    for paragraph in result.paragraphs:
+        size += (
+            _PARAGRAPH_OVERHEAD
+            + len(paragraph.original.encode("utf-8"))
+            + len(paragraph.translated.encode("utf-8"))
+            + len(paragraph.image or "")
+        )
+    return size
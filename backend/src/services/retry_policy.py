@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import random
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Statuses worth another try: request timeout, conflict, rate limit and
+# server errors.
+_RETRYABLE_STATUSES = frozenset({408, 409, 429})
+
+
+def is_transient(exc: BaseException) -> bool:
+    """True for errors a later attempt at the same request can get past.
+
+    Timeouts, dropped connections, rate limits and 5xx responses are
+    transient. Authentication, malformed requests, budget refusals and
+    errors from our own code are not, and retrying them only adds cost.
+    """
+    if isinstance(exc, TimeoutError):
+        return True
+    # The SDK is only imported once a client exists, so look at the error
+    # classes lazily too.
+    import openai
+
+    if isinstance(exc, openai.APIConnectionError):
+        # Includes APITimeoutError.
+        return True
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code in _RETRYABLE_STATUSES or exc.status_code >= 500
+    return False
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Retry transient failures with exponential backoff and full jitter.
+
+    Attempt ``n`` (from 0) waits a random time up to
+    ``min(max_delay, base_delay * 2**n)`` before retrying, or the server's
+    ``Retry-After`` if that is longer, still capped at ``max_delay``. This
+    sits on top of the OpenAI SDK's own short retries and is meant to ride
+    out rate limiting and brief outages that last longer than those.
+    """
+
+    retries: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+
+    def delay(self, attempt: int, exc: BaseException | None = None) -> float:
+        ceiling = min(self.max_delay, self.base_delay * 2**attempt)
+        delay = random.uniform(0, ceiling)
+        retry_after = _retry_after(exc)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        attempt = 0
+        while True:
+            try:
+                return await call()
+            except Exception as exc:
+                if attempt >= self.retries or not is_transient(exc):
+                    raise
+                delay = self.delay(attempt, exc)
+                logger.warning(
+                    "Translation call failed (%s), retry %d/%d in %.1fs",
+                    type(exc).__name__,
+                    attempt + 1,
+                    self.retries,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
+
+
+def _retry_after(exc: BaseException | None) -> float | None:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is None:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,53 @@
+import re
+
+_PASSTHROUGH_PATTERNS = (
+    # Numbers, ranges, percentages, coordinates: "42", "3.5–4.2 %", "(12, 7)"
+    re.compile(r"^[\d\s.,:;%+\-–—/()\[\]×=<>±°~^*]+$"),
+    # Page labels: "Page 3", "p. 12", "3 / 10", "- 7 -"
+    re.compile(r"^(?:(?:page|p\.|pp\.)\s*)?\d+(?:\s*(?:of|/)\s*\d+)?$", re.IGNORECASE),
+    # URLs
+    re.compile(r"^(?:https?://|www\.)\S+$", re.IGNORECASE),
+    # DOIs, bare or as a resolver link
+    re.compile(
+        r"^(?:doi:\s*|https?://(?:dx\.)?doi\.org/)?10\.\d{4,9}/\S+$", re.IGNORECASE
+    ),
+    # Email addresses
+    re.compile(r"^[\w.+-]+@[\w-]+(?:\.[\w-]+)+$"),
+    # Code identifiers: snake_case, dotted.paths, camelCase, call()
+    re.compile(r"^[A-Za-z_]\w*(?:(?:\.|::)[A-Za-z_]\w*)+(?:\(\))?$"),
+    re.compile(r"^[A-Za-z]*_\w*(?:\(\))?$"),
+    re.compile(r"^[a-z]+[A-Z]\w*(?:\(\))?$"),
+    re.compile(r"^[A-Za-z_]\w*\(\)$"),
+)
+
+_EQUATION_OPERATORS = re.compile(r"[=<>≤≥≈≠±×÷∑∫√^]")
+_WORD = re.compile(r"[^\W\d_]+")
+_CJK = re.compile(r"[\u3400-\u9fff\uf900-\ufaff]")
+_MATH_FUNCTIONS = frozenset({"sin", "cos", "tan", "log", "ln", "exp", "max", "min", "lim"})
+
+
+def is_passthrough(text: str) -> bool:
+    """Return True for paragraphs that read the same in either language.
+
+    Numbers, page labels, URLs, DOIs, emails, code identifiers and equation
+    fragments are copied into the translation instead of sent to the API.
+    """
+    stripped = text.strip()
+    if not stripped:
+        return True
+    if any(pattern.match(stripped) for pattern in _PASSTHROUGH_PATTERNS):
+        return True
+    return _is_equation(stripped)
+
+
+def _is_equation(text: str) -> bool:
+    if _CJK.search(text) or not _EQUATION_OPERATORS.search(text):
+        return False
+    variables = [w for w in _WORD.findall(text) if w.lower() not in _MATH_FUNCTIONS]
+    if any(len(word) > 2 for word in variables):
+        return False
+    # Short words alone would pass prose like "If x = 1 it is ok": digits
+    # and symbols must make up at least half of what is left.
+    letters = sum(len(word) for word in variables)
+    symbols = sum(not (c.isspace() or c.isalpha()) for c in text)
+    return letters <= symbols
@@ -0,0 +1,121 @@
+"""Compact on-disk format for stored translations.
+
+Layout of a ``.pbt`` file::
+
+    b"PBT" + version byte | uint32 header length | msgpack header | zstd body
+
+The header is uncompressed and holds the listing summary, so ``list_all``
+never has to decompress a body. The body is zstd-compressed msgpack with the
+paragraphs stored column by column (all originals, then all translations,
+...), which compresses far better than row-wise JSON; figure images are kept
+as raw bytes instead of base64 text.
+"""
+
+import base64
+import struct
+from pathlib import Path
+from typing import Any
+
+import msgpack
+import zstandard
+
+from src.models.translation import TranslationResult
+
+FORMAT_VERSION = 1
+SUFFIX = ".pbt"
+
+_MAGIC = b"PBT"
+_PREFIX = struct.Struct(">3sBI")
+_ZSTD_LEVEL = 3
+
+
+class StorageFormatError(ValueError):
+    pass
+
+
+def encode_result(
+    result: TranslationResult, meta: dict[str, Any] | None = None
+) -> bytes:
+    data = result.model_dump(mode="json")
+    paragraphs = data.pop("paragraphs")
+    names = list(paragraphs[0]) if paragraphs else []
+    columns: dict[str, list[Any]] = {
+        name: [p[name] for p in paragraphs] for name in names
+    }
+    if "image" in columns:
+        columns["image"] = [
+            base64.b64decode(image) if image is not None else None
+            for image in columns["image"]
+        ]
+    data["paragraphs"] = columns
+    data["paragraph_count"] = len(paragraphs)
+
+    header = {
+        "id": data["id"],
+        "filename": data["filename"],
+        "created_at": data["created_at"],
+        "paragraph_count": len(paragraphs),
+        "usage": data["usage"],
+        **(meta or {}),
+    }
+    header_bytes = msgpack.packb(header, use_bin_type=True)
+    body = zstandard.ZstdCompressor(level=_ZSTD_LEVEL).compress(
+        msgpack.packb(data, use_bin_type=True)
+    )
+    return _PREFIX.pack(_MAGIC, FORMAT_VERSION, len(header_bytes)) + header_bytes + body
+
+
+def decode_result(blob: bytes) -> TranslationResult:
+    header_end = _header_end(blob[: _PREFIX.size])
+    try:
+        data = msgpack.unpackb(
+            zstandard.ZstdDecompressor().decompress(blob[header_end:]), raw=False
+        )
+    except (zstandard.ZstdError, ValueError) as e:
+        raise StorageFormatError("Corrupted translation body") from e
+    columns: dict[str, list[Any]] = data.pop("paragraphs")
+    count = data.pop("paragraph_count")
+    if "image" in columns:
+        columns["image"] = [
+            base64.b64encode(image).decode("ascii") if image is not None else None
+            for image in columns["image"]
+        ]
+    data["paragraphs"] = [
+        {name: values[i] for name, values in columns.items()} for i in range(count)
+    ]
+    return TranslationResult.model_validate(data)
+
+
+def decode_header(blob: bytes) -> dict[str, Any]:
+    header_end = _header_end(blob[: _PREFIX.size])
+    return msgpack.unpackb(blob[_PREFIX.size : header_end], raw=False)
+
+
+def replace_header(blob: bytes, header: dict[str, Any]) -> bytes:
+    """Swap the header of an encoded file, reusing the compressed body as-is."""
+    header_end = _header_end(blob[: _PREFIX.size])
+    header_bytes = msgpack.packb(header, use_bin_type=True)
+    return (
+        _PREFIX.pack(_MAGIC, FORMAT_VERSION, len(header_bytes))
+        + header_bytes
+        + blob[header_end:]
+    )
+
+
+def read_header(path: Path) -> dict[str, Any]:
+    """Read only the summary header, without touching the compressed body."""
+    with path.open("rb") as f:
+        prefix = f.read(_PREFIX.size)
+        header_end = _header_end(prefix)
+        return msgpack.unpackb(f.read(header_end - _PREFIX.size), raw=False)
+
+
+def _header_end(prefix: bytes) -> int:
+    if len(prefix) < _PREFIX.size:
+        raise StorageFormatError("Truncated translation file")
+    magic, version, header_length = _PREFIX.unpack(prefix)
+    if magic != _MAGIC:
+        raise StorageFormatError("Not a translation file")
+    if version > FORMAT_VERSION:
+        raise StorageFormatError(f"Unsupported translation format version {version}")
+    return _PREFIX.size + header_length
@@ -0,0 +1,121 @@
+import logging
+import time
+from dataclasses import dataclass
+
+from src.core.exceptions import NotFoundError
+from src.services.translation_store import StoredEntry, TranslationStore
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StorageQuota:
+    """Limits for the translation store; ``None`` means unlimited.
+
+    ``max_age_seconds`` counts from a translation's last access, so documents
+    still being read stay regardless of when they were created.
+    """
+
+    max_bytes: int | None = None
+    max_documents: int | None = None
+    max_age_seconds: float | None = None
+    orphan_grace_seconds: float = 3600.0
+
+
+@dataclass
+class CompactionReport:
+    orphans_removed: int = 0
+    uploads_dropped: int = 0
+    translations_evicted: int = 0
+    bytes_used: int = 0
+
+
+class StorageCompactor:
+    """Keep a ``TranslationStore`` within its ``StorageQuota``.
+
+    Each pass removes orphaned upload data, evicts translations past the
+    age or count limits, and then, while the store is over its byte budget,
+    drops the least recently accessed original uploads before evicting
+    whole translations in least-recently-accessed order.
+    """
+
+    def __init__(self, store: TranslationStore, quota: StorageQuota) -> None:
+        self._store = store
+        self._quota = quota
+
+    def compact(self) -> CompactionReport:
+        with self._store.maintenance_lock():
+            return self._compact(time.time())
+
+    def _compact(self, now: float) -> CompactionReport:
+        quota = self._quota
+        report = CompactionReport(
+            orphans_removed=self._store.remove_orphans(
+                now - quota.orphan_grace_seconds
+            )
+        )
+        entries = sorted(self._store.usage(), key=lambda e: e.accessed_at)
+
+        if quota.max_age_seconds is not None:
+            cutoff = now - quota.max_age_seconds
+            expired = [e for e in entries if e.accessed_at < cutoff]
+            entries = entries[len(expired) :]
+            report.translations_evicted += self._evict(expired)
+
+        if quota.max_documents is not None and len(entries) > quota.max_documents:
+            excess = len(entries) - quota.max_documents
+            report.translations_evicted += self._evict(entries[:excess])
+            entries = entries[excess:]
+
+        # One walk of the store, then each removal subtracts what it freed.
+        report.bytes_used = self._store.disk_usage()
+        if quota.max_bytes is None or report.bytes_used <= quota.max_bytes:
+            return report
+
+        for upload_entries in self._uploads_by_access(entries):
+            if report.bytes_used <= quota.max_bytes:
+                break
+            dropped = 0
+            for entry in upload_entries:
+                if self._store.drop_upload(entry.translation_id):
+                    dropped += 1
+            report.uploads_dropped += dropped
+            if dropped == len(upload_entries):
+                report.bytes_used -= upload_entries[0].upload_size
+
+        for entry in entries:
+            if report.bytes_used <= quota.max_bytes:
+                break
+            if self._evict([entry]):
+                report.translations_evicted += 1
+                report.bytes_used -= entry.size
+
+        if report.bytes_used > quota.max_bytes:
+            logger.warning(
+                "Storage still over quota after compaction: %d > %d bytes",
+                report.bytes_used,
+                quota.max_bytes,
+            )
+        return report
+
+    def _uploads_by_access(
+        self, entries: list[StoredEntry]
+    ) -> list[list[StoredEntry]]:
+        # A deduplicated blob is only freed once every translation using it
+        # lets go, so entries are grouped by blob and ordered by blob access.
+        groups: dict[str, list[StoredEntry]] = {}
+        for entry in entries:
+            if entry.upload is not None and entry.upload_accessed_at is not None:
+                groups.setdefault(entry.upload.path, []).append(entry)
+        return sorted(groups.values(), key=lambda g: g[0].upload_accessed_at or 0.0)
+
+    def _evict(self, entries: list[StoredEntry]) -> int:
+        evicted = 0
+        for entry in entries:
+            try:
+                self._store.delete(entry.translation_id)
+            except NotFoundError:
+                continue
+            logger.info("Evicted translation %s", entry.translation_id)
+            evicted += 1
+        return evicted
@@ -0,0 +1,85 @@
+"""Cell-level access to the sanitized HTML stored for TABLE paragraphs.
+
+The parsers only ever store tables through ``_sanitize_table_html`` (or the
+equivalent escaping in the streaming DOCX parser), so the markup is a flat
+run of safe table tags with escaped text between them. Splitting on tags is
+therefore enough to find every cell's text and put a translation back in
+its place without touching the structure.
+"""
+
+import re
+from html import escape as html_escape
+from html import unescape as html_unescape
+from html.parser import HTMLParser
+
+_TAG = re.compile(r"(<[^>]*>)")
+
+
+class TableTemplate:
+    """A table's markup with its cell texts lifted out."""
+
+    def __init__(self, html: str) -> None:
+        # Even positions are text, odd positions are tags.
+        self._parts = _TAG.split(html)
+        self._slots = [
+            i for i in range(0, len(self._parts), 2) if self._parts[i].strip()
+        ]
+
+    @property
+    def cells(self) -> list[str]:
+        return [html_unescape(self._parts[i]).strip() for i in self._slots]
+
+    def render(self, texts: list[str]) -> str:
+        """The same table with ``texts`` in place of ``cells``."""
+        parts = list(self._parts)
+        for slot, text in zip(self._slots, texts):
+            parts[slot] = html_escape(text)
+        return "".join(parts)
+
+
+class _RowReader(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__()
+        self.rows: list[list[tuple[str, int]]] = []
+        self.caption: list[str] = []
+        self._cell: list[str] | None = None
+        self._colspan = 1
+        self._in_caption = False
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag == "tr":
+            self.rows.append([])
+        elif tag in ("td", "th"):
+            if not self.rows:
+                self.rows.append([])
+            self._cell = []
+            span = dict(attrs).get("colspan") or "1"
+            self._colspan = int(span) if span.isdigit() and int(span) > 0 else 1
+        elif tag == "caption":
+            self._in_caption = True
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in ("td", "th") and self._cell is not None:
+            self.rows[-1].append(("".join(self._cell).strip(), self._colspan))
+            self._cell = None
+        elif tag == "caption":
+            self._in_caption = False
+
+    def handle_data(self, data: str) -> None:
+        if self._cell is not None:
+            self._cell.append(data)
+        elif self._in_caption:
+            self.caption.append(data)
+
+
+def table_rows(html: str) -> list[list[tuple[str, int]]]:
+    """Rows of ``(text, colspan)`` cells; a caption becomes a first row."""
+    reader = _RowReader()
+    reader.feed(html)
+    reader.close()
+    rows = [row for row in reader.rows if row]
+    caption = "".join(reader.caption).strip()
+    if caption:
+        width = max((sum(span for _, span in row) for row in rows), default=1)
+        rows.insert(0, [(caption, width)])
+    return rows
@@ -0,0 +1,224 @@
+"""Token accounting for OpenAI calls and the budgets that cap it.
+
+Every call's usage is appended to a per-day JSON Lines file under the
+ledger directory, shared by all workers: appends are single ``O_APPEND``
+writes, and each worker keeps a running total per day that it extends by
+reading only what other workers appended since its last look.
+
+A ``UsageMeter`` follows one translation run. Before each call it reserves
+an estimate against the document and daily budgets and refuses the call if
+either would be exceeded; afterwards it swaps the estimate for the usage the
+API reported.
+
+Day files older than ``retention_days`` are deleted as a new day's first
+call is recorded.
+"""
+
+import json
+import os
+import threading
+from contextlib import suppress
+from datetime import UTC, date, datetime, time, timedelta
+from pathlib import Path
+from typing import Any
+
+from src.core.exceptions import TokenBudgetExceededError
+from src.models.translation import DailyTokenUsage, TokenUsage, TokenUsageReport
+
+# UTF-8 bytes per token, erring high: English averages about four, while a
+# CJK character is three bytes and usually a token or more.
+_BYTES_PER_TOKEN = 3
+
+
+def estimate_request_tokens(request: dict[str, Any]) -> int:
+    """Generous guess at a chat request's prompt plus completion tokens."""
+    messages = request["messages"]
+    prompt = sum(estimate_text_tokens(m["content"]) for m in messages)
+    # A translation comes back about as long as the text it was given.
+    return prompt + estimate_text_tokens(messages[-1]["content"])
+
+
+def estimate_text_tokens(text: str) -> int:
+    """Generous guess at the tokens in ``text``, for any script."""
+    return len(text.encode("utf-8")) // _BYTES_PER_TOKEN + 1
+
+
+def parse_usage(usage: Any) -> TokenUsage | None:
+    """Read an API ``usage`` block, from the SDK or from raw batch JSON."""
+    prompt = _field(usage, "prompt_tokens")
+    completion = _field(usage, "completion_tokens")
+    if not isinstance(prompt, int) or not isinstance(completion, int):
+        return None
+    cached = _field(_field(usage, "prompt_tokens_details"), "cached_tokens")
+    return TokenUsage(
+        prompt_tokens=prompt,
+        completion_tokens=completion,
+        cached_tokens=cached if isinstance(cached, int) else 0,
+    )
+
+
+def _field(obj: Any, name: str) -> Any:
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+class UsageLedger:
+    def __init__(
+        self,
+        directory: Path,
+        daily_budget: int | None = None,
+        retention_days: int | None = None,
+    ) -> None:
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._daily_budget = daily_budget
+        self._retention_days = retention_days
+        self._pruned: date | None = None
+        self._lock = threading.Lock()
+        # day -> (bytes of the file already counted, their total)
+        self._totals: dict[date, tuple[int, TokenUsage]] = {}
+        # Estimates of this worker's calls still in flight.
+        self._reserved = 0
+
+    def record(self, translation_id: str, model: str, usage: TokenUsage) -> None:
+        now = datetime.now(UTC)
+        line = json.dumps(
+            {
+                "at": now.isoformat(),
+                "translation_id": translation_id,
+                "model": model,
+                **usage.model_dump(),
+            }
+        )
+        fd = os.open(
+            self._path(now.date()), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644
+        )
+        try:
+            os.write(fd, f"{line}\n".encode())
+        finally:
+            os.close(fd)
+        if self._pruned != now.date():
+            self._pruned = now.date()
+            self._prune(now.date())
+
+    def day_total(self, day: date) -> TokenUsage:
+        with self._lock:
+            offset, total = self._totals.get(day, (0, TokenUsage()))
+            try:
+                with self._path(day).open("rb") as f:
+                    f.seek(offset)
+                    appended = f.read()
+            except FileNotFoundError:
+                return total
+            # A line still being written by another worker is left for later.
+            complete = appended[: appended.rfind(b"\n") + 1]
+            for line in complete.splitlines():
+                entry = json.loads(line)
+                total += TokenUsage(
+                    prompt_tokens=entry["prompt_tokens"],
+                    completion_tokens=entry["completion_tokens"],
+                    cached_tokens=entry["cached_tokens"],
+                )
+            self._totals[day] = (offset + len(complete), total)
+            return total
+
+    def reserve(self, estimate: int) -> None:
+        if self._daily_budget is None:
+            return
+        now = datetime.now(UTC)
+        spent = self.day_total(now.date()).total_tokens
+        with self._lock:
+            if spent + self._reserved + estimate > self._daily_budget:
+                midnight = datetime.combine(
+                    now.date() + timedelta(days=1), time(), tzinfo=UTC
+                )
+                raise TokenBudgetExceededError(
+                    f"The daily budget of {self._daily_budget} tokens is used up",
+                    retry_after=int((midnight - now).total_seconds()) + 1,
+                )
+            self._reserved += estimate
+
+    def release(self, estimate: int) -> None:
+        if self._daily_budget is None:
+            return
+        with self._lock:
+            self._reserved -= estimate
+
+    def report(self, days: int) -> TokenUsageReport:
+        today = datetime.now(UTC).date()
+        daily = [
+            DailyTokenUsage(day=day, usage=self.day_total(day))
+            for day in (today - timedelta(days=n) for n in range(days))
+        ]
+        total = TokenUsage()
+        for entry in daily:
+            total += entry.usage
+        return TokenUsageReport(
+            total=total, days=daily, daily_budget=self._daily_budget
+        )
+
+    def _path(self, day: date) -> Path:
+        return self._directory / f"{day.isoformat()}.jsonl"
+
+    def _prune(self, today: date) -> None:
+        if self._retention_days is None:
+            return
+        cutoff = today - timedelta(days=self._retention_days)
+        for path in self._directory.glob("*.jsonl"):
+            try:
+                day = date.fromisoformat(path.stem)
+            except ValueError:
+                continue
+            if day < cutoff:
+                with suppress(FileNotFoundError):
+                    path.unlink()
+                with self._lock:
+                    self._totals.pop(day, None)
+
+
+class UsageMeter:
+    """Token spend of one translation run, checked against its budgets."""
+
+    def __init__(
+        self,
+        translation_id: str,
+        ledger: UsageLedger | None = None,
+        budget: int | None = None,
+    ) -> None:
+        self.translation_id = translation_id
+        self._ledger = ledger
+        self._budget = budget
+        self._reserved = 0
+        self.usage = TokenUsage()
+
+    def reserve(self, estimate: int) -> None:
+        """Claim ``estimate`` tokens for a call about to be made.
+
+        Raises ``TokenBudgetExceededError`` instead if the call could take
+        the document or the day over its budget.
+        """
+        if (
+            self._budget is not None
+            and self.usage.total_tokens + self._reserved + estimate > self._budget
+        ):
+            raise TokenBudgetExceededError(
+                f"Translation stopped: it would exceed its budget of "
+                f"{self._budget} tokens"
+            )
+        if self._ledger is not None:
+            self._ledger.reserve(estimate)
+        self._reserved += estimate
+
+    def settle(self, estimate: int, model: str, usage: TokenUsage | None) -> None:
+        """Replace a reservation with what the call actually used."""
+        self._reserved -= estimate
+        if self._ledger is not None:
+            self._ledger.release(estimate)
+        if usage is None:
+            return
+        self.usage += usage
+        if self._ledger is not None:
+            self._ledger.record(self.translation_id, model, usage)
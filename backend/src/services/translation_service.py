@@ -1,27 +1,325 @@
 import asyncio
+import hashlib
+import logging
+import threading
+from collections import Counter
+from collections.abc import AsyncIterator, Callable
+from contextlib import AbstractAsyncContextManager, aclosing, nullcontext
 from pathlib import Path
+from typing import TYPE_CHECKING
+from uuid import UUID, uuid4
 
-from openai import AsyncOpenAI
-
+from src.core.exceptions import ConflictError, InputValidationError
 from src.models.translation import (
+    ExportLayout,
     ParagraphStyle,
+    TokenUsageReport,
     TranslatedParagraph,
+    TranslationChanges,
     TranslationDirection,
     TranslationResult,
     TranslationSummary,
 )
-from src.services.chunker import group_paragraphs
-from src.services.document_parser import DocumentParser, ParsedParagraph
-from src.services.translation_store import TranslationStore
+from src.services.admission import AdmissionController
+from src.services.bulk_translation import (
+    BatchBackend,
+    BulkTranslationJob,
+    OpenAIBatchBackend,
+)
+from src.services.checkpoints import CheckpointJournal, DocumentCheckpoint
+from src.services.chunker import ParagraphGrouper
+from src.services.circuit_breaker import CircuitBreakerPolicy
+from src.services.document_parser import (
+    DocumentParser,
+    ParsedParagraph,
+    preload_backends,
+)
+from src.services.hedging import RequestHedger
+from src.services.model_routing import ModelRouter
+from src.services.parser_pool import ParserPool
+from src.services.pipeline import iterate_in_thread
+from src.services.retry_policy import RetryPolicy, is_transient
+from src.services.segment_filter import is_passthrough
+from src.services.storage_quota import CompactionReport, StorageCompactor, StorageQuota
+from src.services.table_cells import TableTemplate
+from src.services.token_usage import UsageLedger, UsageMeter
+from src.services.translation_store import StoredResponse, TranslationStore
 from src.services.translation_strategy import (
     BatchTranslationStrategy,
-    TranslationStrategy,
+    ItemCallback,
+    PartialTranslationError,
     detect_language,
+    is_detection_sample_complete,
 )
 from src.services.word_exporter import WordExporter
 
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
 _NON_TRANSLATABLE_STYLES = frozenset({ParagraphStyle.FIGURE, ParagraphStyle.TABLE})
 
+# Parsed paragraphs allowed to wait for translation before parsing pauses.
+_PARSE_BUFFER = 256
+
+ParagraphCallback = Callable[[int, TranslatedParagraph], None]
+"""Receives ``(document_index, paragraph)`` as each paragraph is finished."""
+
+GroupRoute = Callable[[list[ParsedParagraph]], BatchTranslationStrategy]
+"""Returns the strategy, and so the model, that translates a group."""
+
+
+class _TableSlots:
+    """Cell translations of one TABLE paragraph, filled as they arrive."""
+
+    def __init__(self, template: TableTemplate) -> None:
+        self.template = template
+        cells = template.cells
+        self.translations: list[str | None] = [None] * len(cells)
+        self.models: list[str | None] = [None] * len(cells)
+        self.failed = False
+
+    @property
+    def complete(self) -> bool:
+        return all(t is not None for t in self.translations)
+
+    def paragraph(self, original: str) -> TranslatedParagraph:
+        # Cells can land in groups routed to different models; the table is
+        # attributed to the one that translated most of them.
+        models = Counter(m for m in self.models if m is not None)
+        return TranslatedParagraph(
+            original=original,
+            translated=self.template.render(
+                [t for t in self.translations if t is not None]
+            ),
+            style=ParagraphStyle.TABLE,
+            model=models.most_common(1)[0][0] if models else None,
+            failed=self.failed,
+        )
+
+
+class _DocumentPlan:
+    """Decide which paragraphs need the API and fan translations back out.
+
+    Figures stay untranslated, pass-through segments are copied as-is and
+    repeated texts are sent once, then filled in at every position. Table
+    cells are sent like paragraphs, packed into the same groups and shared
+    with identical texts elsewhere, and each table is rebuilt once its last
+    cell is back. Paragraphs can be added as they are parsed: ``add()``
+    returns the translation groups each one completes and ``finish()`` the
+    last ones. A group whose translation keeps failing is flagged rather
+    than failing the document.
+    """
+
+    def __init__(self, on_paragraph: ParagraphCallback | None = None) -> None:
+        self._on_paragraph = on_paragraph
+        self._parsed: list[ParsedParagraph] = []
+        self._paragraphs: list[TranslatedParagraph | None] = []
+        self._positions: dict[str, list[int]] = {}
+        # Table cells waiting for a text: (paragraph index, cell number).
+        self._cells: dict[str, list[tuple[int, int]]] = {}
+        self._tables: dict[int, _TableSlots] = {}
+        # Texts already handed to the grouper.
+        self._queued: set[str] = set()
+        # source -> (translation, model, failed)
+        self._translations: dict[str, tuple[str, str | None, bool]] = {}
+        self._grouper = ParagraphGrouper()
+        self.groups: list[list[ParsedParagraph]] = []
+
+    @classmethod
+    def from_parsed(
+        cls,
+        parsed: list[ParsedParagraph],
+        on_paragraph: ParagraphCallback | None = None,
+    ) -> "_DocumentPlan":
+        plan = cls(on_paragraph)
+        for para in parsed:
+            plan.add(para)
+        plan.finish()
+        return plan
+
+    def add(self, para: ParsedParagraph) -> list[list[ParsedParagraph]]:
+        index = len(self._parsed)
+        self._parsed.append(para)
+        self._paragraphs.append(None)
+        if para.style is ParagraphStyle.TABLE:
+            return self._add_table(index, para.text)
+        if para.style in _NON_TRANSLATABLE_STYLES:
+            self._emit(
+                index,
+                TranslatedParagraph(
+                    original=para.text,
+                    translated="",
+                    style=para.style,
+                    image=para.image_base64,
+                ),
+            )
+            # Still grouped so figures split the groups around them.
+            return self._collect(self._grouper.add(para))
+        if is_passthrough(para.text):
+            self._emit(
+                index,
+                TranslatedParagraph(
+                    original=para.text, translated=para.text, style=para.style
+                ),
+            )
+            return []
+        self._positions.setdefault(para.text, []).append(index)
+        return self._request(para)
+
+    def _add_table(self, index: int, html: str) -> list[list[ParsedParagraph]]:
+        table = _TableSlots(TableTemplate(html))
+        self._tables[index] = table
+        groups: list[list[ParsedParagraph]] = []
+        for number, text in enumerate(table.template.cells):
+            if is_passthrough(text):
+                table.translations[number] = text
+                continue
+            self._cells.setdefault(text, []).append((index, number))
+            groups.extend(
+                self._request(ParsedParagraph(text=text, style=ParagraphStyle.NORMAL))
+            )
+        if table.complete and self._paragraphs[index] is None:
+            self._emit(index, table.paragraph(html))
+        return groups
+
+    def _request(self, para: ParsedParagraph) -> list[list[ParsedParagraph]]:
+        if para.text in self._translations:
+            self._fill(para.text, *self._translations[para.text])
+            return []
+        if para.text in self._queued:
+            return []
+        self._queued.add(para.text)
+        return self._collect(self._grouper.add(para))
+
+    def finish(self) -> list[list[ParsedParagraph]]:
+        return self._collect(self._grouper.finish())
+
+    async def translate(
+        self, group: list[ParsedParagraph], strategy: BatchTranslationStrategy
+    ) -> list[str] | None:
+        """Translate ``group`` into the plan; None if any of it was flagged.
+
+        Only transient API errors that outlasted the strategy's retries are
+        absorbed, and only the batches they hit are flagged as failed;
+        anything else still aborts the document.
+        """
+        texts = [p.text for p in group]
+        try:
+            translated = await strategy.translate(
+                texts, on_item=self.item_callback(group, strategy)
+            )
+        except PartialTranslationError as exc:
+            # Keep the batches that came back; flag only the failed ones.
+            logger.warning(
+                "Flagging %d paragraphs as failed after %s",
+                exc.translated.count(None),
+                exc.cause,
+            )
+            self.fill_partial(group, exc.translated, strategy)
+            return None
+        except Exception as exc:
+            if not is_transient(exc):
+                raise
+            logger.warning(
+                "Flagging %d paragraphs as failed after %s", len(group), exc
+            )
+            self.fail(group)
+            return None
+        self.fill(group, translated, strategy)
+        return translated
+
+    def fail(self, group: list[ParsedParagraph]) -> None:
+        for member in group:
+            # Items streamed before the failure keep their translation.
+            if member.text not in self._translations:
+                self._fill(member.text, "", None, failed=True)
+
+    def fill(
+        self,
+        group: list[ParsedParagraph],
+        translated: list[str],
+        strategy: BatchTranslationStrategy,
+    ) -> None:
+        self.restore(group, translated, [strategy.model_for(p.text) for p in group])
+
+    def fill_partial(
+        self,
+        group: list[ParsedParagraph],
+        translated: list[str | None],
+        strategy: BatchTranslationStrategy,
+    ) -> None:
+        """Fill the items that were translated and flag the None ones."""
+        for member, text in zip(group, translated):
+            if text is not None:
+                self._fill(member.text, text, strategy.model_for(member.text))
+        self.fail([m for m, t in zip(group, translated) if t is None])
+
+    def restore(
+        self,
+        group: list[ParsedParagraph],
+        translated: list[str],
+        models: list[str | None],
+    ) -> None:
+        """Fill a group from translations made earlier, e.g. a checkpoint."""
+        for member, text, model in zip(group, translated, models):
+            self._fill(member.text, text, model)
+
+    def item_callback(
+        self, group: list[ParsedParagraph], strategy: BatchTranslationStrategy
+    ) -> ItemCallback | None:
+        if self._on_paragraph is None:
+            return None
+        return lambda index, text: self._fill(
+            group[index].text, text, strategy.model_for(group[index].text)
+        )
+
+    def result(self) -> list[TranslatedParagraph]:
+        return [p for p in self._paragraphs if p is not None]
+
+    def _collect(
+        self, groups: list[list[ParsedParagraph]]
+    ) -> list[list[ParsedParagraph]]:
+        translatable = [
+            group for group in groups if group[0].style not in _NON_TRANSLATABLE_STYLES
+        ]
+        self.groups.extend(translatable)
+        return translatable
+
+    def _fill(
+        self, source: str, translated: str, model: str | None, failed: bool = False
+    ) -> None:
+        # A text filled again with a different translation (a streamed item
+        # corrected by the batch's final result) replaces what was emitted.
+        self._translations[source] = (translated, model, failed)
+        for index, number in self._cells.get(source, ()):
+            table = self._tables[index]
+            if (table.translations[number], table.models[number]) != (
+                translated,
+                model,
+            ):
+                table.translations[number] = translated
+                table.models[number] = model
+                table.failed = table.failed or failed
+                if table.complete:
+                    self._emit(index, table.paragraph(self._parsed[index].text))
+        for index in self._positions.get(source, ()):
+            paragraph = TranslatedParagraph(
+                original=source,
+                translated=translated,
+                style=self._parsed[index].style,
+                model=model,
+                failed=failed,
+            )
+            if self._paragraphs[index] != paragraph:
+                self._emit(index, paragraph)
+
+    def _emit(self, index: int, paragraph: TranslatedParagraph) -> None:
+        self._paragraphs[index] = paragraph
+        if self._on_paragraph is not None:
+            self._on_paragraph(index, paragraph)
+
 
 class TranslationService:
     def __init__(
@@ -30,112 +328,567 @@ class TranslationService:
         openai_api_key: str,
         openai_model: str,
         vision_agent_api_key: str | None = None,
+        openai_fast_model: str | None = None,
+        fast_model_max_tokens: int = 80,
+        bulk_backend: BatchBackend | None = None,
+        bulk_poll_interval: float = 30.0,
+        hedger: RequestHedger | None = None,
+        stream: bool = False,
+        parser_pool: ParserPool | None = None,
+        admission: AdmissionController | None = None,
+        quota: StorageQuota | None = None,
+        cache_bytes: int = 0,
+        document_token_budget: int | None = None,
+        daily_token_budget: int | None = None,
+        usage_retention_days: int | None = None,
+        ade_deadline: float | None = None,
+        ade_breaker: CircuitBreakerPolicy | None = None,
+        checkpoint_max_age: float | None = None,
+        retry: RetryPolicy | None = None,
     ) -> None:
-        self._parser = DocumentParser(vision_agent_api_key)
-        self._store = TranslationStore(storage_dir=storage_dir)
+        self._parser = DocumentParser(vision_agent_api_key, ade_deadline, ade_breaker)
+        self._store = TranslationStore(
+            storage_dir=storage_dir, cache_bytes=cache_bytes
+        )
         self._exporter = WordExporter()
-        self._client = AsyncOpenAI(api_key=openai_api_key)
-        self._model = openai_model
+        self._openai_api_key = openai_api_key
+        self._openai_client: AsyncOpenAI | None = None
+        # warm_up() builds the client in a thread while requests may need it.
+        self._client_lock = threading.Lock()
+        self._router = ModelRouter(
+            main_model=openai_model,
+            fast_model=openai_fast_model,
+            fast_max_tokens=fast_model_max_tokens,
+        )
+        self._bulk_backend = bulk_backend
+        self._bulk_poll_interval = bulk_poll_interval
+        self._hedger = hedger
+        self._retry = retry
+        self._stream = stream
+        self._parser_pool = parser_pool
+        self._admission = admission
+        self._compactor = (
+            StorageCompactor(self._store, quota) if quota is not None else None
+        )
+        self._ledger = UsageLedger(
+            Path(storage_dir) / "usage", daily_token_budget, usage_retention_days
+        )
+        self._document_token_budget = document_token_budget
+        self._checkpoints = CheckpointJournal(
+            Path(storage_dir) / "checkpoints", checkpoint_max_age
+        )
+
+    @property
+    def _client(self) -> "AsyncOpenAI":
+        with self._client_lock:
+            if self._openai_client is None:
+                from openai import AsyncOpenAI
+
+                self._openai_client = AsyncOpenAI(api_key=self._openai_api_key)
+            return self._openai_client
+
+    def warm_up(self) -> None:
+        """Import parsing backends and build API clients ahead of traffic."""
+        preload_backends()
+        self._client  # noqa: B018
+        self._parser.warm_up()
+        if self._parser_pool is not None:
+            self._parser_pool.warm_up()
+
+    async def aclose(self) -> None:
+        with self._client_lock:
+            client, self._openai_client = self._openai_client, None
+        if client is not None:
+            await client.close()
+        self._parser.close()
+        if self._parser_pool is not None:
+            await asyncio.to_thread(self._parser_pool.shutdown)
 
     def _make_strategy(
         self,
         direction: TranslationDirection,
+        meter: UsageMeter | None = None,
+        model: str | None = None,
+        repair_model: str | None = None,
     ) -> BatchTranslationStrategy:
         return BatchTranslationStrategy(
             client=self._client,
-            model=self._model,
+            model=model or self._router.main_model,
             direction=direction,
+            hedger=self._hedger,
+            stream=self._stream,
+            meter=meter,
+            repair_model=repair_model or self._router.light_model,
+            retry=self._retry,
+        )
+
+    def _route(self, direction: TranslationDirection, meter: UsageMeter) -> GroupRoute:
+        strategies: dict[str, BatchTranslationStrategy] = {}
+
+        def _strategy(group: list[ParsedParagraph]) -> BatchTranslationStrategy:
+            model = self._router.route(group)
+            if model not in strategies:
+                strategies[model] = self._make_strategy(direction, meter, model)
+            return strategies[model]
+
+        return _strategy
+
+    def _meter(self, translation_id: UUID) -> UsageMeter:
+        return UsageMeter(
+            str(translation_id), self._ledger, self._document_token_budget
         )
 
     async def translate_document(
-        self, file_content: bytes, filename: str
+        self,
+        file_content: bytes,
+        filename: str,
+        on_paragraph: ParagraphCallback | None = None,
     ) -> TranslationResult:
-        parsed = await asyncio.to_thread(self._parser.parse, file_content, filename)
-        texts = [p.text for p in parsed if p.style not in _NON_TRANSLATABLE_STYLES]
-        direction = await detect_language(self._client, self._model, texts)
-        strategy = self._make_strategy(direction)
-        paragraphs = await self._translate_parsed(parsed, strategy)
-        result = TranslationResult(
-            filename=filename,
-            paragraphs=paragraphs,
-            direction=direction,
+        async with self._admit(len(file_content)):
+            translation_id = uuid4()
+            # Groups finished by an earlier run of the same upload, one that
+            # crashed or was killed before saving, are not paid for twice.
+            checkpoint = await asyncio.to_thread(
+                self._checkpoints.open, hashlib.sha256(file_content).hexdigest()
+            )
+            try:
+                meter = self._meter(translation_id)
+                meter.usage = checkpoint.usage
+                direction, paragraphs = await self._translate_pipelined(
+                    self._iter_parsed(file_content, filename),
+                    meter,
+                    on_paragraph,
+                    checkpoint,
+                )
+                result = TranslationResult(
+                    id=translation_id,
+                    filename=filename,
+                    paragraphs=paragraphs,
+                    direction=direction,
+                    usage=meter.usage,
+                )
+                await self._persist(result, file_content)
+                await asyncio.to_thread(checkpoint.discard)
+            finally:
+                checkpoint.close()
+        return result
+
+    async def _translate_pipelined(
+        self,
+        parsed: AsyncIterator[ParsedParagraph],
+        meter: UsageMeter,
+        on_paragraph: ParagraphCallback | None = None,
+        checkpoint: DocumentCheckpoint | None = None,
+    ) -> tuple[TranslationDirection, list[TranslatedParagraph]]:
+        """Translate groups while later pages are still being parsed.
+
+        Language detection starts once its sample is complete and each group
+        is sent as soon as the grouper closes it, so the total time tends
+        towards the slower of parsing and translating rather than their sum.
+        With a ``checkpoint``, each finished group is recorded in it, and
+        its direction and recorded groups are used instead of the API.
+        """
+        plan = _DocumentPlan(on_paragraph)
+        known = checkpoint.direction if checkpoint is not None else None
+        sample: list[str] = []
+        detection: asyncio.Task[TranslationDirection] | None = None
+        direction: TranslationDirection | None = None
+        route: GroupRoute | None = None
+        # Groups completed before the direction is known, in document order.
+        pending: list[list[ParsedParagraph]] = []
+        translations: list[asyncio.Task[None]] = []
+        # Checkpoint appends in worker threads, finished even if the run fails.
+        recording: list[asyncio.Future[None]] = []
+
+        async def _translate_group(
+            strategy: BatchTranslationStrategy, group: list[ParsedParagraph]
+        ) -> None:
+            translated = await plan.translate(group, strategy)
+            # Failed groups stay out of the checkpoint so a resume retries them.
+            if translated is None or checkpoint is None or direction is None:
+                return
+            texts = [p.text for p in group]
+            record = asyncio.ensure_future(
+                asyncio.to_thread(
+                    checkpoint.record,
+                    direction,
+                    texts,
+                    translated,
+                    [strategy.model_for(text) for text in texts],
+                    meter.usage,
+                )
+            )
+            recording.append(record)
+            await asyncio.shield(record)
+
+        def _dispatch(groups: list[list[ParsedParagraph]]) -> None:
+            if route is None:
+                pending.extend(groups)
+                return
+            for group in groups:
+                restored = (
+                    checkpoint.lookup([p.text for p in group])
+                    if checkpoint is not None
+                    else None
+                )
+                if restored is not None:
+                    plan.restore(group, *restored)
+                else:
+                    translations.append(
+                        asyncio.create_task(_translate_group(route(group), group))
+                    )
+
+        def _use_direction(detected: TranslationDirection) -> None:
+            nonlocal direction, route
+            if route is None:
+                direction = detected
+                route = self._route(detected, meter)
+                waiting = pending.copy()
+                pending.clear()
+                _dispatch(waiting)
+
+        def _on_detected(task: asyncio.Task[TranslationDirection]) -> None:
+            if not task.cancelled() and task.exception() is None:
+                _use_direction(task.result())
+
+        def _start_detection() -> None:
+            nonlocal detection
+            if detection is None and known is None:
+                detection = asyncio.create_task(
+                    detect_language(
+                        self._client,
+                        self._router.light_model,
+                        sample,
+                        meter,
+                        self._retry,
+                    )
+                )
+                detection.add_done_callback(_on_detected)
+
+        if known is not None:
+            _use_direction(known)
+        try:
+            async with aclosing(parsed):
+                async for para in parsed:
+                    if (
+                        detection is None
+                        and known is None
+                        and para.style not in _NON_TRANSLATABLE_STYLES
+                    ):
+                        sample.append(para.text)
+                        if is_detection_sample_complete(sample):
+                            _start_detection()
+                    _dispatch(plan.add(para))
+            _start_detection()
+            _dispatch(plan.finish())
+            direction = known if known is not None else await detection
+            _use_direction(direction)
+            await asyncio.gather(*translations)
+        except BaseException:
+            for task in (*translations, detection):
+                if task is not None:
+                    task.cancel()
+            # Groups already paid for stay resumable.
+            await asyncio.gather(*recording, return_exceptions=True)
+            raise
+        return direction, plan.result()
+
+    async def _iter_parsed(
+        self, file_content: bytes, filename: str
+    ) -> AsyncIterator[ParsedParagraph]:
+        if self._parser_pool is not None:
+            # Worker processes hand back whole documents.
+            for para in await self._parser_pool.parse(file_content, filename):
+                yield para
+            return
+        async for para in iterate_in_thread(
+            lambda: self._parser.iter_parse(file_content, filename),
+            max_buffered=_PARSE_BUFFER,
+        ):
+            yield para
+
+    async def translate_documents_bulk(
+        self, files: list[tuple[bytes, str]]
+    ) -> list[TranslationResult]:
+        """Translate many documents through one offline Batch API job.
+
+        Meant for archive backfills: results arrive within the batch
+        completion window instead of interactively. Paragraphs that could
+        not be translated are stored flagged as failed, and a document that
+        cannot be stored is left out of the returned results.
+        """
+        # Parse within what the pool accepts at once, or one by one in a
+        # thread; an unbounded gather would have the pool refuse the excess.
+        slots = asyncio.Semaphore(
+            self._parser_pool.capacity if self._parser_pool is not None else 1
         )
-        await asyncio.gather(
-            asyncio.to_thread(self._store.save, result),
-            asyncio.to_thread(
-                self._store.save_upload,
-                str(result.id),
-                filename,
-                file_content,
-            ),
+
+        async def _parse_bounded(
+            content: bytes, filename: str
+        ) -> list[ParsedParagraph]:
+            async with slots:
+                return await self._parse(content, filename)
+
+        parsed_docs = await asyncio.gather(
+            *[_parse_bounded(content, filename) for content, filename in files]
         )
+        meters = [self._meter(uuid4()) for _ in files]
+        directions = await asyncio.gather(
+            *[
+                detect_language(
+                    self._client,
+                    self._router.light_model,
+                    [p.text for p in parsed if p.style not in _NON_TRANSLATABLE_STYLES],
+                    meter,
+                    self._retry,
+                )
+                for parsed, meter in zip(parsed_docs, meters)
+            ]
+        )
+
+        backend = self._bulk_backend or OpenAIBatchBackend(self._client)
+        job = BulkTranslationJob(backend, self._bulk_poll_interval)
+        plans: list[
+            tuple[_DocumentPlan, list[BatchTranslationStrategy], list[int]]
+        ] = []
+        for parsed, direction, meter in zip(parsed_docs, directions, meters):
+            route = self._route(direction, meter)
+            plan = _DocumentPlan.from_parsed(parsed)
+            strategies = [route(g) for g in plan.groups]
+            handles = [
+                job.add(strategy, [p.text for p in g])
+                for strategy, g in zip(strategies, plan.groups)
+            ]
+            plans.append((plan, strategies, handles))
+        await job.run()
+
+        results: list[TranslationResult] = []
+        for (content, filename), direction, meter, (plan, strategies, handles) in zip(
+            files, directions, meters, plans
+        ):
+            # Items whose repair failed come back as None and are flagged.
+            for group, strategy, handle in zip(plan.groups, strategies, handles):
+                plan.fill_partial(group, job.result(handle), strategy)
+            result = TranslationResult(
+                id=meter.translation_id,
+                filename=filename,
+                paragraphs=plan.result(),
+                direction=direction,
+                usage=meter.usage,
+            )
+            # Each document is stored on its own, so one that cannot be
+            # saved does not take the rest of the job's results with it.
+            try:
+                await self._persist(result, content)
+            except OSError:
+                logger.exception("Could not store bulk translation of %s", filename)
+                continue
+            results.append(result)
+        return results
+
+    async def _parse(
+        self, file_content: bytes, filename: str
+    ) -> list[ParsedParagraph]:
+        if self._parser_pool is None:
+            return await asyncio.to_thread(self._parser.parse, file_content, filename)
+        return await self._parser_pool.parse(file_content, filename)
+
+    async def _persist(self, result: TranslationResult, file_content: bytes) -> None:
+        upload = await asyncio.to_thread(
+            self._store.save_upload, str(result.id), result.filename, file_content
+        )
+        await asyncio.to_thread(self._store.save, result, upload)
+
+    async def retranslate(
+        self,
+        translation_id: str,
+        on_paragraph: ParagraphCallback | None = None,
+        upgrade: bool = False,
+        failed_only: bool = False,
+    ) -> TranslationResult:
+        """Translate a stored document again.
+
+        With ``upgrade`` only paragraphs a lighter model translated are
+        re-sent, to the main model; with ``failed_only`` only paragraphs
+        flagged as failed are, routed as usual. Both keep the stored
+        direction and leave the rest of the document as it is.
+        """
+        if upgrade and failed_only:
+            raise InputValidationError(
+                "Choose either upgrade or failed_only for a retranslation"
+            )
+        # The lock is only held to read and to write back, not across the
+        # API calls; a save in between makes this run's result stale.
+        async with self._store.lock(translation_id):
+            existing = await asyncio.to_thread(self._store.load, translation_id)
+            etag = await asyncio.to_thread(self._store.etag, translation_id)
+        source_bytes = sum(len(p.original.encode("utf-8")) for p in existing.paragraphs)
+        async with self._admit(source_bytes):
+            meter = self._meter(existing.id)
+            if upgrade:
+                direction = existing.direction
+                paragraphs = await self._upgrade_paragraphs(
+                    existing, meter, on_paragraph
+                )
+            elif failed_only:
+                direction = existing.direction
+                paragraphs = await self._redo_paragraphs(
+                    existing,
+                    [i for i, p in enumerate(existing.paragraphs) if p.failed],
+                    self._route(direction, meter),
+                    on_paragraph,
+                )
+            else:
+                parsed = [
+                    ParsedParagraph(
+                        text=p.original, style=p.style, image_base64=p.image
+                    )
+                    for p in existing.paragraphs
+                ]
+                texts = [
+                    p.text for p in parsed if p.style not in _NON_TRANSLATABLE_STYLES
+                ]
+                direction = await detect_language(
+                    self._client, self._router.light_model, texts, meter, self._retry
+                )
+                paragraphs = await self._translate_parsed(
+                    parsed, self._route(direction, meter), on_paragraph
+                )
+            result = TranslationResult(
+                id=existing.id,
+                filename=existing.filename,
+                created_at=existing.created_at,
+                paragraphs=paragraphs,
+                direction=direction,
+                # Spend accumulates over every run of the document.
+                usage=existing.usage + meter.usage,
+            )
+        async with self._store.lock(translation_id):
+            current = await asyncio.to_thread(self._store.etag, translation_id)
+            if current != etag:
+                raise ConflictError(
+                    f"Translation '{translation_id}' changed while it was being "
+                    "retranslated; try again"
+                )
+            await asyncio.to_thread(self._store.save, result)
         return result
 
-    async def retranslate(self, translation_id: str) -> TranslationResult:
-        existing = await asyncio.to_thread(self._store.load, translation_id)
-        parsed = [
-            ParsedParagraph(text=p.original, style=p.style, image_base64=p.image)
-            for p in existing.paragraphs
+    async def _upgrade_paragraphs(
+        self,
+        existing: TranslationResult,
+        meter: UsageMeter,
+        on_paragraph: ParagraphCallback | None = None,
+    ) -> list[TranslatedParagraph]:
+        main_model = self._router.main_model
+        # Paragraphs stored before models were recorded have none and are kept.
+        stale = [
+            index
+            for index, p in enumerate(existing.paragraphs)
+            if p.model is not None and p.model != main_model
         ]
-        texts = [p.text for p in parsed if p.style not in _NON_TRANSLATABLE_STYLES]
-        direction = await detect_language(self._client, self._model, texts)
-        strategy = self._make_strategy(direction)
-        paragraphs = await self._translate_parsed(parsed, strategy)
-        result = TranslationResult(
-            id=existing.id,
-            filename=existing.filename,
-            created_at=existing.created_at,
-            paragraphs=paragraphs,
-            direction=direction,
+        strategy = self._make_strategy(
+            existing.direction, meter, model=main_model, repair_model=main_model
         )
-        await asyncio.to_thread(self._store.save, result)
-        return result
+        return await self._redo_paragraphs(
+            existing, stale, lambda _group: strategy, on_paragraph
+        )
+
+    async def _redo_paragraphs(
+        self,
+        existing: TranslationResult,
+        indices: list[int],
+        route: GroupRoute,
+        on_paragraph: ParagraphCallback | None = None,
+    ) -> list[TranslatedParagraph]:
+        """Translate the paragraphs at ``indices`` again, keeping the others."""
+        on_redone: ParagraphCallback | None = None
+        if on_paragraph is not None:
+            # Report positions in the whole document, not in the subset.
+            def on_redone(index: int, paragraph: TranslatedParagraph) -> None:
+                on_paragraph(indices[index], paragraph)
+
+        redone = await self._translate_parsed(
+            [
+                ParsedParagraph(
+                    text=existing.paragraphs[i].original,
+                    style=existing.paragraphs[i].style,
+                )
+                for i in indices
+            ],
+            route,
+            on_redone,
+        )
+        paragraphs = list(existing.paragraphs)
+        for index, paragraph in zip(indices, redone):
+            paragraphs[index] = paragraph
+        return paragraphs
+
+    def _admit(self, cost_bytes: int) -> AbstractAsyncContextManager[None]:
+        if self._admission is None:
+            return nullcontext()
+        return self._admission.admit(cost_bytes)
 
     async def _translate_parsed(
         self,
         parsed: list[ParsedParagraph],
-        strategy: TranslationStrategy,
+        route: GroupRoute,
+        on_paragraph: ParagraphCallback | None = None,
     ) -> list[TranslatedParagraph]:
-        groups = group_paragraphs(parsed)
+        plan = _DocumentPlan.from_parsed(parsed, on_paragraph)
 
-        async def _translate_group(
-            group: list[ParsedParagraph],
-        ) -> list[TranslatedParagraph]:
-            if group[0].style in _NON_TRANSLATABLE_STYLES:
-                return [
-                    TranslatedParagraph(
-                        original=member.text,
-                        translated="",
-                        style=member.style,
-                        image=member.image_base64,
-                    )
-                    for member in group
-                ]
-            texts = [p.text for p in group]
-            translated = await strategy.translate(texts)
-            return [
-                TranslatedParagraph(
-                    original=member.text,
-                    translated=trans,
-                    style=member.style,
-                )
-                for member, trans in zip(group, translated)
-            ]
+        await asyncio.gather(*[plan.translate(g, route(g)) for g in plan.groups])
+        return plan.result()
+
+    async def compact_storage(self) -> CompactionReport | None:
+        """Enforce the storage quota; None when no quota is configured."""
+        if self._compactor is None:
+            return None
+        return await asyncio.to_thread(self._compactor.compact)
+
+    def _export_in_place(self, result: TranslationResult) -> bytes:
+        # Imported on first use, like python-docx in WordExporter.
+        from src.services.docx_inplace import InPlaceDocxExporter
+
+        upload = self._store.load_upload(str(result.id))
+        if upload is None or upload[1] != "docx":
+            raise InputValidationError(
+                "Inline export needs the original .docx upload, "
+                "which is not available for this translation"
+            )
+        return InPlaceDocxExporter().export(upload[0], result)
 
-        results = await asyncio.gather(*[_translate_group(g) for g in groups])
-        return [p for group_result in results for p in group_result]
+    def usage_report(self, days: int) -> TokenUsageReport:
+        """Token totals for today and the ``days - 1`` days before it (UTC)."""
+        return self._ledger.report(days)
 
     def get_translation(self, translation_id: str) -> TranslationResult:
         return self._store.load(translation_id)
 
+    def get_translation_response(self, translation_id: str) -> StoredResponse | None:
+        return self._store.load_response(translation_id)
+
     def list_translations(self) -> list[TranslationSummary]:
         return self._store.list_all()
 
+    def translations_revision(self) -> tuple[int, int]:
+        """``(epoch, revision)`` of the store's change journal."""
+        return self._store.revision_epoch, self._store.revision
+
+    def translation_changes(self, since: int) -> TranslationChanges:
+        return self._store.changes(since)
+
     def delete_translation(self, translation_id: str) -> None:
         self._store.delete(translation_id)
 
-    def export_translation(self, result: TranslationResult) -> tuple[bytes, str]:
-        docx_bytes = self._exporter.export(result)
+    def export_translation(
+        self,
+        result: TranslationResult,
+        layout: ExportLayout = ExportLayout.TABLE,
+    ) -> tuple[bytes, str]:
+        if layout is ExportLayout.INLINE:
+            docx_bytes = self._export_in_place(result)
+        else:
+            docx_bytes = self._exporter.export(result)
         stem = Path(result.filename).stem
         filename = f"EC-{stem}.docx"
         return docx_bytes, filename
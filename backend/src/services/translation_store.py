@@ -1,75 +1,860 @@
+import asyncio
+import fcntl
+import hashlib
 import json
+import logging
+import os
+import tempfile
+import time
+from contextlib import ExitStack, suppress
+from dataclasses import asdict, dataclass
 from pathlib import Path
+from types import TracebackType
+from typing import Any, Self
+from uuid import UUID
 
 from pydantic import ValidationError
 
 from src.core.exceptions import AppException, NotFoundError
-from src.models.translation import TranslationResult, TranslationSummary
+from src.models.translation import (
+    TranslationChanges,
+    TranslationResult,
+    TranslationSummary,
+)
+from src.services.change_feed import ChangeFeed, ChangeKind
+from src.services.precompressed import IDENTITY, SUFFIXES, encode_variants
+from src.services.result_cache import ResultCache
+from src.services.storage_format import (
+    SUFFIX,
+    StorageFormatError,
+    decode_header,
+    decode_result,
+    encode_result,
+    read_header,
+    replace_header,
+)
+
+logger = logging.getLogger(__name__)
+
+# Access markers are restamped at most this often, keeping LRU order for
+# quota eviction without a write on every read.
+_ACCESS_RESOLUTION_SECONDS = 60.0
+# ``async with`` polls a held lock, backing off between these intervals.
+_LOCK_POLL_MIN_SECONDS = 0.01
+_LOCK_POLL_MAX_SECONDS = 0.25
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    """Write via temp file + fsync + rename so readers never see a partial file."""
+    fd, tmp_name = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    dir_fd = os.open(path.parent, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+class TranslationLock:
+    """Advisory ``flock`` on one translation id, shared across processes.
+
+    Usable as a blocking ``with`` block in worker threads or as an
+    ``async with`` block that polls for the lock without blocking the event
+    loop, so a cancelled waiter gives up at once instead of leaving a thread
+    behind that takes the lock later.
+
+    The holder may ``remove()`` the lock file once its id is gone. Waiters
+    that then get the lock on the unlinked file notice and start over on
+    the new one.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._handle = None
+
+    def acquire(self) -> None:
+        while not self._try_acquire(blocking=True):
+            pass
+
+    def remove(self) -> None:
+        """Delete the lock file; only while holding the lock."""
+        if self._handle is not None:
+            self._path.unlink(missing_ok=True)
+
+    def _try_acquire(self, blocking: bool) -> bool:
+        operation = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        with ExitStack() as stack:
+            handle = stack.enter_context(open(self._path, "a+b"))
+            try:
+                fcntl.flock(handle, operation)
+            except BlockingIOError:
+                return False
+            try:
+                current = os.stat(self._path).st_ino
+            except FileNotFoundError:
+                current = None
+            if current != os.fstat(handle.fileno()).st_ino:
+                # The file was removed while we waited; closing unlocks it.
+                return False
+            # Held open, and so locked, until release().
+            stack.pop_all()
+        self._handle = handle
+        return True
+
+    def release(self) -> None:
+        if self._handle is not None:
+            fcntl.flock(self._handle, fcntl.LOCK_UN)
+            self._handle.close()
+            self._handle = None
+
+    def __enter__(self) -> Self:
+        self.acquire()
+        return self
+
+    def __exit__(
+        self,
+        _exc_type: type[BaseException] | None,
+        _exc: BaseException | None,
+        _tb: TracebackType | None,
+    ) -> None:
+        self.release()
+
+    async def __aenter__(self) -> Self:
+        delay = _LOCK_POLL_MIN_SECONDS
+        while not self._try_acquire(blocking=False):
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, _LOCK_POLL_MAX_SECONDS)
+        return self
+
+    async def __aexit__(
+        self,
+        _exc_type: type[BaseException] | None,
+        _exc: BaseException | None,
+        _tb: TracebackType | None,
+    ) -> None:
+        self.release()
+
+
+@dataclass(frozen=True)
+class StoredUpload:
+    """Original upload recorded in a translation's header, relative to the store.
+
+    ``sha256`` is set for content-addressed blobs shared between translations;
+    uploads saved before deduplication have it as ``None``.
+    """
+
+    path: str
+    ext: str
+    sha256: str | None = None
+
+
+@dataclass(frozen=True)
+class StoredEntry:
+    """Disk footprint of one translation, used when enforcing quotas."""
+
+    translation_id: str
+    # The translation file plus its stored responses.
+    size: int
+    accessed_at: float
+    upload: StoredUpload | None = None
+    upload_accessed_at: float | None = None
+    # The upload blob and its refs, freed once no translation uses it.
+    upload_size: int = 0
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    """API response bytes for a translation, one file per Content-Encoding."""
+
+    etag: str
+    variants: dict[str, Path]
+
+
+def _shard(translation_id: str) -> str:
+    return translation_id[:2]
 
 
 class TranslationStore:
-    def __init__(self, storage_dir: Path) -> None:
+    """Translations and their original uploads, sharded by id prefix.
+
+    ``<storage>/<ab>/<id>.pbt`` holds the translation and its header records
+    where the original upload lives, so every lookup is a direct path
+    instead of a directory scan. Uploads are stored once per content hash
+    under ``uploads/sha256/`` with a ``.refs`` file listing the translations
+    that use them; the blob goes away with its last reference. Stores written
+    before sharding (flat ``<id>.json``/``<id>.pbt`` and
+    ``uploads/<id>.<ext>``) stay readable until ``migrate()`` moves them
+    into place.
+
+    Each save also writes the API's JSON for the translation, plus gzip and
+    brotli copies, under ``responses/<ab>/<id>.<etag>.*``. The ETag is the
+    content hash recorded in the header, and naming files after it means a
+    crash between writes can never pair a header with another version's
+    bytes.
+
+    With ``cache_bytes`` set, validated results are kept in memory and
+    reused while the file's inode, mtime and size are unchanged, so other
+    workers' writes are picked up on the next read.
+
+    Saves and deletes are journaled in ``changes.jsonl``; its length is the
+    store's revision, which lets clients ask only for what changed.
+
+    Reads by clients (``load``, ``load_response``, ``load_upload``) stamp an
+    empty marker under ``.access/`` whose mtime is the last access used for
+    quota eviction. The files' own atime is no use for that: ``relatime``
+    mounts barely keep it, and listing or compacting the store reads every
+    header.
+    """
+
+    def __init__(self, storage_dir: Path, cache_bytes: int = 0) -> None:
+        self._cache = ResultCache(cache_bytes) if cache_bytes > 0 else None
         self._storage_dir = Path(storage_dir)
         self._storage_dir.mkdir(parents=True, exist_ok=True)
         self._uploads_dir = self._storage_dir / "uploads"
         self._uploads_dir.mkdir(parents=True, exist_ok=True)
+        self._locks_dir = self._storage_dir / ".locks"
+        self._locks_dir.mkdir(parents=True, exist_ok=True)
+        self._responses_dir = self._storage_dir / "responses"
+        self._access_dir = self._storage_dir / ".access"
+        self._changes = ChangeFeed(
+            self._storage_dir / "changes.jsonl",
+            lambda: TranslationLock(self._locks_dir / "changes.lock"),
+        )
+
+    def lock(self, translation_id: str) -> TranslationLock:
+        """Lock for read-modify-write sequences on one translation."""
+        return TranslationLock(self._locks_dir / f"{translation_id}.lock")
+
+    def maintenance_lock(self) -> TranslationLock:
+        """Lock held while one worker compacts the whole store."""
+        return TranslationLock(self._locks_dir / "maintenance.lock")
 
-    def save(self, result: TranslationResult) -> None:
-        path = self._storage_dir / f"{result.id}.json"
-        path.write_text(
-            json.dumps(
-                result.model_dump(mode="json"), ensure_ascii=False, indent=2
-            ),
-            encoding="utf-8",
+    def save(
+        self, result: TranslationResult, upload: StoredUpload | None = None
+    ) -> None:
+        """Write ``result``; without ``upload`` the recorded upload is kept."""
+        translation_id = str(result.id)
+        path = self._path(translation_id)
+        existed = any(
+            p.exists() for p in (path, *self._legacy_paths(translation_id))
+        )
+        previous: dict[str, Any] = {}
+        with suppress(FileNotFoundError, StorageFormatError):
+            previous = read_header(path)
+        meta: dict[str, Any] = {}
+        if upload is not None:
+            meta["upload"] = asdict(upload)
+        elif previous.get("upload"):
+            meta["upload"] = previous["upload"]
+        response = result.model_dump_json().encode("utf-8")
+        meta["etag"] = hashlib.sha256(response).hexdigest()[:32]
+        self._write_response(translation_id, meta["etag"], response)
+        path.parent.mkdir(exist_ok=True)
+        self._invalidate(translation_id)
+        _atomic_write(path, encode_result(result, meta))
+        self._retire_responses(translation_id, meta["etag"], previous.get("etag"))
+        for legacy in self._legacy_paths(translation_id):
+            legacy.unlink(missing_ok=True)
+        self._changes.record(
+            translation_id, ChangeKind.UPDATED if existed else ChangeKind.CREATED
         )
 
     def load(self, translation_id: str) -> TranslationResult:
-        path = self._storage_dir / f"{translation_id}.json"
-        if not path.exists():
-            raise NotFoundError("Translation", translation_id)
+        path = self._path(translation_id)
+        if self._cache is not None:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                return self._load_legacy(translation_id)
+            cached = self._cache.get(translation_id, _version(stat))
+            if cached is not None:
+                _record_access(self._access_path(translation_id))
+                return cached
         try:
-            return TranslationResult.model_validate_json(path.read_text(encoding="utf-8"))
-        except ValidationError as e:
-            raise AppException(f"Invalid translation data for '{translation_id}'") from e
+            with path.open("rb") as f:
+                # The version comes from the open file, so it always matches
+                # the bytes read even if another worker replaces the path.
+                stat = os.fstat(f.fileno())
+                blob = f.read()
+        except FileNotFoundError:
+            return self._load_legacy(translation_id)
+        _record_access(self._access_path(translation_id))
+        result = _decode(translation_id, blob)
+        if self._cache is not None:
+            self._cache.put(translation_id, _version(stat), result)
+        return result
 
-    def save_upload(self, translation_id: str, filename: str, content: bytes) -> None:
+    def load_response(self, translation_id: str) -> StoredResponse | None:
+        """Stored response files, or None if the translation predates them."""
+        path = self._path(translation_id)
+        try:
+            header = read_header(path)
+        except (FileNotFoundError, StorageFormatError):
+            return None
+        etag = header.get("etag")
+        if etag is None:
+            return None
+        variants = {
+            encoding: variant
+            for encoding, variant in self._response_paths(translation_id, etag).items()
+            if variant.exists()
+        }
+        if IDENTITY not in variants:
+            return None
+        _record_access(self._access_path(translation_id))
+        return StoredResponse(etag=etag, variants=variants)
+
+    def save_upload(
+        self, translation_id: str, filename: str, content: bytes
+    ) -> StoredUpload:
         ext = filename.rsplit(".", maxsplit=1)[-1].lower() if "." in filename else "bin"
-        path = self._uploads_dir / f"{translation_id}.{ext}"
-        path.write_bytes(content)
+        upload = self._store_blob(translation_id, content, ext)
+        previous = self._upload_ref(translation_id)
+        if previous is not None and previous != upload:
+            self._release_upload(translation_id, previous)
+        self._record_upload(translation_id, upload)
+        return upload
 
     def load_upload(self, translation_id: str) -> tuple[Path, str] | None:
-        matches = list(self._uploads_dir.glob(f"{translation_id}.*"))
-        if not matches:
+        upload = self._upload_ref(translation_id)
+        if upload is None:
             return None
-        path = matches[0]
-        return path, path.suffix.lstrip(".")
+        path = self._storage_dir / upload.path
+        if not path.exists():
+            return None
+        if upload.sha256 is not None:
+            _record_access(self._access_path(upload.sha256, "sha256"))
+        return path, upload.ext
+
+    def drop_upload(self, translation_id: str) -> bool:
+        """Forget the original upload of a translation, keeping the translation."""
+        with self.lock(translation_id):
+            upload = self._upload_ref(translation_id)
+            if upload is None:
+                return False
+            path = self._path(translation_id)
+            blob = path.read_bytes()
+            header = decode_header(blob)
+            header.pop("upload", None)
+            _rewrite_header(path, blob, header)
+            self._release_upload(translation_id, upload)
+            return True
 
     def delete(self, translation_id: str) -> None:
-        path = self._storage_dir / f"{translation_id}.json"
-        if not path.exists():
-            raise NotFoundError("Translation", translation_id)
-        path.unlink()
-        for upload in self._uploads_dir.glob(f"{translation_id}.*"):
-            upload.unlink()
+        with self.lock(translation_id) as lock:
+            try:
+                self._delete(translation_id)
+            finally:
+                # Last, so the id cannot be locked afresh mid-delete.
+                lock.remove()
 
     def list_all(self) -> list[TranslationSummary]:
+        # Other workers may delete or replace files while we scan, and during a
+        # rolling deploy an older worker may still be writing in place.
+        entries: dict[str, Path] = {}
+        # Later patterns win: sharded files over flat ones, compact over JSON.
+        for pattern in ("*.json", f"*{SUFFIX}", f"*/*{SUFFIX}"):
+            for path in self._storage_dir.glob(pattern):
+                entries[path.stem] = path
+
         results: list[TranslationSummary] = []
-        paths = sorted(
-            self._storage_dir.glob("*.json"),
-            key=lambda p: p.stat().st_mtime,
-            reverse=True,
+        for path in entries.values():
+            try:
+                results.append(_read_summary(path))
+            except FileNotFoundError:
+                continue
+            except (
+                StorageFormatError,
+                json.JSONDecodeError,
+                KeyError,
+                UnicodeDecodeError,
+            ):
+                logger.warning("Skipping unreadable translation file %s", path.name)
+        # Newest first, by the recorded creation time: file times change
+        # whenever a file is rewritten, e.g. by a migration.
+        results.sort(key=lambda summary: summary.created_at.timestamp(), reverse=True)
+        return results
+
+    def etag(self, translation_id: str) -> str | None:
+        """Content hash of the stored translation; None if it predates them."""
+        try:
+            return read_header(self._path(translation_id)).get("etag")
+        except FileNotFoundError:
+            if any(path.exists() for path in self._legacy_paths(translation_id)):
+                return None
+            raise NotFoundError("Translation", translation_id) from None
+
+    @property
+    def revision(self) -> int:
+        """Number of saves and deletes journaled so far."""
+        return self._changes.revision
+
+    @property
+    def revision_epoch(self) -> int:
+        """Bumped whenever the change journal is compacted."""
+        return self._changes.epoch
+
+    def changes(self, since: int) -> TranslationChanges:
+        """Summaries created, updated or deleted after revision ``since``.
+
+        ``since=0``, a revision from before the journal was last compacted
+        or one from a store that has since been reset returns the full list
+        instead, which also covers translations saved before the journal
+        existed.
+        """
+        revision, changed = self._changes.since(since)
+        if since == 0 or since > revision or changed is None:
+            return TranslationChanges(
+                revision=revision, created=self.list_all(), reset=True
+            )
+        created: list[TranslationSummary] = []
+        updated: list[TranslationSummary] = []
+        deleted: list[UUID] = []
+        for translation_id, kind in changed.items():
+            if kind is ChangeKind.DELETED:
+                deleted.append(UUID(translation_id))
+                continue
+            try:
+                summary = _read_summary(self._path(translation_id))
+            except FileNotFoundError:
+                # Deleted after the revision was read; the next poll says so.
+                continue
+            except StorageFormatError:
+                logger.warning("Skipping unreadable translation %s", translation_id)
+                continue
+            (created if kind is ChangeKind.CREATED else updated).append(summary)
+        return TranslationChanges(
+            revision=revision, created=created, updated=updated, deleted=deleted
         )
-        for path in paths:
+
+    def usage(self) -> list[StoredEntry]:
+        """Every stored translation with its size and last access time."""
+        stats: dict[str, os.stat_result] = {}
+        for pattern in ("*.json", f"*{SUFFIX}", f"*/*{SUFFIX}"):
+            for path in self._storage_dir.glob(pattern):
+                with suppress(FileNotFoundError):
+                    stats[path.stem] = path.stat()
+
+        entries: list[StoredEntry] = []
+        for translation_id, stat in stats.items():
+            upload = self._upload_ref(translation_id)
+            upload_size = 0
+            upload_accessed_at = None
+            if upload is not None:
+                with suppress(FileNotFoundError):
+                    blob_path = self._storage_dir / upload.path
+                    blob_stat = blob_path.stat()
+                    upload_size = blob_stat.st_size + _size(_refs_path(blob_path))
+                    # Never-read uploads count from when they were stored.
+                    upload_accessed_at = blob_stat.st_mtime
+                    if upload.sha256 is not None:
+                        upload_accessed_at = _mtime(
+                            self._access_path(upload.sha256, "sha256"),
+                            default=upload_accessed_at,
+                        )
+            size = stat.st_size + sum(
+                _size(path)
+                for path in (self._responses_dir / _shard(translation_id)).glob(
+                    f"{translation_id}.*"
+                )
+            )
+            entries.append(
+                StoredEntry(
+                    translation_id=translation_id,
+                    size=size,
+                    accessed_at=_mtime(
+                        self._access_path(translation_id), default=stat.st_mtime
+                    ),
+                    upload=upload,
+                    upload_accessed_at=upload_accessed_at,
+                    upload_size=upload_size,
+                )
+            )
+        return entries
+
+    def disk_usage(self) -> int:
+        total = 0
+        for root, _dirs, files in os.walk(self._storage_dir):
+            for name in files:
+                with suppress(FileNotFoundError):
+                    total += os.stat(os.path.join(root, name)).st_size
+        return total
+
+    def remove_orphans(self, older_than: float) -> int:
+        """Delete upload data no translation points at any more.
+
+        Uploads are written before their translation, so only files last
+        modified before ``older_than`` are considered; newer ones may belong
+        to a save that is still in progress. Leftover temp files from
+        interrupted writes are removed under the same rule.
+        """
+        removed = 0
+        for refs_path in self._uploads_dir.glob("sha256/*/*.refs"):
+            if _mtime(refs_path) >= older_than:
+                continue
+            digest = refs_path.name.removesuffix(".refs")
+            blob_path = refs_path.with_name(digest)
+            with self._blob_lock(digest):
+                refs = self._read_refs(blob_path)
+                live = {
+                    translation_id
+                    for translation_id in refs
+                    if getattr(self._upload_ref(translation_id), "sha256", None)
+                    == digest
+                }
+                if live == refs:
+                    continue
+                if live:
+                    self._write_refs(blob_path, live)
+                else:
+                    blob_path.unlink(missing_ok=True)
+                    refs_path.unlink(missing_ok=True)
+                    removed += 1
+        for blob_path in self._uploads_dir.glob("sha256/*/*"):
+            if (
+                blob_path.suffix == ""
+                and not _refs_path(blob_path).exists()
+                and _mtime(blob_path) < older_than
+            ):
+                blob_path.unlink(missing_ok=True)
+                removed += 1
+        for upload_path in self._uploads_dir.glob("*.*"):
+            if upload_path.is_file() and _mtime(upload_path) < older_than:
+                translation_id = upload_path.name.split(".", maxsplit=1)[0]
+                if not any(
+                    path.exists()
+                    for path in (
+                        self._path(translation_id),
+                        *self._legacy_paths(translation_id),
+                    )
+                ):
+                    upload_path.unlink(missing_ok=True)
+                    removed += 1
+        for response_path in self._responses_dir.glob("*/*.json*"):
+            if response_path.name.startswith(".") or _mtime(response_path) >= older_than:
+                continue
+            translation_id, etag = response_path.name.split(".")[:2]
             try:
-                data = json.loads(path.read_text(encoding="utf-8"))
-                results.append(
-                    TranslationSummary(
-                        id=data["id"],
-                        filename=data["filename"],
-                        created_at=data["created_at"],
-                        paragraph_count=len(data["paragraphs"]),
+                current = read_header(self._path(translation_id)).get("etag")
+            except (FileNotFoundError, StorageFormatError):
+                current = None
+            if etag != current:
+                response_path.unlink(missing_ok=True)
+                removed += 1
+        # A read racing a delete can stamp a marker after it was removed.
+        for marker in self._access_dir.glob("*/*"):
+            if (
+                marker.is_file()
+                and _mtime(marker) < older_than
+                and not self._path(marker.name).exists()
+            ):
+                marker.unlink(missing_ok=True)
+                removed += 1
+        for tmp_path in self._storage_dir.rglob(".*.tmp"):
+            if _mtime(tmp_path) < older_than:
+                tmp_path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def migrate(self) -> int:
+        """Bring older stores up to the current layout.
+
+        Flat-layout translations move into shards (legacy ``.json`` files are
+        rewritten in the compact format on the way), per-translation uploads
+        are moved into the content-addressed blob store, and translations
+        without stored responses get them.
+        """
+        translation_ids = {
+            path.stem
+            for pattern in ("*.json", f"*{SUFFIX}", f"*/*{SUFFIX}")
+            for path in self._storage_dir.glob(pattern)
+        }
+        migrated = 0
+        for translation_id in sorted(translation_ids):
+            with self.lock(translation_id):
+                if any(path.exists() for path in self._legacy_paths(translation_id)):
+                    try:
+                        result = self._load_legacy(translation_id)
+                    except AppException:
+                        logger.warning(
+                            "Skipping unreadable translation %s", translation_id
+                        )
+                        continue
+                    legacy_upload = self._load_legacy_upload(translation_id)
+                    upload = None
+                    if legacy_upload is not None:
+                        upload = self._adopt_upload(translation_id, *legacy_upload)
+                    modified = max(
+                        path.stat().st_mtime_ns
+                        for path in self._legacy_paths(translation_id)
+                        if path.exists()
                     )
-                )
-            except (json.JSONDecodeError, KeyError) as e:
-                raise AppException(f"Corrupted translation file: {path.name}") from e
-        return results
+                    self.save(result, upload=upload)
+                    # A rewrite, not a use: keep the original modification
+                    # time, which ages the translation for eviction.
+                    os.utime(self._path(translation_id), ns=(modified, modified))
+                else:
+                    changed = False
+                    current = self._upload_ref(translation_id)
+                    if current is not None and current.sha256 is None:
+                        source = self._storage_dir / current.path
+                        if source.exists():
+                            upload = self._adopt_upload(
+                                translation_id, source, current.ext
+                            )
+                            self._record_upload(translation_id, upload)
+                            changed = True
+                    if self.load_response(translation_id) is None:
+                        self.save(self.load(translation_id))
+                        changed = True
+                    if not changed:
+                        continue
+            migrated += 1
+        return migrated
+
+    def _delete(self, translation_id: str) -> None:
+        self._invalidate(translation_id)
+        upload = self._upload_ref(translation_id)
+        removed = False
+        paths = (self._path(translation_id), *self._legacy_paths(translation_id))
+        for path in paths:
+            if path.exists():
+                path.unlink()
+                removed = True
+        if not removed:
+            raise NotFoundError("Translation", translation_id)
+        if upload is not None:
+            self._release_upload(translation_id, upload)
+        self._remove_responses(translation_id)
+        # A flat upload of a translation deleted before ``migrate()`` is left
+        # to ``remove_orphans``.
+        self._access_path(translation_id).unlink(missing_ok=True)
+        self._changes.record(translation_id, ChangeKind.DELETED)
+
+    def _invalidate(self, translation_id: str) -> None:
+        if self._cache is not None:
+            self._cache.invalidate(translation_id)
+
+    def _path(self, translation_id: str) -> Path:
+        return self._storage_dir / _shard(translation_id) / f"{translation_id}{SUFFIX}"
+
+    def _response_paths(self, translation_id: str, etag: str) -> dict[str, Path]:
+        directory = self._responses_dir / _shard(translation_id)
+        return {
+            encoding: directory / f"{translation_id}.{etag}{suffix}"
+            for encoding, suffix in SUFFIXES.items()
+        }
+
+    def _write_response(self, translation_id: str, etag: str, response: bytes) -> None:
+        paths = self._response_paths(translation_id, etag)
+        next(iter(paths.values())).parent.mkdir(parents=True, exist_ok=True)
+        for encoding, data in encode_variants(response).items():
+            _atomic_write(paths[encoding], data)
+
+    def _remove_responses(self, translation_id: str) -> None:
+        directory = self._responses_dir / _shard(translation_id)
+        for path in directory.glob(f"{translation_id}.*"):
+            path.unlink(missing_ok=True)
+
+    def _retire_responses(
+        self, translation_id: str, current: str, previous: str | None
+    ) -> None:
+        # A request may have just looked up the previous version and not yet
+        # opened its file, so that version stays until ``remove_orphans``
+        # finds it older than its grace period, counted from now. Anything
+        # older than that is no longer handed out and goes right away.
+        directory = self._responses_dir / _shard(translation_id)
+        for path in directory.glob(f"{translation_id}.*"):
+            etag = path.name.split(".")[1]
+            if etag == current:
+                continue
+            if etag == previous:
+                with suppress(FileNotFoundError):
+                    os.utime(path)
+            else:
+                path.unlink(missing_ok=True)
+
+    def _access_path(self, key: str, kind: str = "") -> Path:
+        return self._access_dir / kind / key[:2] / key
+
+    def _legacy_paths(self, translation_id: str) -> tuple[Path, Path]:
+        return (
+            self._storage_dir / f"{translation_id}{SUFFIX}",
+            self._storage_dir / f"{translation_id}.json",
+        )
+
+    def _load_legacy(self, translation_id: str) -> TranslationResult:
+        flat_compact, flat_json = self._legacy_paths(translation_id)
+        try:
+            return _decode(translation_id, flat_compact.read_bytes())
+        except FileNotFoundError:
+            pass
+        if not flat_json.exists():
+            raise NotFoundError("Translation", translation_id)
+        try:
+            return TranslationResult.model_validate_json(
+                flat_json.read_text(encoding="utf-8")
+            )
+        except ValidationError as e:
+            raise AppException(f"Invalid translation data for '{translation_id}'") from e
+
+    def _load_legacy_upload(self, translation_id: str) -> tuple[Path, str] | None:
+        # Only ``migrate()`` looks for these; afterwards the header records
+        # where the upload is.
+        matches = list(self._uploads_dir.glob(f"{translation_id}.*"))
+        if not matches:
+            return None
+        path = matches[0]
+        return path, path.suffix.lstrip(".")
+
+    def _upload_ref(self, translation_id: str) -> StoredUpload | None:
+        try:
+            upload = read_header(self._path(translation_id)).get("upload")
+        except (FileNotFoundError, StorageFormatError):
+            return None
+        return StoredUpload(**upload) if upload else None
+
+    def _store_blob(
+        self, translation_id: str, content: bytes, ext: str
+    ) -> StoredUpload:
+        digest = hashlib.sha256(content).hexdigest()
+        upload = StoredUpload(
+            path=f"uploads/sha256/{digest[:2]}/{digest}", ext=ext, sha256=digest
+        )
+        blob_path = self._storage_dir / upload.path
+        with self._blob_lock(digest):
+            if not blob_path.exists():
+                blob_path.parent.mkdir(parents=True, exist_ok=True)
+                _atomic_write(blob_path, content)
+            refs = self._read_refs(blob_path)
+            if translation_id not in refs:
+                refs.add(translation_id)
+                self._write_refs(blob_path, refs)
+        return upload
+
+    def _release_upload(self, translation_id: str, upload: StoredUpload) -> None:
+        blob_path = self._storage_dir / upload.path
+        if upload.sha256 is None:
+            blob_path.unlink(missing_ok=True)
+            return
+        with self._blob_lock(upload.sha256) as blob_lock:
+            refs = self._read_refs(blob_path)
+            refs.discard(translation_id)
+            if refs:
+                self._write_refs(blob_path, refs)
+            else:
+                blob_path.unlink(missing_ok=True)
+                _refs_path(blob_path).unlink(missing_ok=True)
+                self._access_path(upload.sha256, "sha256").unlink(missing_ok=True)
+                blob_lock.remove()
+
+    def _adopt_upload(self, translation_id: str, source: Path, ext: str) -> StoredUpload:
+        upload = self._store_blob(translation_id, source.read_bytes(), ext)
+        source.unlink()
+        return upload
+
+    def _blob_lock(self, digest: str) -> TranslationLock:
+        return TranslationLock(self._locks_dir / f"sha256-{digest}.lock")
+
+    @staticmethod
+    def _read_refs(blob_path: Path) -> set[str]:
+        try:
+            return set(json.loads(_refs_path(blob_path).read_text(encoding="utf-8")))
+        except FileNotFoundError:
+            return set()
+
+    @staticmethod
+    def _write_refs(blob_path: Path, refs: set[str]) -> None:
+        _atomic_write(_refs_path(blob_path), json.dumps(sorted(refs)).encode("utf-8"))
+
+    def _record_upload(self, translation_id: str, upload: StoredUpload) -> None:
+        path = self._path(translation_id)
+        try:
+            blob = path.read_bytes()
+        except FileNotFoundError:
+            return
+        header = decode_header(blob)
+        header["upload"] = asdict(upload)
+        _rewrite_header(path, blob, header)
+
+
+def _rewrite_header(path: Path, blob: bytes, header: dict[str, Any]) -> None:
+    """Replace the header of ``blob`` at ``path``, keeping the file's times.
+
+    Bookkeeping such as compaction dropping an upload is not a change to
+    the translation, so it must not make it look recently used.
+    """
+    stat = os.stat(path)
+    _atomic_write(path, replace_header(blob, header))
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+def _record_access(marker: Path) -> None:
+    """Stamp ``marker``'s mtime with the current time, creating it if needed."""
+    try:
+        if time.time() - marker.stat().st_mtime <= _ACCESS_RESOLUTION_SECONDS:
+            return
+        os.utime(marker)
+    except FileNotFoundError:
+        marker.parent.mkdir(parents=True, exist_ok=True)
+        marker.touch()
+
+
+def _version(stat: os.stat_result) -> tuple[int, int, int]:
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def _mtime(path: Path, default: float = float("inf")) -> float:
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:
+        return default
+
+
+def _size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _refs_path(blob_path: Path) -> Path:
+    return blob_path.with_name(f"{blob_path.name}.refs")
+
+
+def _decode(translation_id: str, blob: bytes) -> TranslationResult:
+    try:
+        return decode_result(blob)
+    except (StorageFormatError, ValidationError) as e:
+        raise AppException(f"Invalid translation data for '{translation_id}'") from e
+
+
+def _read_summary(path: Path) -> TranslationSummary:
+    if path.suffix == SUFFIX:
+        header = read_header(path)
+        return TranslationSummary(
+            id=header["id"],
+            filename=header["filename"],
+            created_at=header["created_at"],
+            paragraph_count=header["paragraph_count"],
+            # Files written before usage was tracked have none.
+            usage=header.get("usage") or {},
+        )
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return TranslationSummary(
+        id=data["id"],
+        filename=data["filename"],
+        created_at=data["created_at"],
+        paragraph_count=len(data["paragraphs"]),
+        usage=data.get("usage") or {},
+    )
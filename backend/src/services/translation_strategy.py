@@ -2,15 +2,29 @@ import asyncio
 import logging
 import re
 from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
 from enum import Enum
+from itertools import pairwise
+from typing import TYPE_CHECKING, TypeVar
 
-from openai import AsyncOpenAI
 from pydantic import BaseModel
 
-from src.models.translation import TranslationDirection
+from src.models.translation import TokenUsage, TranslationDirection
+from src.services.hedging import RequestHedger
+from src.services.retry_policy import RetryPolicy, is_transient
+from src.services.token_usage import (
+    UsageMeter,
+    estimate_request_tokens,
+    parse_usage,
+)
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 _SYSTEM_PROMPTS: dict[TranslationDirection, str] = {
     TranslationDirection.EN_TO_ZH: (
         "You are a professional English to Traditional Chinese (繁體中文) translator. "
@@ -48,26 +62,48 @@ _MAX_SAMPLE_CHARS = 1000
 _MAX_SAMPLE_PARAGRAPHS = 5
 
 
+def is_detection_sample_complete(paragraphs: list[str]) -> bool:
+    """True once ``detect_language`` would not look at further paragraphs."""
+    return (
+        len(paragraphs) >= _MAX_SAMPLE_PARAGRAPHS
+        or sum(len(p) + 1 for p in paragraphs) > _MAX_SAMPLE_CHARS
+    )
+
+
 async def detect_language(
-    client: AsyncOpenAI,
+    client: "AsyncOpenAI",
     model: str,
     paragraphs: list[str],
+    meter: UsageMeter | None = None,
+    retry: RetryPolicy | None = None,
 ) -> TranslationDirection:
     if not paragraphs:
         return TranslationDirection.EN_TO_ZH
 
     sample = "\n".join(paragraphs[:_MAX_SAMPLE_PARAGRAPHS])[:_MAX_SAMPLE_CHARS]
-
+    messages = [
+        {"role": "system", "content": _DETECTION_PROMPT},
+        {"role": "user", "content": sample},
+    ]
+    # Outside the try: a budget refusal must stop the translation, not fall
+    # back to the default direction.
+    estimate = estimate_request_tokens({"messages": messages})
+    if meter is not None:
+        meter.reserve(estimate)
+    usage: TokenUsage | None = None
+    # Transient errors get the same retries as translation calls before
+    # detection falls back to the default.
+    policy = retry or RetryPolicy(retries=0)
     try:
-        response = await client.beta.chat.completions.parse(
-            model=model,
-            messages=[
-                {"role": "system", "content": _DETECTION_PROMPT},
-                {"role": "user", "content": sample},
-            ],
-            response_format=_LanguageDetectionResult,
-            temperature=0,
+        response = await policy.run(
+            lambda: client.beta.chat.completions.parse(
+                model=model,
+                messages=messages,
+                response_format=_LanguageDetectionResult,
+                temperature=0,
+            )
         )
+        usage = parse_usage(getattr(response, "usage", None))
         detected = response.choices[0].message.parsed
         if detected.language == _DocumentLanguage.ZH:
             return TranslationDirection.ZH_TO_EN
@@ -75,52 +111,160 @@ async def detect_language(
     except Exception:
         logger.warning("Language detection failed, defaulting to EN_TO_ZH", exc_info=True)
         return TranslationDirection.EN_TO_ZH
+    finally:
+        if meter is not None:
+            meter.settle(estimate, model, usage)
 
 
 # --- Translation strategies ---------------------------------------------------
 
 
+ItemCallback = Callable[[int, str], None]
+"""Receives ``(index, translation)`` as soon as a single item is complete.
+
+Called again for the same index if the batch's final translation of that
+item differs, e.g. when a hedged request other than the streamed one won.
+"""
+
+_MARKER = re.compile(r"<<<(\d+)>>>")
+
+
+class _NumberedStreamParser:
+    """Incrementally split a streamed ``<<<N>>>`` response into items.
+
+    An item is complete once the marker of its successor has arrived, so
+    ``feed()`` only returns items that can no longer grow.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = ""
+
+    def feed(self, delta: str) -> list[tuple[int, str]]:
+        self._buffer += delta
+        markers = list(_MARKER.finditer(self._buffer))
+        if len(markers) < 2:
+            return []
+        completed = [
+            (int(current.group(1)), self._buffer[current.end() : following.start()].strip())
+            for current, following in pairwise(markers)
+        ]
+        self._buffer = self._buffer[markers[-1].start() :]
+        return completed
+
+
+class PartialTranslationError(Exception):
+    """Some batches of a ``translate()`` call failed transiently.
+
+    ``translated`` has the other batches' items in place and ``None`` for
+    every item of a failed batch, so paid-for results are not thrown away.
+    """
+
+    def __init__(self, translated: list[str | None], cause: Exception) -> None:
+        super().__init__(f"{translated.count(None)} items failed: {cause!r}")
+        self.translated = translated
+        self.cause = cause
+
+
 class TranslationStrategy(ABC):
     @abstractmethod
-    async def translate(self, paragraphs: list[str]) -> list[str]: ...
+    async def translate(
+        self, paragraphs: list[str], on_item: ItemCallback | None = None
+    ) -> list[str]: ...
 
 
 class BatchTranslationStrategy(TranslationStrategy):
     def __init__(
         self,
-        client: AsyncOpenAI,
+        client: "AsyncOpenAI",
         model: str,
         batch_size: int = 10,
         direction: TranslationDirection = TranslationDirection.EN_TO_ZH,
+        hedger: RequestHedger | None = None,
+        stream: bool = False,
+        meter: UsageMeter | None = None,
+        repair_model: str | None = None,
+        retry: RetryPolicy | None = None,
     ) -> None:
         self._client = client
         self._model = model
+        self._repair_model = repair_model or model
+        # Source texts whose translation came from a single-item repair.
+        self._repaired: set[str] = set()
         self._batch_size = batch_size
         self._system_prompt = _SYSTEM_PROMPTS[direction]
+        self._hedger = hedger
+        self._stream = stream
+        self._meter = meter
+        self._retry = retry
 
-    async def translate(self, paragraphs: list[str]) -> list[str]:
+    async def translate(
+        self, paragraphs: list[str], on_item: ItemCallback | None = None
+    ) -> list[str]:
         if not paragraphs:
             return []
-        batches = [
+        failures: list[Exception] = []
+
+        async def _attempt(index: int, batch: list[str]) -> list[str | None]:
+            try:
+                return list(
+                    await self._translate_batch(
+                        batch, _offset_callback(on_item, index * self._batch_size)
+                    )
+                )
+            except Exception as exc:
+                if not is_transient(exc):
+                    raise
+                failures.append(exc)
+                return [None] * len(batch)
+
+        translated_batches = await asyncio.gather(
+            *[
+                _attempt(index, batch)
+                for index, batch in enumerate(self.split(paragraphs))
+            ]
+        )
+        translated = [item for batch in translated_batches for item in batch]
+        if failures:
+            raise PartialTranslationError(translated, failures[0])
+        return [item for item in translated if item is not None]
+
+    def split(self, paragraphs: list[str]) -> list[list[str]]:
+        return [
             paragraphs[i : i + self._batch_size]
             for i in range(0, len(paragraphs), self._batch_size)
         ]
-        translated_batches = await asyncio.gather(
-            *[self._translate_batch(batch) for batch in batches]
-        )
-        return [item for batch in translated_batches for item in batch]
 
-    async def _translate_batch(self, batch: list[str]) -> list[str]:
+    @property
+    def model(self) -> str:
+        return self._model
+
+    def model_for(self, text: str) -> str:
+        """The model that produced the translation of ``text``."""
+        return self._repair_model if text in self._repaired else self._model
+
+    def build_request(self, batch: list[str], model: str | None = None) -> dict:
+        """Return the chat completion request body for one numbered batch."""
         numbered = "\n".join(f"<<<{i + 1}>>> {p}" for i, p in enumerate(batch))
-        response = await self._client.chat.completions.create(
-            model=self._model,
-            messages=[
+        return {
+            "model": model or self._model,
+            "messages": [
                 {"role": "system", "content": self._system_prompt},
                 {"role": "user", "content": numbered},
             ],
-        )
-        content = response.choices[0].message.content or ""
-        result = self._parse_numbered_response(content, len(batch))
+        }
+
+    def record_usage(self, usage: TokenUsage | None) -> None:
+        """Account for a call made on this strategy's behalf elsewhere."""
+        if self._meter is not None:
+            self._meter.settle(0, self._model, usage)
+
+    def parse_response(self, batch: list[str], content: str) -> list[str]:
+        """Split a numbered response; items it lacks come back empty."""
+        return self._parse_numbered_response(content, len(batch))
+
+    async def complete_batch(self, batch: list[str], content: str) -> list[str]:
+        """Parse a numbered response and re-translate any missing items singly."""
+        result = self.parse_response(batch, content)
 
         missing_indices = [i for i, t in enumerate(result) if not t]
         if missing_indices:
@@ -129,20 +273,122 @@ class BatchTranslationStrategy(TranslationStrategy):
             )
             for idx, text in zip(missing_indices, retried):
                 result[idx] = text
+                self._repaired.add(batch[idx])
+
+        return result
+
+    async def _translate_batch(
+        self, batch: list[str], on_item: ItemCallback | None = None
+    ) -> list[str]:
+        request = self.build_request(batch)
+        published: dict[int, str] = {}
+
+        def publish(index: int, text: str) -> None:
+            if on_item is not None and published.get(index) != text:
+                published[index] = text
+                on_item(index, text)
+
+        # With hedging or retries several attempts may stream at once; only
+        # the first to produce an item publishes as it goes.
+        leader: list[object] = []
+
+        async def stream_attempt() -> tuple[str, TokenUsage | None]:
+            attempt = object()
+
+            def publish_live(index: int, text: str) -> None:
+                if not leader:
+                    leader.append(attempt)
+                if leader[0] is attempt:
+                    publish(index, text)
 
+            try:
+                return await self._stream_content(request, len(batch), publish_live)
+            except BaseException:
+                if leader and leader[0] is attempt:
+                    leader.clear()
+                raise
+
+        if self._stream:
+            content, _usage = await self._call(
+                stream_attempt, request, usage_of=lambda streamed: streamed[1]
+            )
+        else:
+            response = await self._call(
+                lambda: self._client.chat.completions.create(**request), request
+            )
+            content = response.choices[0].message.content or ""
+        result = await self.complete_batch(batch, content)
+        # Whichever attempt won, the final items are its own; anything that
+        # differs from what was streamed is published again.
+        for index, text in enumerate(result):
+            publish(index, text)
         return result
 
+    async def _stream_content(
+        self, request: dict, expected_count: int, publish: ItemCallback
+    ) -> tuple[str, TokenUsage | None]:
+        stream = await self._client.chat.completions.create(
+            **request, stream=True, stream_options={"include_usage": True}
+        )
+        parser = _NumberedStreamParser()
+        parts: list[str] = []
+        usage: TokenUsage | None = None
+        async for chunk in stream:
+            if not chunk.choices:
+                # The final chunk carries the usage and no choices.
+                usage = parse_usage(getattr(chunk, "usage", None)) or usage
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            parts.append(delta)
+            for number, text in parser.feed(delta):
+                if text and 1 <= number <= expected_count:
+                    publish(number - 1, text)
+        return "".join(parts), usage
+
     async def _translate_single(self, text: str) -> str:
-        response = await self._client.chat.completions.create(
-            model=self._model,
-            messages=[
-                {"role": "system", "content": self._system_prompt},
-                {"role": "user", "content": f"<<<1>>> {text}"},
-            ],
+        request = self.build_request([text], model=self._repair_model)
+        response = await self._call(
+            lambda: self._client.chat.completions.create(**request), request
         )
         content = (response.choices[0].message.content or "").strip()
         return re.sub(r"^<<<1>>>\s*", "", content)
 
+    async def _call(
+        self,
+        send: Callable[[], Awaitable[T]],
+        request: dict,
+        usage_of: Callable[[T], TokenUsage | None] = (
+            lambda response: parse_usage(getattr(response, "usage", None))
+        ),
+    ) -> T:
+        if self._meter is None:
+            return await self._send(send, request["model"])
+        meter = self._meter
+        estimate = estimate_request_tokens(request)
+        meter.reserve(estimate)
+
+        async def metered() -> T:
+            # Every request that completes is billed, including a hedged
+            # call's loser. One cancelled mid-flight reports no usage, so
+            # what it cost is missing from the budgets.
+            result = await send()
+            meter.settle(0, request["model"], usage_of(result))
+            return result
+
+        try:
+            return await self._send(metered, request["model"])
+        finally:
+            meter.settle(estimate, request["model"], None)
+
+    async def _send(self, send: Callable[[], Awaitable[T]], model: str) -> T:
+        hedger = self._hedger
+        attempt = send if hedger is None else (lambda: hedger.run(send, model))
+        if self._retry is None:
+            return await attempt()
+        return await self._retry.run(attempt)
+
     @staticmethod
     def _parse_numbered_response(content: str, expected_count: int) -> list[str]:
         pattern = r"<<<(\d+)>>>\s*"
@@ -155,3 +401,9 @@ class BatchTranslationStrategy(TranslationStrategy):
             translations[num] = text
             i += 2
         return [translations.get(n, "") for n in range(1, expected_count + 1)]
+
+
+def _offset_callback(on_item: ItemCallback | None, offset: int) -> ItemCallback | None:
+    if on_item is None:
+        return None
+    return lambda index, text: on_item(offset + index, text)
@@ -1,17 +1,14 @@
 from io import BytesIO
-
-from docx import Document
-from docx.enum.table import WD_TABLE_ALIGNMENT
-from docx.oxml.ns import qn
-from docx.shared import Inches, Pt
+from typing import Any
 
 from src.models.translation import (
     ParagraphStyle,
     TranslationDirection,
     TranslationResult,
 )
+from src.services.table_cells import table_rows
 
-_NON_EXPORTABLE_STYLES = frozenset({ParagraphStyle.FIGURE, ParagraphStyle.TABLE})
+_NON_EXPORTABLE_STYLES = frozenset({ParagraphStyle.FIGURE})
 
 _HEADING_STYLES = frozenset({
     ParagraphStyle.TITLE,
@@ -24,6 +21,12 @@ _HEADING_STYLES = frozenset({
 
 class WordExporter:
     def export(self, result: TranslationResult) -> bytes:
+        # python-docx is imported on first export to keep worker start-up fast.
+        from docx import Document
+        from docx.enum.table import WD_TABLE_ALIGNMENT
+        from docx.oxml.ns import qn
+        from docx.shared import Inches, Pt
+
         doc = Document()
         style = doc.styles["Normal"]
         style.font.size = Pt(11)
@@ -48,6 +51,14 @@ class WordExporter:
         for para in result.paragraphs:
             if para.style in _NON_EXPORTABLE_STYLES:
                 continue
+            if para.style == ParagraphStyle.TABLE:
+                # Tables stored before cells were translated have no
+                # translation to show.
+                if para.translated:
+                    row = table.add_row().cells
+                    _add_html_table(row[0], para.original)
+                    _add_html_table(row[1], para.translated)
+                continue
             row = table.add_row().cells
             is_heading = para.style in _HEADING_STYLES
             row[0].text = para.original
@@ -81,3 +92,23 @@ class WordExporter:
         buf = BytesIO()
         doc.save(buf)
         return buf.getvalue()
+
+
+def _add_html_table(cell: Any, html: str) -> None:
+    """Rebuild a stored HTML table as a table nested in ``cell``."""
+    rows = table_rows(html)
+    if not rows:
+        return
+    cols = max(sum(span for _, span in row) for row in rows)
+    nested = cell.add_table(rows=len(rows), cols=cols)
+    nested.style = "Table Grid"
+    for r, row in enumerate(rows):
+        c = 0
+        for text, span in row:
+            if c >= cols:
+                break
+            target = nested.cell(r, c)
+            if span > 1:
+                target = target.merge(nested.cell(r, min(c + span, cols) - 1))
+            target.text = text
+            c += span
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from src.core.exceptions import ServiceUnavailableError
+from src.services.admission import AdmissionController
+
+
+@pytest.mark.asyncio
+async def test_admits_within_limits():
+    controller = AdmissionController(max_documents=2, max_bytes=100, max_waiting=0)
+    async with controller.admit(40), controller.admit(40):
+        assert controller.in_flight == (2, 80)
+    assert controller.in_flight == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_rejects_immediately_when_queue_is_full():
+    controller = AdmissionController(
+        max_documents=1, max_bytes=100, max_waiting=0, retry_after=7
+    )
+    async with controller.admit(10):
+        with pytest.raises(ServiceUnavailableError) as exc_info:
+            async with controller.admit(10):
+                pass
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers == {"Retry-After": "7"}
+
+
+@pytest.mark.asyncio
+async def test_waiter_runs_when_capacity_frees_up():
+    controller = AdmissionController(max_documents=5, max_bytes=100, max_waiting=1)
+    order: list[str] = []
+
+    async def first():
+        async with controller.admit(80):
+            await asyncio.sleep(0.05)
+            order.append("first")
+
+    async def second():
+        await asyncio.sleep(0.01)
+        async with controller.admit(50):
+            order.append("second")
+
+    await asyncio.gather(first(), second())
+    assert order == ["first", "second"]
+
+
+@pytest.mark.asyncio
+async def test_waiter_times_out():
+    controller = AdmissionController(
+        max_documents=1, max_bytes=100, max_waiting=1, wait_timeout=0.01
+    )
+    async with controller.admit(10):
+        with pytest.raises(ServiceUnavailableError):
+            async with controller.admit(10):
+                pass
+
+
+@pytest.mark.asyncio
+async def test_oversized_document_runs_alone():
+    controller = AdmissionController(max_documents=2, max_bytes=100, max_waiting=0)
+    async with controller.admit(500):
+        assert controller.in_flight == (1, 100)
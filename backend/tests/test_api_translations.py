@@ -4,7 +4,12 @@ from unittest.mock import AsyncMock, patch
 from docx import Document
 from fastapi.testclient import TestClient
 
+from src.core.exceptions import ServiceUnavailableError
 from src.main import app
+from src.models.translation import TranslationDirection
+
+# Detection would otherwise retry against the real API until it gives up.
+_DETECT_LANG = "src.services.translation_service.detect_language"
 
 
 def _make_docx(paragraphs: list[str]) -> bytes:
@@ -19,10 +24,17 @@ def _make_docx(paragraphs: list[str]) -> bytes:
 def test_upload_returns_translation():
     client = TestClient(app)
     docx = _make_docx(["Hello."])
-    with patch(
-        "src.services.translation_strategy.BatchTranslationStrategy._translate_batch",
-        new_callable=AsyncMock,
-        return_value=["你好。"],
+    with (
+        patch(
+            "src.services.translation_strategy.BatchTranslationStrategy._translate_batch",
+            new_callable=AsyncMock,
+            return_value=["你好。"],
+        ),
+        patch(
+            _DETECT_LANG,
+            new_callable=AsyncMock,
+            return_value=TranslationDirection.EN_TO_ZH,
+        ),
     ):
         response = client.post(
             "/api/v1/translations/upload",
@@ -55,3 +67,95 @@ def test_list_translations():
     response = client.get("/api/v1/translations")
     assert response.status_code == 200
     assert isinstance(response.json(), list)
+
+
+def test_upload_returns_503_with_retry_after_when_overloaded():
+    client = TestClient(app)
+    with patch(
+        "src.services.translation_service.TranslationService.translate_document",
+        new_callable=AsyncMock,
+        side_effect=ServiceUnavailableError("busy", retry_after=12),
+    ):
+        response = client.post(
+            "/api/v1/translations/upload",
+            files={"file": ("test.docx", _make_docx(["Hello."]), "application/pdf")},
+        )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "12"
+
+
+def _upload(client: TestClient) -> dict:
+    with (
+        patch(
+            "src.services.translation_strategy.BatchTranslationStrategy._translate_batch",
+            new_callable=AsyncMock,
+            return_value=["你好。"],
+        ),
+        patch(
+            _DETECT_LANG,
+            new_callable=AsyncMock,
+            return_value=TranslationDirection.EN_TO_ZH,
+        ),
+    ):
+        response = client.post(
+            "/api/v1/translations/upload",
+            files={"file": ("test.docx", _make_docx(["Hello."]), "application/pdf")},
+        )
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_get_translation_serves_stored_json_with_etag():
+    client = TestClient(app)
+    uploaded = _upload(client)
+    url = f"/api/v1/translations/{uploaded['id']}"
+    try:
+        response = client.get(url, headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.headers["Content-Type"] == "application/json"
+        assert response.json() == uploaded
+        etag = response.headers["ETag"]
+
+        identity = client.get(url, headers={"Accept-Encoding": "identity"})
+        assert "Content-Encoding" not in identity.headers
+        assert identity.headers["ETag"] == etag
+
+        not_modified = client.get(url, headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+    finally:
+        client.delete(url)
+
+
+def test_token_usage_report():
+    client = TestClient(app)
+    response = client.get("/api/v1/translations/usage", params={"days": 7})
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["days"]) == 7
+    assert set(data["total"]) == {"prompt_tokens", "completion_tokens", "cached_tokens"}
+
+
+def test_list_translations_etag_follows_store_revision():
+    client = TestClient(app)
+    response = client.get("/api/v1/translations")
+    etag = response.headers["ETag"]
+    assert client.get(
+        "/api/v1/translations", headers={"If-None-Match": etag}
+    ).status_code == 304
+
+    uploaded = _upload(client)
+    try:
+        response = client.get("/api/v1/translations", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+        revision = int(etag.strip('"').rsplit("-", maxsplit=1)[-1])
+        changes = client.get(
+            "/api/v1/translations/changes", params={"since": revision}
+        ).json()
+        assert [s["id"] for s in changes["created"]] == [uploaded["id"]]
+        assert not changes["reset"]
+    finally:
+        client.delete(f"/api/v1/translations/{uploaded['id']}")
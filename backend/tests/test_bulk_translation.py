@@ -0,0 +1,282 @@
+import asyncio
+import json
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.core.exceptions import (
+    AppException,
+    ServiceUnavailableError,
+    TokenBudgetExceededError,
+)
+from src.models.translation import ParagraphStyle, TranslationDirection
+from src.services.bulk_translation import BatchJob, BulkTranslationJob
+from src.services.document_parser import ParsedParagraph
+from src.services.translation_service import TranslationService
+from src.services.translation_strategy import BatchTranslationStrategy
+
+
+class FileBatchBackend:
+    """Local stand-in for the Batch API that keeps jobs as JSONL files."""
+
+    def __init__(self, root: Path, respond, status: str = "completed") -> None:
+        self._root = root
+        self._respond = respond
+        self._status = status
+        self.polls = 0
+
+    async def submit(self, requests_jsonl: bytes) -> str:
+        job_id = f"batch_{len(list(self._root.glob('*.input.jsonl')))}"
+        (self._root / f"{job_id}.input.jsonl").write_bytes(requests_jsonl)
+        return job_id
+
+    async def retrieve(self, job_id: str) -> BatchJob:
+        self.polls += 1
+        if self.polls < 2:
+            return BatchJob(id=job_id, status="in_progress")
+        lines = []
+        for line in (self._root / f"{job_id}.input.jsonl").read_text().splitlines():
+            request = json.loads(line)
+            content = self._respond(request["body"]["messages"][1]["content"])
+            lines.append(json.dumps({
+                "custom_id": request["custom_id"],
+                "response": {
+                    "status_code": 200,
+                    "body": {"choices": [{"message": {"content": content}}]},
+                },
+                "error": None,
+            }))
+        (self._root / f"{job_id}.output.jsonl").write_text("\n".join(lines))
+        return BatchJob(id=job_id, status=self._status, output_file_id=f"{job_id}.output.jsonl")
+
+    async def download(self, file_id: str) -> bytes:
+        return (self._root / file_id).read_bytes()
+
+    def requests(self) -> list[dict]:
+        lines = []
+        for path in sorted(self._root.glob("*.input.jsonl")):
+            lines.extend(json.loads(line) for line in path.read_text().splitlines())
+        return lines
+
+
+def _echo_translation(numbered: str) -> str:
+    return numbered.replace("Hello", "你好").replace("World", "世界")
+
+
+def _strategy(client=None, batch_size: int = 10) -> BatchTranslationStrategy:
+    return BatchTranslationStrategy(
+        client=client or AsyncMock(), model="gpt-4o-mini", batch_size=batch_size
+    )
+
+
+@pytest.mark.asyncio
+async def test_bulk_job_writes_numbered_requests(tmp_path):
+    backend = FileBatchBackend(tmp_path, _echo_translation)
+    job = BulkTranslationJob(backend, poll_interval=0)
+    handle = job.add(_strategy(batch_size=2), ["Hello", "World", "Hello World"])
+    await job.run()
+
+    requests = backend.requests()
+    assert [r["custom_id"] for r in requests] == ["0-0", "0-1"]
+    assert requests[0]["url"] == "/v1/chat/completions"
+    assert requests[0]["body"]["model"] == "gpt-4o-mini"
+    assert requests[0]["body"]["messages"][1]["content"] == "<<<1>>> Hello\n<<<2>>> World"
+    assert job.result(handle) == ["你好", "世界", "你好 世界"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_job_repairs_missing_items(tmp_path):
+    client = AsyncMock()
+    message = MagicMock()
+    message.content = "<<<1>>> 世界"
+    response = MagicMock()
+    response.choices = [MagicMock(message=message)]
+    client.chat.completions.create.return_value = response
+
+    backend = FileBatchBackend(tmp_path, lambda _numbered: "<<<1>>> 你好")
+    job = BulkTranslationJob(backend, poll_interval=0, resubmits=0)
+    handle = job.add(_strategy(client), ["Hello", "World"])
+    await job.run()
+
+    assert job.result(handle) == ["你好", "世界"]
+    client.chat.completions.create.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_bulk_job_leaves_items_of_a_failed_repair_empty(tmp_path):
+    client = AsyncMock()
+    client.chat.completions.create.side_effect = TokenBudgetExceededError("spent")
+
+    backend = FileBatchBackend(tmp_path, lambda _numbered: "<<<1>>> 你好")
+    job = BulkTranslationJob(backend, poll_interval=0, resubmits=0)
+    first = job.add(_strategy(client), ["Hello", "World"])
+    second = job.add(_strategy(client), ["Hello"])
+    await job.run()
+
+    assert job.result(first) == ["你好", None]
+    assert job.result(second) == ["你好"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_job_resubmits_missing_items_as_a_follow_up_job(tmp_path):
+    client = AsyncMock()
+    answered: set[str] = set()
+
+    def respond(numbered: str) -> str:
+        # The first job drops "World"; the follow-up answers it.
+        if "World" in numbered and numbered not in answered and "Hello" in numbered:
+            answered.add(numbered)
+            return "<<<1>>> 你好"
+        return _echo_translation(numbered)
+
+    backend = FileBatchBackend(tmp_path, respond)
+    job = BulkTranslationJob(backend, poll_interval=0)
+    handle = job.add(_strategy(client), ["Hello", "World"])
+    await job.run()
+
+    assert job.result(handle) == ["你好", "世界"]
+    follow_up = backend.requests()[1]
+    assert follow_up["body"]["messages"][1]["content"] == "<<<1>>> World"
+    client.chat.completions.create.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_bulk_job_failed_status_raises(tmp_path):
+    backend = FileBatchBackend(tmp_path, _echo_translation, status="failed")
+    job = BulkTranslationJob(backend, poll_interval=0)
+    job.add(_strategy(), ["Hello"])
+    with pytest.raises(AppException):
+        await job.run()
+
+
+@pytest.mark.asyncio
+async def test_bulk_job_without_translatable_text_skips_submit(tmp_path):
+    backend = FileBatchBackend(tmp_path, _echo_translation)
+    job = BulkTranslationJob(backend, poll_interval=0)
+    handle = job.add(_strategy(), [])
+    await job.run()
+    assert job.result(handle) == []
+    assert backend.requests() == []
+
+
+@pytest.mark.asyncio
+async def test_service_bulk_translates_and_stores_documents(tmp_path):
+    backend = FileBatchBackend(tmp_path, _echo_translation)
+    service = TranslationService(
+        storage_dir=tmp_path / "store",
+        openai_api_key="test-key",
+        openai_model="gpt-4o-mini",
+        bulk_backend=backend,
+        bulk_poll_interval=0,
+    )
+    docs = {
+        "a.pdf": [
+            ParsedParagraph(text="Hello", style=ParagraphStyle.HEADING_1),
+            ParsedParagraph(text="<::chart::>", style=ParagraphStyle.FIGURE),
+            ParsedParagraph(text="World", style=ParagraphStyle.NORMAL),
+        ],
+        "b.pdf": [ParsedParagraph(text="Hello World", style=ParagraphStyle.NORMAL)],
+    }
+
+    with (
+        patch.object(service, "_parser") as mock_parser,
+        patch(
+            "src.services.translation_service.detect_language",
+            new_callable=AsyncMock,
+            return_value=TranslationDirection.EN_TO_ZH,
+        ),
+    ):
+        mock_parser.parse.side_effect = lambda _content, filename: docs[filename]
+        results = await service.translate_documents_bulk(
+            [(b"a", "a.pdf"), (b"b", "b.pdf")]
+        )
+
+    assert len(backend.requests()) == 3
+    assert [p.translated for p in results[0].paragraphs] == ["你好", "", "世界"]
+    assert [p.translated for p in results[1].paragraphs] == ["你好 世界"]
+    stored = service.get_translation(str(results[1].id))
+    assert stored.paragraphs[0].translated == "你好 世界"
+
+
+@pytest.mark.asyncio
+async def test_service_bulk_flags_paragraphs_whose_repair_failed(tmp_path):
+    backend = FileBatchBackend(
+        tmp_path, lambda numbered: "" if "World" in numbered else "<<<1>>> 你好"
+    )
+    service = TranslationService(
+        storage_dir=tmp_path / "store",
+        openai_api_key="test-key",
+        openai_model="gpt-4o-mini",
+        bulk_backend=backend,
+        bulk_poll_interval=0,
+    )
+    client = AsyncMock()
+    client.chat.completions.create.side_effect = TokenBudgetExceededError("spent")
+    service._openai_client = client
+    docs = {
+        "a.pdf": [ParsedParagraph(text="World", style=ParagraphStyle.NORMAL)],
+        "b.pdf": [ParsedParagraph(text="Hello", style=ParagraphStyle.NORMAL)],
+    }
+
+    with (
+        patch.object(service, "_parser") as mock_parser,
+        patch(
+            "src.services.translation_service.detect_language",
+            new_callable=AsyncMock,
+            return_value=TranslationDirection.EN_TO_ZH,
+        ),
+    ):
+        mock_parser.parse.side_effect = lambda _content, filename: docs[filename]
+        results = await service.translate_documents_bulk(
+            [(b"a", "a.pdf"), (b"b", "b.pdf")]
+        )
+
+    failed = service.get_translation(str(results[0].id)).paragraphs[0]
+    assert failed.failed and failed.translated == ""
+    assert service.get_translation(str(results[1].id)).paragraphs[0].translated == "你好"
+
+
+class _BusyParserPool:
+    """Refuses documents beyond its capacity, like ``ParserPool``."""
+
+    capacity = 2
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+
+    async def parse(self, _content: bytes, filename: str) -> list[ParsedParagraph]:
+        if self.in_flight >= self.capacity:
+            raise ServiceUnavailableError("Document parser is busy")
+        self.in_flight += 1
+        try:
+            await asyncio.sleep(0.01)
+            text = f"Hello {filename}"
+            return [ParsedParagraph(text=text, style=ParagraphStyle.NORMAL)]
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.mark.asyncio
+async def test_service_bulk_parses_within_pool_capacity(tmp_path):
+    service = TranslationService(
+        storage_dir=tmp_path / "store",
+        openai_api_key="test-key",
+        openai_model="gpt-4o-mini",
+        bulk_backend=FileBatchBackend(tmp_path, _echo_translation),
+        bulk_poll_interval=0,
+        parser_pool=_BusyParserPool(),
+    )
+
+    with patch(
+        "src.services.translation_service.detect_language",
+        new_callable=AsyncMock,
+        return_value=TranslationDirection.EN_TO_ZH,
+    ):
+        results = await service.translate_documents_bulk(
+            [(b"x", f"{n}.pdf") for n in range(5)]
+        )
+
+    assert [r.paragraphs[0].translated for r in results] == [
+        f"你好 {n}.pdf" for n in range(5)
+    ]
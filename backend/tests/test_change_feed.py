@@ -0,0 +1,84 @@
+from contextlib import nullcontext
+
+from src.services.change_feed import ChangeFeed, ChangeKind
+
+
+def _feed(tmp_path) -> ChangeFeed:
+    return ChangeFeed(tmp_path / "changes.jsonl", nullcontext)
+
+
+def test_revision_counts_recorded_changes(tmp_path):
+    feed = _feed(tmp_path)
+    assert feed.revision == 0
+    assert feed.record("a", ChangeKind.CREATED) == 1
+    assert feed.record("a", ChangeKind.UPDATED) == 2
+    assert feed.revision == 2
+
+
+def test_since_reports_latest_change_per_translation(tmp_path):
+    feed = _feed(tmp_path)
+    feed.record("a", ChangeKind.CREATED)
+    feed.record("b", ChangeKind.CREATED)
+    feed.record("a", ChangeKind.UPDATED)
+    feed.record("c", ChangeKind.CREATED)
+    feed.record("c", ChangeKind.DELETED)
+
+    assert feed.since(2) == (5, {"a": ChangeKind.UPDATED, "c": ChangeKind.DELETED})
+    assert feed.since(5) == (5, {})
+
+
+def test_created_then_updated_since_revision_counts_as_created(tmp_path):
+    feed = _feed(tmp_path)
+    feed.record("a", ChangeKind.CREATED)
+    feed.record("a", ChangeKind.UPDATED)
+
+    assert feed.since(0) == (2, {"a": ChangeKind.CREATED})
+    assert feed.since(1) == (2, {"a": ChangeKind.UPDATED})
+
+
+def test_changes_from_other_workers_are_picked_up(tmp_path):
+    ours, theirs = _feed(tmp_path), _feed(tmp_path)
+    ours.record("a", ChangeKind.CREATED)
+    theirs.record("b", ChangeKind.CREATED)
+
+    assert ours.since(1) == (2, {"b": ChangeKind.CREATED})
+    assert theirs.revision == 2
+
+
+def test_half_written_line_is_left_for_later(tmp_path):
+    feed = _feed(tmp_path)
+    feed.record("a", ChangeKind.CREATED)
+    with (tmp_path / "changes.jsonl").open("ab") as f:
+        f.write(b'{"id": "b", "ki')
+    assert feed.revision == 1
+    with (tmp_path / "changes.jsonl").open("ab") as f:
+        f.write(b'nd": "created"}\n')
+    assert feed.since(1) == (2, {"b": ChangeKind.CREATED})
+
+
+def test_compaction_keeps_revisions_and_resets_older_clients(tmp_path):
+    feed = ChangeFeed(tmp_path / "changes.jsonl", nullcontext, max_entries=3)
+    feed.record("a", ChangeKind.CREATED)
+    feed.record("b", ChangeKind.CREATED)
+    assert feed.record("a", ChangeKind.DELETED) == 3
+
+    assert len((tmp_path / "changes.jsonl").read_text().splitlines()) == 1
+    assert feed.epoch == 1
+    assert feed.since(1) == (3, None)
+    assert feed.since(3) == (3, {})
+    assert feed.record("b", ChangeKind.UPDATED) == 4
+    assert feed.since(3) == (4, {"b": ChangeKind.UPDATED})
+
+
+def test_other_workers_follow_a_compaction(tmp_path):
+    ours = ChangeFeed(tmp_path / "changes.jsonl", nullcontext, max_entries=2)
+    theirs = _feed(tmp_path)
+    ours.record("a", ChangeKind.CREATED)
+    assert theirs.since(0) == (1, {"a": ChangeKind.CREATED})
+
+    ours.record("b", ChangeKind.CREATED)
+    ours.record("c", ChangeKind.CREATED)
+
+    assert theirs.epoch == 1
+    assert theirs.since(1) == (3, None)
+    assert theirs.since(2) == (3, {"c": ChangeKind.CREATED})
@@ -0,0 +1,108 @@
+import os
+import time
+
+from src.models.translation import TokenUsage, TranslationDirection
+from src.services.checkpoints import CheckpointJournal
+
+EN_TO_ZH = TranslationDirection.EN_TO_ZH
+ZH_TO_EN = TranslationDirection.ZH_TO_EN
+
+
+def test_recorded_groups_are_found_by_their_texts(tmp_path):
+    journal = CheckpointJournal(tmp_path)
+    checkpoint = journal.open("doc")
+    checkpoint.record(
+        EN_TO_ZH, ["Hello.", "World."], ["你好。", "世界。"], ["fast", "fast"],
+        TokenUsage(prompt_tokens=10, completion_tokens=4),
+    )
+    checkpoint.record(
+        EN_TO_ZH, ["Methods"], ["方法"], ["main"],
+        TokenUsage(prompt_tokens=25, completion_tokens=9),
+    )
+    checkpoint.close()
+
+    reopened = journal.open("doc")
+    assert reopened.direction is EN_TO_ZH
+    assert len(reopened) == 2
+    assert reopened.lookup(["Hello.", "World."]) == (["你好。", "世界。"], ["fast", "fast"])
+    assert reopened.lookup(["Hello."]) is None
+    # Usage is cumulative, so the last line holds the run's total.
+    assert reopened.usage == TokenUsage(prompt_tokens=25, completion_tokens=9)
+
+
+def test_resumed_runs_record_only_their_own_usage(tmp_path):
+    journal = CheckpointJournal(tmp_path)
+    first = journal.open("doc")
+    first.record(EN_TO_ZH, ["A"], ["甲"], [None], TokenUsage(prompt_tokens=10))
+    first.close()
+    second = journal.open("doc")
+    second.record(
+        EN_TO_ZH, ["B"], ["乙"], [None], second.usage + TokenUsage(prompt_tokens=5)
+    )
+    second.close()
+
+    assert journal.open("doc").usage == TokenUsage(prompt_tokens=15)
+
+
+def test_torn_lines_and_other_directions_are_skipped(tmp_path):
+    journal = CheckpointJournal(tmp_path)
+    checkpoint = journal.open("doc")
+    checkpoint.record(EN_TO_ZH, ["A"], ["甲"], [None], TokenUsage())
+    checkpoint.close()
+    [path] = (tmp_path / "doc").iterdir()
+    with path.open("ab") as f:
+        f.write(b'{"direction": "en_to_zh", "sour')
+    resumed = journal.open("doc")
+    resumed.record(EN_TO_ZH, ["B"], ["乙"], [None], TokenUsage())
+    resumed.close()
+    other = journal.open("doc")
+    other.record(ZH_TO_EN, ["C"], ["c"], [None], TokenUsage())
+    other.close()
+
+    reopened = journal.open("doc")
+    assert reopened.lookup(["A"]) == (["甲"], [None])
+    assert reopened.lookup(["B"]) == (["乙"], [None])
+    assert reopened.lookup(["C"]) is None
+
+
+def test_discard_removes_the_journals_it_resumed(tmp_path):
+    journal = CheckpointJournal(tmp_path)
+    interrupted = journal.open("doc")
+    interrupted.record(EN_TO_ZH, ["A"], ["甲"], [None], TokenUsage())
+    interrupted.close()
+
+    journal.open("doc").discard()
+    assert journal.open("doc").direction is None
+
+
+def test_concurrent_runs_share_groups_but_not_usage_or_journals(tmp_path):
+    journal = CheckpointJournal(tmp_path)
+    running = journal.open("doc")
+    running.record(EN_TO_ZH, ["A"], ["甲"], [None], TokenUsage(prompt_tokens=10))
+
+    concurrent = journal.open("doc")
+    assert concurrent.lookup(["A"]) == (["甲"], [None])
+    assert concurrent.usage == TokenUsage()
+    concurrent.discard()
+
+    running.record(EN_TO_ZH, ["B"], ["乙"], [None], TokenUsage(prompt_tokens=20))
+    running.close()
+    resumed = journal.open("doc")
+    assert len(resumed) == 2
+    assert resumed.usage == TokenUsage(prompt_tokens=20)
+
+
+def test_abandoned_journals_are_pruned(tmp_path):
+    journal = CheckpointJournal(tmp_path, max_age=3600)
+    old = journal.open("old")
+    old.record(EN_TO_ZH, ["A"], ["甲"], [None], TokenUsage())
+    old.close()
+    new = journal.open("new")
+    new.record(EN_TO_ZH, ["B"], ["乙"], [None], TokenUsage())
+    new.close()
+    stale = time.time() - 7200
+    [path] = (tmp_path / "old").iterdir()
+    os.utime(path, (stale, stale))
+
+    journal.open("other").close()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["new", "other"]
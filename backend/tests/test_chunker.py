@@ -1,5 +1,5 @@
 from src.models.translation import ParagraphStyle
-from src.services.chunker import group_paragraphs
+from src.services.chunker import ParagraphGrouper, group_paragraphs
 from src.services.document_parser import ParsedParagraph
 
 
@@ -144,3 +144,16 @@ class TestGroupParagraphsFigureTable:
         assert groups[0] == [paragraphs[0], paragraphs[1]]
         assert groups[1] == [paragraphs[2]]
         assert groups[2] == [paragraphs[3]]
+
+
+class TestParagraphGrouper:
+    def test_returns_groups_as_they_complete(self):
+        grouper = ParagraphGrouper(max_words=4)
+        assert grouper.add(_normal("one two")) == []
+        assert grouper.add(_normal("three four")) == []
+        assert grouper.add(_normal("five")) == [
+            [_normal("one two"), _normal("three four")]
+        ]
+        heading = _heading("Heading")
+        assert grouper.add(heading) == [[_normal("five")], [heading]]
+        assert grouper.finish() == []
@@ -0,0 +1,57 @@
+from src.services.circuit_breaker import (
+    BreakerState,
+    CircuitBreaker,
+    CircuitBreakerPolicy,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _breaker(clock: _Clock) -> CircuitBreaker:
+    policy = CircuitBreakerPolicy(
+        failure_rate=0.5, slow_call_seconds=10, window=4, min_calls=4, open_seconds=30
+    )
+    return CircuitBreaker(policy, clock=clock)
+
+
+def test_opens_once_failure_rate_is_reached():
+    breaker = _breaker(_Clock())
+    breaker.record_success(1)
+    breaker.record_failure()
+    breaker.record_success(1)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state is BreakerState.OPEN
+    assert not breaker.allow()
+
+
+def test_slow_calls_count_as_failures():
+    breaker = _breaker(_Clock())
+    for latency in (1, 1, 11, 12):
+        breaker.record_success(latency)
+    assert breaker.state is BreakerState.OPEN
+
+
+def test_half_open_lets_one_probe_through():
+    clock = _Clock()
+    breaker = _breaker(clock)
+    for _ in range(4):
+        breaker.record_failure()
+    clock.now = 31
+    assert breaker.allow()
+    assert breaker.state is BreakerState.HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state is BreakerState.OPEN
+    clock.now = 62
+    assert breaker.allow()
+    breaker.record_success(1)
+    assert breaker.state is BreakerState.CLOSED
+    assert breaker.allow()
@@ -0,0 +1,125 @@
+import zipfile
+from io import BytesIO
+
+import pytest
+from docx import Document
+from docx.shared import Pt
+
+from src.core.exceptions import InputValidationError
+from src.models.translation import (
+    ParagraphStyle,
+    TranslatedParagraph,
+    TranslationResult,
+)
+from src.services.docx_inplace import InPlaceDocxExporter
+from src.services.docx_stream import iter_docx_paragraphs
+
+
+def _source(tmp_path) -> tuple:
+    doc = Document()
+    doc.add_heading("Introduction", level=1)
+    run = doc.add_paragraph().add_run("Hello world.")
+    run.font.size = Pt(15)
+    doc.add_paragraph("42")
+    table = doc.add_table(rows=1, cols=1)
+    table.cell(0, 0).text = "Cell text"
+    doc.add_paragraph("Item one", style="List Number")
+    doc.core_properties.author = "Original Author"
+    path = tmp_path / "source.docx"
+    doc.save(path)
+    return path
+
+
+def _result() -> TranslationResult:
+    return TranslationResult(
+        filename="source.docx",
+        paragraphs=[
+            TranslatedParagraph(
+                original="Introduction", translated="簡介", style=ParagraphStyle.HEADING_1
+            ),
+            TranslatedParagraph(original="Hello world.", translated="你好\n世界。"),
+            TranslatedParagraph(original="42", translated="42"),
+            TranslatedParagraph(
+                original="<table>...</table>",
+                translated="<table>...</table>",
+                style=ParagraphStyle.TABLE,
+            ),
+            TranslatedParagraph(original="Item one", translated="第一項"),
+        ],
+    )
+
+
+def test_inserts_translation_after_each_source_paragraph(tmp_path):
+    exported = InPlaceDocxExporter().export(_source(tmp_path), _result())
+
+    doc = Document(BytesIO(exported))
+    texts = [p.text for p in doc.paragraphs]
+    assert texts == [
+        "Introduction",
+        "簡介",
+        "Hello world.",
+        "你好\n世界。",
+        "42",
+        "Item one",
+        "第一項",
+    ]
+    paragraphs = doc.paragraphs
+    assert paragraphs[1].style.name == "Heading 1"
+    assert paragraphs[3].runs[0].font.size == Pt(15)
+    # The list item's translation is not numbered as a second item.
+    assert paragraphs[6]._p.pPr.numPr is None
+    assert doc.tables[0].cell(0, 0).text == "Cell text"
+    assert doc.core_properties.author == "Original Author"
+
+
+def test_copies_other_parts_unchanged(tmp_path):
+    source = _source(tmp_path)
+    exported = InPlaceDocxExporter().export(source, _result())
+
+    with zipfile.ZipFile(source) as original, zipfile.ZipFile(BytesIO(exported)) as new:
+        assert original.namelist() == new.namelist()
+        for name in original.namelist():
+            if name != "word/document.xml":
+                assert original.read(name) == new.read(name), name
+
+
+def test_exported_text_round_trips_through_parser(tmp_path):
+    exported = InPlaceDocxExporter().export(_source(tmp_path), _result())
+    texts = [p.text for p in iter_docx_paragraphs(exported)]
+    assert "簡介" in texts
+    assert texts.count("42") == 1
+
+
+def test_rejects_non_docx_source(tmp_path):
+    source = tmp_path / "source.docx"
+    source.write_bytes(b"%PDF-1.7")
+    with pytest.raises(InputValidationError):
+        InPlaceDocxExporter().export(source, _result())
+
+
+def test_copies_compressed_bytes_without_recompressing(tmp_path):
+    source = _source(tmp_path)
+    repacked = tmp_path / "repacked.docx"
+    # Members compressed differently from zipfile's defaults, so a
+    # recompressing copy would change their sizes.
+    with zipfile.ZipFile(source) as original, zipfile.ZipFile(repacked, "w") as out:
+        for info in original.infolist():
+            data = original.read(info)
+            stored = info.filename.endswith(".rels")
+            info.compress_type = zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+            out.writestr(info, data, compresslevel=1)
+
+    exported = InPlaceDocxExporter().export(repacked, _result())
+
+    with (
+        zipfile.ZipFile(repacked) as original,
+        zipfile.ZipFile(BytesIO(exported)) as new,
+    ):
+        assert new.testzip() is None
+        for info in original.infolist():
+            if info.filename == "word/document.xml":
+                continue
+            copied = new.getinfo(info.filename)
+            assert copied.compress_type == info.compress_type
+            assert copied.compress_size == info.compress_size
+            assert copied.CRC == info.CRC
@@ -0,0 +1,126 @@
+import zipfile
+from io import BytesIO
+
+import pytest
+from docx import Document
+
+from src.core.exceptions import InputValidationError
+from src.models.translation import ParagraphStyle
+from src.services.docx_stream import iter_docx_paragraphs
+
+_NAMESPACES = (
+    'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" '
+    'xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape" '
+    'xmlns:v="urn:schemas-microsoft-com:vml"'
+)
+
+_STYLES = f"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:styles {_NAMESPACES}>
+  <w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/></w:style>
+  <w:style w:type="paragraph" w:styleId="Heading1"><w:name w:val="heading 1"/></w:style>
+  <w:style w:type="paragraph" w:styleId="Titel"><w:name w:val="Title"/></w:style>
+</w:styles>"""
+
+
+def _raw_docx(body: str) -> bytes:
+    document = (
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f"<w:document {_NAMESPACES}><w:body>{body}</w:body></w:document>"
+    )
+    buf = BytesIO()
+    with zipfile.ZipFile(buf, "w") as archive:
+        archive.writestr("word/document.xml", document)
+        archive.writestr("word/styles.xml", _STYLES)
+    return buf.getvalue()
+
+
+def _p(text: str, style: str | None = None) -> str:
+    ppr = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+    return f"<w:p>{ppr}<w:r><w:t>{text}</w:t></w:r></w:p>"
+
+
+def test_matches_python_docx_text_and_styles():
+    doc = Document()
+    doc.add_heading("Title text", level=0)
+    doc.add_heading("Section", level=1)
+    doc.add_heading("Deep", level=4)
+    paragraph = doc.add_paragraph("Tab")
+    paragraph.add_run().add_tab()
+    paragraph.add_run("and").add_break()
+    paragraph.add_run("break")
+    doc.add_paragraph("   ")
+    doc.add_paragraph("Quote", style="Quote")
+    buf = BytesIO()
+    doc.save(buf)
+
+    parsed = list(iter_docx_paragraphs(buf.getvalue()))
+
+    expected = [p for p in Document(BytesIO(buf.getvalue())).paragraphs if p.text.strip()]
+    assert [p.text for p in parsed] == [p.text for p in expected]
+    assert [p.style for p in parsed] == [
+        ParagraphStyle.TITLE,
+        ParagraphStyle.HEADING_1,
+        ParagraphStyle.HEADING_4,
+        ParagraphStyle.NORMAL,
+        ParagraphStyle.NORMAL,
+    ]
+
+
+def test_style_ids_resolve_through_style_table():
+    content = _raw_docx(_p("Localised title", "Titel") + _p("Heading", "Heading1"))
+    parsed = list(iter_docx_paragraphs(content))
+    assert [p.style for p in parsed] == [ParagraphStyle.TITLE, ParagraphStyle.HEADING_1]
+
+
+def test_tables_become_table_items():
+    nested = f"<w:tbl><w:tr><w:tc>{_p('inner')}</w:tc></w:tr></w:tbl>"
+    table = (
+        "<w:tbl>"
+        f"<w:tr><w:tc><w:tcPr><w:gridSpan w:val=\"2\"/></w:tcPr>{_p('a &amp; b')}</w:tc></w:tr>"
+        f"<w:tr><w:tc>{_p('x')}{_p('y')}</w:tc><w:tc>{nested}</w:tc></w:tr>"
+        "</w:tbl>"
+    )
+    parsed = list(iter_docx_paragraphs(_raw_docx(_p("Before") + table + _p("After"))))
+
+    assert [p.style for p in parsed] == [
+        ParagraphStyle.NORMAL,
+        ParagraphStyle.TABLE,
+        ParagraphStyle.NORMAL,
+    ]
+    assert parsed[1].text == (
+        '<table><tr><td colspan="2">a &amp; b</td></tr>'
+        "<tr><td>x y</td><td>inner</td></tr></table>"
+    )
+
+
+def test_text_boxes_are_read_once():
+    text_box = (
+        "<w:p><w:r><w:t>Host</w:t></w:r><w:r><mc:AlternateContent>"
+        "<mc:Choice Requires=\"wps\"><wps:txbx><w:txbxContent>"
+        f"{_p('Boxed')}"
+        "</w:txbxContent></wps:txbx></mc:Choice>"
+        "<mc:Fallback><v:textbox><w:txbxContent>"
+        f"{_p('Boxed')}"
+        "</w:txbxContent></v:textbox></mc:Fallback>"
+        "</mc:AlternateContent></w:r></w:p>"
+    )
+    parsed = list(iter_docx_paragraphs(_raw_docx(text_box)))
+    assert [p.text for p in parsed] == ["Boxed", "Host"]
+
+
+def test_yields_lazily():
+    body = "".join(_p(f"Paragraph {i}") for i in range(5000))
+    paragraphs = iter_docx_paragraphs(_raw_docx(body))
+    assert next(paragraphs).text == "Paragraph 0"
+    assert sum(1 for _ in paragraphs) == 4999
+
+
+def test_rejects_invalid_files():
+    with pytest.raises(InputValidationError):
+        list(iter_docx_paragraphs(b"not a zip"))
+    buf = BytesIO()
+    with zipfile.ZipFile(buf, "w") as archive:
+        archive.writestr("word/other.xml", "")
+    with pytest.raises(InputValidationError):
+        list(iter_docx_paragraphs(buf.getvalue()))
@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+from src.services.hedging import RequestHedger
+
+
+def _warm_hedger(**kwargs) -> RequestHedger:
+    hedger = RequestHedger(min_samples=5, min_delay=0.01, **kwargs)
+    for _ in range(5):
+        hedger.record(0.02)
+    return hedger
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_before_enough_samples():
+    hedger = RequestHedger(min_samples=5)
+    calls = 0
+
+    async def request():
+        nonlocal calls
+        calls += 1
+        return "ok"
+
+    assert await hedger.run(request) == "ok"
+    assert calls == 1
+    assert hedger.hedge_delay() is None
+
+
+@pytest.mark.asyncio
+async def test_straggler_is_hedged_and_loser_cancelled():
+    hedger = _warm_hedger(budget_ratio=1.0)
+    started: list[asyncio.Event] = []
+    cancelled = asyncio.Event()
+
+    async def request():
+        index = len(started)
+        started.append(asyncio.Event())
+        if index == 0:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return "slow"
+        return "fast"
+
+    assert await asyncio.wait_for(hedger.run(request), timeout=1) == "fast"
+    assert len(started) == 2
+    assert hedger.hedges_sent == 1
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_hedge_falls_back_to_primary_when_hedge_fails():
+    hedger = _warm_hedger(budget_ratio=1.0)
+    calls = 0
+
+    async def request():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(0.1)
+            return "primary"
+        raise RuntimeError("hedge failed")
+
+    assert await asyncio.wait_for(hedger.run(request), timeout=1) == "primary"
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_budget_limits_hedges():
+    hedger = _warm_hedger(budget_ratio=0.0)
+    calls = 0
+
+    async def request():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "slow"
+
+    assert await hedger.run(request) == "slow"
+    assert calls == 1
+    assert hedger.hedges_sent == 0
+
+
+def test_hedge_delay_tracks_percentile():
+    hedger = RequestHedger(percentile=0.9, min_samples=10, min_delay=0.0)
+    for latency in range(1, 11):
+        hedger.record(float(latency))
+    assert hedger.hedge_delay() == 9.0
+
+
+@pytest.mark.asyncio
+async def test_every_attempt_is_timed_from_its_own_start():
+    hedger = _warm_hedger(budget_ratio=1.0)
+    calls = 0
+
+    async def request():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(10)
+        return "fast"
+
+    assert await asyncio.wait_for(hedger.run(request), timeout=1) == "fast"
+    # Let the primary finish cancelling.
+    await asyncio.sleep(0.01)
+    # The fast hedge and the cancelled primary, which had run the longest.
+    latencies = sorted(hedger._latencies[""])
+    assert len(latencies) == 7
+    assert latencies[0] < 0.01 < latencies[-1]
+
+
+def test_latency_windows_are_kept_per_kind():
+    hedger = RequestHedger(min_samples=1, min_delay=0.0)
+    hedger.record(5.0, "gpt-4o")
+    hedger.record(0.5, "gpt-4o-mini")
+    assert hedger.hedge_delay("gpt-4o") == 5.0
+    assert hedger.hedge_delay("gpt-4o-mini") == 0.5
+    assert hedger.hedge_delay() is None
@@ -0,0 +1,36 @@
+from src.models.translation import ParagraphStyle
+from src.services.document_parser import ParsedParagraph
+from src.services.model_routing import ModelRouter
+
+
+def _para(words: int, style: ParagraphStyle = ParagraphStyle.NORMAL) -> ParsedParagraph:
+    return ParsedParagraph(text=" ".join(["word"] * words), style=style)
+
+
+def test_without_fast_model_everything_uses_main_model():
+    router = ModelRouter(main_model="main")
+    assert router.route([_para(3, ParagraphStyle.HEADING_1)]) == "main"
+    assert router.route([_para(300)]) == "main"
+    assert router.light_model == "main"
+
+
+def test_headings_and_short_groups_use_fast_model():
+    router = ModelRouter(main_model="main", fast_model="fast", fast_max_tokens=80)
+    assert router.route([_para(12, ParagraphStyle.TITLE)]) == "fast"
+    # Each 20-word paragraph estimates at 34 tokens.
+    assert router.route([_para(20), _para(20)]) == "fast"
+    assert router.light_model == "fast"
+
+
+def test_long_body_groups_use_main_model():
+    router = ModelRouter(main_model="main", fast_model="fast", fast_max_tokens=80)
+    assert router.route([_para(30), _para(20)]) == "main"
+
+
+def test_chinese_body_text_is_measured_without_spaces():
+    router = ModelRouter(main_model="main", fast_model="fast", fast_max_tokens=80)
+    paragraph = ParsedParagraph(
+        text="這是一段沒有空格的中文內文。" * 20, style=ParagraphStyle.NORMAL
+    )
+    assert router.route([paragraph] * 10) == "main"
+    assert router.route([ParsedParagraph(text="簡短的說明。", style=ParagraphStyle.NORMAL)]) == "fast"
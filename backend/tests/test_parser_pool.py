@@ -0,0 +1,50 @@
+import asyncio
+from io import BytesIO
+
+import pytest
+from docx import Document
+
+from src.core.exceptions import InputValidationError, ServiceUnavailableError
+from src.models.translation import ParagraphStyle
+from src.services.document_parser import ParsedParagraph
+from src.services.parser_pool import ParserPool
+
+
+@pytest.fixture(scope="module")
+def pool():
+    parser_pool = ParserPool(workers=1, max_queue=0, max_documents_per_worker=2)
+    parser_pool.warm_up()
+    yield parser_pool
+    parser_pool.shutdown()
+
+
+def _make_docx(paragraphs: list[str]) -> bytes:
+    doc = Document()
+    for p in paragraphs:
+        doc.add_paragraph(p)
+    buf = BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_pool_parses_in_worker_process(pool):
+    # More documents than max_documents_per_worker forces a worker recycle.
+    for _ in range(3):
+        result = await pool.parse(_make_docx(["Hello."]), "test.docx")
+        assert result == [ParsedParagraph(text="Hello.", style=ParagraphStyle.NORMAL)]
+
+
+@pytest.mark.asyncio
+async def test_pool_propagates_parser_errors(pool):
+    with pytest.raises(InputValidationError):
+        await pool.parse(b"data", "test.txt")
+
+
+@pytest.mark.asyncio
+async def test_pool_rejects_when_queue_is_full(pool):
+    first = asyncio.ensure_future(pool.parse(_make_docx(["Hello."]), "test.docx"))
+    await asyncio.sleep(0)
+    with pytest.raises(ServiceUnavailableError):
+        await pool.parse(_make_docx(["World."]), "test.docx")
+    assert len(await first) == 1
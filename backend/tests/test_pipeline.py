@@ -0,0 +1,57 @@
+import asyncio
+import threading
+from contextlib import aclosing
+
+import pytest
+
+from src.services.pipeline import iterate_in_thread
+
+
+@pytest.mark.asyncio
+async def test_yields_items_in_order():
+    items = [item async for item in iterate_in_thread(lambda: iter(range(100)), 4)]
+    assert items == list(range(100))
+
+
+@pytest.mark.asyncio
+async def test_reraises_iterator_errors_after_earlier_items():
+    def _items():
+        yield 1
+        raise ValueError("bad page")
+
+    received = []
+    with pytest.raises(ValueError, match="bad page"):
+        async for item in iterate_in_thread(_items, 4):
+            received.append(item)
+    assert received == [1]
+
+
+@pytest.mark.asyncio
+async def test_producer_stays_within_buffer():
+    produced = []
+
+    def _items():
+        for i in range(50):
+            produced.append(i)
+            yield i
+
+    async with aclosing(iterate_in_thread(_items, 3)) as items:
+        assert await anext(items) == 0
+        await asyncio.sleep(0.2)
+        # One item consumed, three buffered, one blocked waiting for a slot.
+        assert len(produced) <= 5
+
+
+@pytest.mark.asyncio
+async def test_producer_stops_when_consumer_leaves():
+    finished = threading.Event()
+
+    def _items():
+        try:
+            yield from range(10_000)
+        finally:
+            finished.set()
+
+    async with aclosing(iterate_in_thread(_items, 2)) as items:
+        await anext(items)
+    assert await asyncio.to_thread(finished.wait, 2)
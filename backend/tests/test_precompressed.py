@@ -0,0 +1,25 @@
+import gzip
+
+from src.services.precompressed import IDENTITY, choose_encoding, encode_variants
+
+
+def test_encode_variants_round_trip():
+    data = b'{"paragraphs": []}' * 100
+    variants = encode_variants(data)
+    assert variants[IDENTITY] == data
+    assert gzip.decompress(variants["gzip"]) == data
+    assert len(variants["gzip"]) < len(data)
+
+
+def test_choose_encoding_prefers_brotli_then_gzip():
+    available = {IDENTITY, "gzip", "br"}
+    assert choose_encoding("gzip, deflate, br", available) == "br"
+    assert choose_encoding("gzip, deflate, br", {IDENTITY, "gzip"}) == "gzip"
+    assert choose_encoding("", available) == IDENTITY
+
+
+def test_choose_encoding_honours_quality_values():
+    available = {IDENTITY, "gzip", "br"}
+    assert choose_encoding("br;q=0, gzip", available) == "gzip"
+    assert choose_encoding("*;q=0.5", available) == "br"
+    assert choose_encoding("*;q=0", available) == IDENTITY
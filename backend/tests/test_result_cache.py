@@ -0,0 +1,64 @@
+import threading
+
+from src.models.translation import TranslatedParagraph, TranslationResult
+from src.services.result_cache import ResultCache, estimate_size
+
+
+def _result(text: str = "Hello") -> TranslationResult:
+    return TranslationResult(
+        filename="paper.pdf",
+        paragraphs=[TranslatedParagraph(original=text, translated=text)],
+    )
+
+
+def test_get_requires_matching_version():
+    cache = ResultCache(max_bytes=10_000)
+    result = _result()
+    cache.put("a", 1, result)
+    assert cache.get("a", 1) is result
+    assert cache.get("a", 2) is None
+    # A version mismatch drops the stale entry.
+    assert cache.get("a", 1) is None
+    assert cache.size == 0
+
+
+def test_evicts_least_recently_used_by_bytes():
+    one = estimate_size(_result("x" * 1000))
+    cache = ResultCache(max_bytes=2 * one)
+    cache.put("a", 0, _result("x" * 1000))
+    cache.put("b", 0, _result("y" * 1000))
+    cache.get("a", 0)
+    cache.put("c", 0, _result("z" * 1000))
+    assert cache.get("a", 0) is not None
+    assert cache.get("b", 0) is None
+    assert cache.get("c", 0) is not None
+    assert cache.size <= 2 * one
+
+
+def test_skips_results_larger_than_the_cache():
+    cache = ResultCache(max_bytes=100)
+    cache.put("a", 0, _result("x" * 1000))
+    assert cache.get("a", 0) is None
+    assert cache.size == 0
+
+
+def test_concurrent_access_keeps_size_consistent():
+    cache = ResultCache(max_bytes=estimate_size(_result()) * 5)
+
+    def _worker(offset: int) -> None:
+        for i in range(200):
+            key = str((i + offset) % 8)
+            cache.put(key, i % 3, _result())
+            cache.get(key, i % 3)
+            if i % 7 == 0:
+                cache.invalidate(key)
+
+    threads = [threading.Thread(target=_worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert cache.size == sum(
+        estimate_size(entry[1]) for entry in cache._entries.values()
+    )
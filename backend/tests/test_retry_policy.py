@@ -0,0 +1,77 @@
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import openai
+import pytest
+
+from src.core.exceptions import TokenBudgetExceededError
+from src.services.retry_policy import RetryPolicy, is_transient
+
+_REQUEST = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+
+def _status_error(cls, status: int, headers: dict[str, str] | None = None):
+    response = httpx.Response(status, request=_REQUEST, headers=headers)
+    return cls("error", response=response, body=None)
+
+
+@pytest.mark.parametrize(
+    ("exc", "transient"),
+    [
+        (openai.APITimeoutError(request=_REQUEST), True),
+        (openai.APIConnectionError(request=_REQUEST), True),
+        (_status_error(openai.RateLimitError, 429), True),
+        (_status_error(openai.InternalServerError, 503), True),
+        (TimeoutError(), True),
+        (_status_error(openai.BadRequestError, 400), False),
+        (_status_error(openai.AuthenticationError, 401), False),
+        (TokenBudgetExceededError("over budget"), False),
+        (ValueError("bug"), False),
+    ],
+)
+def test_is_transient(exc, transient):
+    assert is_transient(exc) is transient
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried_until_success():
+    call = AsyncMock(
+        side_effect=[openai.APITimeoutError(request=_REQUEST), TimeoutError(), "ok"]
+    )
+    with patch("src.services.retry_policy.asyncio.sleep", new_callable=AsyncMock):
+        assert await RetryPolicy(retries=3).run(call) == "ok"
+    assert call.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_the_last_retry():
+    call = AsyncMock(side_effect=TimeoutError())
+    with (
+        patch("src.services.retry_policy.asyncio.sleep", new_callable=AsyncMock),
+        pytest.raises(TimeoutError),
+    ):
+        await RetryPolicy(retries=2).run(call)
+    assert call.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_fatal_errors_are_not_retried():
+    call = AsyncMock(side_effect=_status_error(openai.BadRequestError, 400))
+    with pytest.raises(openai.BadRequestError):
+        await RetryPolicy(retries=3).run(call)
+    assert call.await_count == 1
+
+
+def test_delay_grows_exponentially_up_to_the_cap():
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0)
+    with patch("src.services.retry_policy.random.uniform", side_effect=lambda a, b: b):
+        assert [policy.delay(n) for n in range(4)] == [1.0, 2.0, 4.0, 5.0]
+
+
+def test_delay_honours_retry_after_within_the_cap():
+    policy = RetryPolicy(base_delay=1.0, max_delay=10.0)
+    with patch("src.services.retry_policy.random.uniform", return_value=0.5):
+        limited = _status_error(openai.RateLimitError, 429, {"retry-after": "7"})
+        assert policy.delay(0, limited) == 7.0
+        limited = _status_error(openai.RateLimitError, 429, {"retry-after": "60"})
+        assert policy.delay(0, limited) == 10.0
@@ -0,0 +1,49 @@
+import pytest
+
+from src.services.segment_filter import is_passthrough
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "42",
+        "3.5–4.2 %",
+        "(12, 7)",
+        "Page 3",
+        "p. 12",
+        "3 / 10",
+        "https://example.com/paper?id=1",
+        "www.example.org",
+        "10.1038/s41586-020-2649-2",
+        "doi: 10.1000/xyz123",
+        "https://doi.org/10.1000/xyz123",
+        "author@example.edu",
+        "numpy.linalg.norm",
+        "max_tokens",
+        "parseResponse",
+        "translate()",
+        "E = mc^2",
+        "y = sin(x) + b",
+        "x ≤ 2y + 3",
+    ],
+)
+def test_passthrough_segments(text):
+    assert is_passthrough(text)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Introduction",
+        "Figure 3",
+        "The results are shown in Table 2.",
+        "Accuracy = correct / total",
+        "面積 = 5",
+        "If x = 1 it is ok",
+        "So a = b as we saw",
+        "Methods and Materials",
+        "你好世界。",
+    ],
+)
+def test_translatable_segments(text):
+    assert not is_passthrough(text)
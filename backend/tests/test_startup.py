@@ -0,0 +1,39 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from src.main import app
+
+_BACKEND_DIR = Path(__file__).resolve().parent.parent
+_HEAVY_MODULES = ["openai", "pymupdf", "pymupdf4llm", "docx", "landingai_ade"]
+
+_IMPORT_CHECK = f"""
+import json, sys
+import src.main
+print(json.dumps([m for m in {_HEAVY_MODULES!r} if m in sys.modules]))
+"""
+
+
+def test_app_import_does_not_load_heavy_backends():
+    """``import src.main`` must stay free of parser/API SDKs to start fast."""
+    completed = subprocess.run(
+        [sys.executable, "-c", _IMPORT_CHECK],
+        cwd=_BACKEND_DIR,
+        env={**os.environ, "OPENAI_API_KEY": "test-key"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert json.loads(completed.stdout) == []
+
+
+def test_lifespan_builds_and_closes_service():
+    with TestClient(app) as client:
+        assert client.get("/health").json() == {"status": "ok"}
+        service = app.state.translation_service
+        assert client.get("/api/v1/translations").status_code == 200
+        assert app.state.translation_service is service
@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from src.models.translation import (
+    ParagraphStyle,
+    TranslatedParagraph,
+    TranslationDirection,
+    TranslationResult,
+)
+from src.services.storage_format import (
+    StorageFormatError,
+    decode_header,
+    decode_result,
+    encode_result,
+)
+
+
+@pytest.fixture
+def result():
+    paragraphs = [
+        TranslatedParagraph(original="Methods", translated="方法", style=ParagraphStyle.HEADING_1),
+        TranslatedParagraph(
+            original="<::chart::>",
+            translated="",
+            style=ParagraphStyle.FIGURE,
+            image="iVBORw0KGgoAAAANSUhEUg==",
+        ),
+    ]
+    paragraphs += [
+        TranslatedParagraph(original=f"Sentence number {i}.", translated=f"第 {i} 句。")
+        for i in range(200)
+    ]
+    return TranslationResult(
+        filename="paper.pdf", direction=TranslationDirection.EN_TO_ZH, paragraphs=paragraphs
+    )
+
+
+def test_round_trip(result):
+    assert decode_result(encode_result(result)) == result
+
+
+def test_round_trip_without_paragraphs():
+    empty = TranslationResult(filename="empty.docx", paragraphs=[])
+    assert decode_result(encode_result(empty)) == empty
+
+
+def test_header_carries_summary(result):
+    header = decode_header(encode_result(result, meta={"extra": 1}))
+    assert header["id"] == str(result.id)
+    assert header["filename"] == "paper.pdf"
+    assert header["paragraph_count"] == 202
+    assert header["extra"] == 1
+
+
+def test_compact_format_is_much_smaller_than_json(result):
+    legacy = json.dumps(result.model_dump(mode="json"), ensure_ascii=False, indent=2)
+    assert len(encode_result(result)) * 4 < len(legacy.encode("utf-8"))
+
+
+@pytest.mark.parametrize("blob", [b"", b"{}", b"PBT\x01\x00\x00\x00\x00garbage"])
+def test_corrupted_data_raises(blob):
+    with pytest.raises(StorageFormatError):
+        decode_result(blob)
@@ -0,0 +1,171 @@
+import os
+import time
+import uuid
+
+import pytest
+
+from src.core.exceptions import NotFoundError
+from src.models.translation import TranslatedParagraph, TranslationResult
+from src.services.storage_quota import StorageCompactor, StorageQuota
+from src.services.translation_store import TranslationStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TranslationStore(storage_dir=tmp_path)
+
+
+def _save(store, upload: bytes | None = None, accessed_at: float = 0.0) -> str:
+    result = TranslationResult(
+        id=uuid.uuid4(),
+        filename="paper.pdf",
+        paragraphs=[TranslatedParagraph(original="Hello", translated="你好")],
+    )
+    translation_id = str(result.id)
+    store.save(result)
+    if upload is not None:
+        stored = store.save_upload(translation_id, "paper.pdf", upload)
+        _set_access(store._access_path(stored.sha256, "sha256"), accessed_at)
+    _set_access(store._access_path(translation_id), accessed_at)
+    return translation_id
+
+
+def _set_access(marker, accessed_at: float) -> None:
+    marker.parent.mkdir(parents=True, exist_ok=True)
+    marker.touch()
+    os.utime(marker, (accessed_at, accessed_at))
+
+
+def test_reads_record_access_without_touching_stored_files(store):
+    translation_id = _save(store, upload=b"%PDF", accessed_at=1_000.0)
+    path = store._storage_dir / translation_id[:2] / f"{translation_id}.pbt"
+    mtime = path.stat().st_mtime
+
+    store.load(translation_id)
+    store.load_upload(translation_id)
+
+    [entry] = store.usage()
+    assert entry.accessed_at > 1_000.0
+    assert entry.upload_accessed_at > 1_000.0
+    assert path.stat().st_mtime == mtime
+
+
+def test_listing_and_usage_do_not_count_as_access(store):
+    translation_id = _save(store, upload=b"%PDF", accessed_at=1_000.0)
+
+    store.list_all()
+    store.usage()
+
+    [entry] = store.usage()
+    assert entry.translation_id == translation_id
+    assert entry.accessed_at == 1_000.0
+    assert entry.upload_accessed_at == 1_000.0
+
+
+def test_unread_translations_count_from_when_they_were_saved(store):
+    before = time.time() - 1
+    result = TranslationResult(id=uuid.uuid4(), filename="paper.pdf", paragraphs=[])
+    store.save(result)
+
+    [entry] = store.usage()
+    assert entry.accessed_at >= before
+
+
+def test_delete_removes_access_marker(store):
+    translation_id = _save(store, upload=b"%PDF", accessed_at=1_000.0)
+    store.delete(translation_id)
+    assert not any(p.is_file() for p in (store._storage_dir / ".access").rglob("*"))
+
+
+def test_no_limits_keeps_everything(store):
+    ids = [_save(store, upload=os.urandom(64)) for _ in range(3)]
+    report = StorageCompactor(store, StorageQuota()).compact()
+    assert report.translations_evicted == 0
+    assert report.uploads_dropped == 0
+    assert {e.translation_id for e in store.usage()} == set(ids)
+
+
+def test_max_documents_evicts_least_recently_accessed(store):
+    oldest = _save(store, accessed_at=100.0)
+    middle = _save(store, accessed_at=200.0)
+    newest = _save(store, accessed_at=300.0)
+
+    report = StorageCompactor(store, StorageQuota(max_documents=2)).compact()
+
+    assert report.translations_evicted == 1
+    with pytest.raises(NotFoundError):
+        store.load(oldest)
+    assert store.load(middle) and store.load(newest)
+
+
+def test_max_age_counts_from_last_access(store):
+    stale = _save(store, accessed_at=time.time() - 3 * 86400)
+    fresh = _save(store, accessed_at=time.time())
+
+    StorageCompactor(store, StorageQuota(max_age_seconds=86400)).compact()
+
+    with pytest.raises(NotFoundError):
+        store.load(stale)
+    assert store.load(fresh)
+
+
+def test_byte_quota_drops_originals_before_translations(store):
+    old = _save(store, upload=os.urandom(50_000), accessed_at=100.0)
+    new = _save(store, upload=os.urandom(50_000), accessed_at=200.0)
+    budget = store.disk_usage() - 40_000
+
+    report = StorageCompactor(store, StorageQuota(max_bytes=budget)).compact()
+
+    assert report.uploads_dropped == 1
+    assert report.translations_evicted == 0
+    assert report.bytes_used <= budget
+    assert report.bytes_used >= store.disk_usage()
+    assert store.load_upload(old) is None
+    assert store.load_upload(new) is not None
+    assert store.load(old)
+
+
+def test_byte_quota_evicts_translations_once_originals_are_gone(store):
+    old = _save(store, upload=os.urandom(1_000), accessed_at=100.0)
+    new = _save(store, accessed_at=200.0)
+
+    report = StorageCompactor(store, StorageQuota(max_bytes=1)).compact()
+
+    assert report.uploads_dropped == 1
+    assert report.translations_evicted == 2
+    for translation_id in (old, new):
+        with pytest.raises(NotFoundError):
+            store.load(translation_id)
+
+
+def test_orphaned_uploads_are_removed_after_grace_period(store, tmp_path):
+    # save_upload succeeded but the translation itself was never written.
+    orphan = store.save_upload(str(uuid.uuid4()), "paper.pdf", b"orphan")
+    kept_id = _save(store, upload=b"kept")
+    stale = tmp_path / "uploads" / ".leftover.tmp"
+    stale.write_bytes(b"partial")
+    for path in (tmp_path / orphan.path, tmp_path / f"{orphan.path}.refs", stale):
+        os.utime(path, (0, 0))
+
+    recent = store.save_upload(str(uuid.uuid4()), "paper.pdf", b"in flight")
+
+    report = StorageCompactor(store, StorageQuota()).compact()
+
+    assert report.orphans_removed == 2
+    assert not (tmp_path / orphan.path).exists()
+    assert not stale.exists()
+    assert (tmp_path / recent.path).exists()
+    assert store.load_upload(kept_id) is not None
+
+
+def test_dropping_an_upload_keeps_the_translations_age(store):
+    translation_id = _save(store, upload=b"%PDF")
+    path = store._storage_dir / translation_id[:2] / f"{translation_id}.pbt"
+    os.utime(path, (1_000.0, 1_000.0))
+    store._access_path(translation_id).unlink()
+
+    assert store.drop_upload(translation_id)
+
+    assert path.stat().st_mtime == 1_000.0
+    [entry] = store.usage()
+    assert entry.accessed_at == 1_000.0
@@ -0,0 +1,28 @@
+from src.services.table_cells import TableTemplate, table_rows
+
+_TABLE = (
+    "<table><caption>Results</caption>"
+    '<tr><th colspan="2">Group &amp; size</th></tr>'
+    "<tr><td>A</td><td></td></tr></table>"
+)
+
+
+def test_template_lists_cell_texts_unescaped():
+    assert TableTemplate(_TABLE).cells == ["Results", "Group & size", "A"]
+
+
+def test_render_keeps_structure_and_escapes_translations():
+    rendered = TableTemplate(_TABLE).render(["結果", "組 & <大小>", "甲"])
+    assert rendered == (
+        "<table><caption>結果</caption>"
+        '<tr><th colspan="2">組 &amp; &lt;大小&gt;</th></tr>'
+        "<tr><td>甲</td><td></td></tr></table>"
+    )
+
+
+def test_table_rows_reads_colspans_and_caption():
+    assert table_rows(_TABLE) == [
+        [("Results", 2)],
+        [("Group & size", 2)],
+        [("A", 1), ("", 1)],
+    ]
@@ -0,0 +1,101 @@
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src.core.exceptions import TokenBudgetExceededError
+from src.models.translation import TokenUsage
+from src.services.token_usage import (
+    UsageLedger,
+    UsageMeter,
+    estimate_request_tokens,
+    parse_usage,
+)
+
+
+def test_parse_usage_reads_sdk_objects_and_batch_json():
+    sdk = SimpleNamespace(
+        prompt_tokens=120,
+        completion_tokens=80,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=64),
+    )
+    assert parse_usage(sdk) == TokenUsage(
+        prompt_tokens=120, completion_tokens=80, cached_tokens=64
+    )
+    raw = {"prompt_tokens": 10, "completion_tokens": 5}
+    assert parse_usage(raw) == TokenUsage(prompt_tokens=10, completion_tokens=5)
+    assert parse_usage(None) is None
+
+
+def test_estimate_covers_prompt_and_translation():
+    request = {
+        "messages": [
+            {"role": "system", "content": "x" * 30},
+            {"role": "user", "content": "y" * 300},
+        ]
+    }
+    assert estimate_request_tokens(request) == 11 + 101 + 101
+
+
+def test_meter_refuses_calls_beyond_document_budget(tmp_path):
+    meter = UsageMeter("doc", UsageLedger(tmp_path), budget=100)
+    meter.reserve(60)
+    meter.settle(60, "gpt-4o-mini", TokenUsage(prompt_tokens=50, completion_tokens=20))
+    assert meter.usage.total_tokens == 70
+
+    with pytest.raises(TokenBudgetExceededError) as exc_info:
+        meter.reserve(40)
+    assert exc_info.value.status_code == 429
+    meter.reserve(30)
+
+
+def test_meter_counts_in_flight_reservations(tmp_path):
+    meter = UsageMeter("doc", budget=100)
+    meter.reserve(60)
+    with pytest.raises(TokenBudgetExceededError):
+        meter.reserve(60)
+    meter.settle(60, "gpt-4o-mini", None)
+    meter.reserve(60)
+
+
+def test_ledger_totals_include_other_workers_appends(tmp_path):
+    first = UsageLedger(tmp_path)
+    second = UsageLedger(tmp_path)
+    first.record("a", "gpt-4o-mini", TokenUsage(prompt_tokens=10, completion_tokens=5))
+    report = second.report(days=2)
+    assert report.total.total_tokens == 15
+
+    first.record("b", "gpt-4o-mini", TokenUsage(prompt_tokens=1, cached_tokens=1))
+    report = second.report(days=2)
+    assert report.total == TokenUsage(
+        prompt_tokens=11, completion_tokens=5, cached_tokens=1
+    )
+    assert report.days[0].usage == report.total
+    assert report.days[1].usage == TokenUsage()
+
+
+def test_daily_budget_pauses_until_midnight(tmp_path):
+    ledger = UsageLedger(tmp_path, daily_budget=100)
+    UsageLedger(tmp_path).record(
+        "a", "gpt-4o-mini", TokenUsage(prompt_tokens=90, completion_tokens=5)
+    )
+    meter = UsageMeter("b", ledger)
+    with pytest.raises(TokenBudgetExceededError) as exc_info:
+        meter.reserve(10)
+    assert 0 < int(exc_info.value.headers["Retry-After"]) <= 86400
+    meter.reserve(5)
+
+
+def test_ledger_deletes_days_past_retention(tmp_path):
+    today = datetime.now(UTC).date()
+    old = tmp_path / f"{(today - timedelta(days=31)).isoformat()}.jsonl"
+    kept = tmp_path / f"{(today - timedelta(days=30)).isoformat()}.jsonl"
+    old.write_text("")
+    kept.write_text("")
+
+    UsageLedger(tmp_path, retention_days=30).record(
+        "a", "gpt-4o-mini", TokenUsage(prompt_tokens=1)
+    )
+
+    assert not old.exists()
+    assert kept.exists()
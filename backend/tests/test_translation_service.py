@@ -1,17 +1,27 @@
 import asyncio
 from io import BytesIO
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, patch
 
 import pytest
 from docx import Document
 
-from src.core.exceptions import NotFoundError
+from src.core.exceptions import (
+    ConflictError,
+    InputValidationError,
+    NotFoundError,
+    TokenBudgetExceededError,
+)
 from src.models.translation import (
+    ExportLayout,
     ParagraphStyle,
+    TokenUsage,
     TranslationDirection,
     TranslationResult,
 )
-from src.services.translation_service import TranslationService
+from src.services.document_parser import ParsedParagraph
+from src.services.translation_service import TranslationService, _DocumentPlan
+from src.services.translation_strategy import PartialTranslationError
 
 _DETECT_LANG = "src.services.translation_service.detect_language"
 _BATCH_TRANSLATE = "src.services.translation_service.BatchTranslationStrategy.translate"
@@ -155,7 +165,7 @@ async def test_heading_separated_groups_translated_independently(service):
 
     call_count = 0
 
-    async def mock_translate(texts):
+    async def mock_translate(texts, on_item=None):
         nonlocal call_count
         call_count += 1
         if texts == ["Introduction paragraph."]:
@@ -182,8 +192,9 @@ async def test_heading_separated_groups_translated_independently(service):
 
 
 @pytest.mark.asyncio
-async def test_figure_and_table_paragraphs_skip_translation(service):
-    """FIGURE and TABLE paragraphs should get translated='' without calling strategy."""
+async def test_figures_skip_translation_and_table_cells_join_groups(service):
+    """FIGURE paragraphs get translated='' without calling strategy; TABLE
+    cells are batched with the following text and written back into the HTML."""
     from src.services.document_parser import ParsedParagraph
 
     parsed = [
@@ -204,23 +215,24 @@ async def test_figure_and_table_paragraphs_skip_translation(service):
         patch(_DETECT_LANG, new_callable=AsyncMock) as mock_detect,
         patch(_BATCH_TRANSLATE, new_callable=AsyncMock) as mock_translate,
     ):
-        mock_parser.parse.return_value = parsed
+        mock_parser.iter_parse.return_value = iter(parsed)
         mock_detect.return_value = TranslationDirection.EN_TO_ZH
         mock_translate.side_effect = [
             ["普通文本。"],
-            ["更多文本。"],
+            ["叉", "更多文本。"],
         ]
         result = await service.translate_document(b"fake", "test.pdf")
 
-    # Strategy should only be called for the two NORMAL groups, not for FIGURE or TABLE
+    # The figure splits the groups; the table cell rides along with "More text."
     assert mock_translate.call_count == 2
+    assert mock_translate.call_args_list[1].args[0] == ["X", "More text."]
 
     assert result.paragraphs[0].translated == "普通文本。"
     assert result.paragraphs[1].style == ParagraphStyle.FIGURE
     assert result.paragraphs[1].translated == ""
     assert result.paragraphs[1].image == "iVBORw0KGgo="
     assert result.paragraphs[2].style == ParagraphStyle.TABLE
-    assert result.paragraphs[2].translated == ""
+    assert result.paragraphs[2].translated == "<table><tr><td>叉</td></tr></table>"
     assert result.paragraphs[3].translated == "更多文本。"
 
 
@@ -270,6 +282,36 @@ async def test_retranslate_preserves_detected_direction(service):
     assert retranslated.paragraphs[0].translated == "哈囉。"
 
 
+@pytest.mark.asyncio
+async def test_retranslate_does_not_overwrite_a_concurrent_save(service):
+    with (
+        patch(_DETECT_LANG, new_callable=AsyncMock) as mock_detect,
+        patch(_BATCH_TRANSLATE, new_callable=AsyncMock) as mock_translate,
+    ):
+        mock_detect.return_value = TranslationDirection.EN_TO_ZH
+        mock_translate.return_value = ["你好。"]
+        original = await service.translate_document(
+            _make_docx(["Hello."]), "test.docx"
+        )
+
+    async def translate_while_edited(texts, on_item=None):
+        # Not blocked by the retranslation, which only locks to read and save.
+        async with service._store.lock(str(original.id)):
+            edited = original.model_copy(update={"filename": "renamed.docx"})
+            await asyncio.to_thread(service._store.save, edited)
+        return ["哈囉。"]
+
+    with (
+        patch(_DETECT_LANG, new_callable=AsyncMock) as mock_detect,
+        patch(_BATCH_TRANSLATE, side_effect=translate_while_edited),
+    ):
+        mock_detect.return_value = TranslationDirection.EN_TO_ZH
+        with pytest.raises(ConflictError):
+            await service.retranslate(str(original.id))
+
+    assert service.get_translation(str(original.id)).filename == "renamed.docx"
+
+
 def test_export_zh_to_en_filename(service):
     """Export filename should always end with _對照.docx regardless of direction."""
     docx_content = _make_docx(["你好。"])
@@ -289,3 +331,399 @@ def test_export_zh_to_en_filename(service):
     assert isinstance(docx_bytes, bytes)
     assert len(docx_bytes) > 0
     assert filename == "test_對照.docx"
+
+
+@pytest.mark.asyncio
+async def test_translate_document_publishes_paragraphs_by_document_index(service):
+    from src.services.document_parser import ParsedParagraph
+
+    parsed = [
+        ParsedParagraph(text="Methods", style=ParagraphStyle.HEADING_1),
+        ParsedParagraph(text="<::chart::>", style=ParagraphStyle.FIGURE),
+        ParsedParagraph(text="Body.", style=ParagraphStyle.NORMAL),
+    ]
+
+    async def mock_translate(texts, on_item=None):
+        translated = [f"譯:{t}" for t in texts]
+        for index, text in enumerate(translated):
+            on_item(index, text)
+        return translated
+
+    published = {}
+    with (
+        patch.object(service, "_parser") as mock_parser,
+        patch(_DETECT_LANG, new_callable=AsyncMock) as mock_detect,
+        patch(_BATCH_TRANSLATE, side_effect=mock_translate),
+    ):
+        mock_parser.iter_parse.return_value = iter(parsed)
+        mock_detect.return_value = TranslationDirection.EN_TO_ZH
+        await service.translate_document(
+            b"fake", "test.pdf", on_paragraph=published.__setitem__
+        )
+
+    assert sorted(published) == [0, 1, 2]
+    assert published[0].translated == "譯:Methods"
+    assert published[1].style == ParagraphStyle.FIGURE
+    assert published[2].translated == "譯:Body."
+
+
+@pytest.mark.asyncio
+async def test_passthrough_and_duplicate_paragraphs_are_not_resent(service):
+    from src.services.document_parser import ParsedParagraph
+
+    parsed = [
+        ParsedParagraph(text="Figure 3", style=ParagraphStyle.NORMAL),
+        ParsedParagraph(text="https://example.com", style=ParagraphStyle.NORMAL),
+        ParsedParagraph(text="Body.", style=ParagraphStyle.NORMAL),
+        ParsedParagraph(text="12", style=ParagraphStyle.NORMAL),
+        ParsedParagraph(text="Figure 3", style=ParagraphStyle.NORMAL),
+    ]
+
+    with (
+        patch.object(service, "_parser") as mock_parser,
+        patch(_DETECT_LANG, new_callable=AsyncMock) as mock_detect,
+        patch(_BATCH_TRANSLATE, new_callable=AsyncMock) as mock_translate,
+    ):
+        mock_parser.iter_parse.return_value = iter(parsed)
+        mock_detect.return_value = TranslationDirection.EN_TO_ZH
+        mock_translate.return_value = ["圖 3", "正文。"]
+        result = await service.translate_document(b"fake", "test.pdf")
+
+    mock_translate.assert_called_once()
+    assert mock_translate.call_args.args[0] == ["Figure 3", "Body."]
+    assert [p.translated for p in result.paragraphs] == [
+        "圖 3",
+        "https://example.com",
+        "正文。",
+        "12",
+        "圖 3",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_export_inline_edits_original_upload(service):
+    docx_content = _make_docx(["Hello.", "World."])
+    with (
+        patch(_DETECT_LANG, new_callable=AsyncMock) as mock_detect,
+        patch(_BATCH_TRANSLATE, new_callable=AsyncMock) as mock_translate,
+    ):
+        mock_detect.return_value = TranslationDirection.EN_TO_ZH
+        mock_translate.return_value = ["你好。", "世界。"]
+        result = await service.translate_document(docx_content, "test.docx")
+
+    docx_bytes, _ = service.export_translation(result, ExportLayout.INLINE)
+    texts = [p.text for p in Document(BytesIO(docx_bytes)).paragraphs]
+    assert texts == ["Hello.", "你好。", "World.", "世界。"]
+
+
+def test_export_inline_requires_docx_upload(service):
+    result = TranslationResult(filename="paper.pdf", paragraphs=[])
+    service._store.save(result)
+    with pytest.raises(InputValidationError):
+        service.export_translation(result, ExportLayout.INLINE)
+
+
+@pytest.mark.asyncio
+async def test_translation_starts_before_parsing_finishes(service):
+    import threading
+
+    from src.services.document_parser import ParsedParagraph
+
+    first_group_translated = threading.Event()
+
+    def _iter_parse(_content, _filename):
+        yield ParsedParagraph(text="Chapter one", style=ParagraphStyle.HEADING_1)
+        for i in range(5):
+            yield ParsedParagraph(text=f"Page one text {i}.", style=ParagraphStyle.NORMAL)
+        yield ParsedParagraph(text="Chapter two", style=ParagraphStyle.HEADING_1)
+        # The rest of the document is only parsed once translation has begun.
+        assert first_group_translated.wait(timeout=5)
+        yield ParsedParagraph(text="Page two text.", style=ParagraphStyle.NORMAL)
+
+    async def _translate(texts, on_item=None):
+        first_group_translated.set()
+        return [f"譯:{t}" for t in texts]
+
+    with (
+        patch.object(service, "_parser") as mock_parser,
+        patch(_DETECT_LANG, new_callable=AsyncMock) as mock_detect,
+        patch(_BATCH_TRANSLATE, side_effect=_translate),
+    ):
+        mock_parser.iter_parse.side_effect = _iter_parse
+        mock_detect.return_value = TranslationDirection.EN_TO_ZH
+        result = await asyncio.wait_for(
+            service.translate_document(b"fake", "test.pdf"), timeout=10
+        )
+
+    assert [p.translated for p in result.paragraphs] == [
+        "譯:Chapter one",
+        *[f"譯:Page one text {i}." for i in range(5)],
+        "譯:Chapter two",
+        "譯:Page two text.",
+    ]
+
+
+def _usage(prompt: int, completion: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        prompt_tokens=prompt,
+        completion_tokens=completion,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=0),
+    )
+
+
+def _mock_client() -> AsyncMock:
+    client = AsyncMock()
+    client.beta.chat.completions.parse.return_value = SimpleNamespace(
+        choices=[
+            SimpleNamespace(message=SimpleNamespace(parsed=SimpleNamespace(language="en")))
+        ],
+        usage=_usage(20, 2),
+    )
+    client.chat.completions.create.return_value = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content="<<<1>>> 你好。"))],
+        usage=_usage(100, 30),
+    )
+    return client
+
+
+@pytest.mark.asyncio
+async def test_translate_document_records_token_usage(service):
+    service._openai_client = _mock_client()
+    result = await service.translate_document(_make_docx(["Hello."]), "test.docx")
+
+    expected = TokenUsage(prompt_tokens=120, completion_tokens=32)
+    assert result.usage == expected
+    assert service.get_translation(str(result.id)).usage == expected
+    assert service.list_translations()[0].usage == expected
+    assert service.usage_report(days=1).total == expected
+
+
+@pytest.mark.asyncio
+async def test_translate_document_stops_at_document_token_budget(tmp_path):
+    service = TranslationService(
+        storage_dir=tmp_path,
+        openai_api_key="test-key",
+        openai_model="gpt-4o-mini",
+        document_token_budget=40,
+    )
+    service._openai_client = _mock_client()
+    with pytest.raises(TokenBudgetExceededError):
+        await service.translate_document(_make_docx(["Hello."]), "test.docx")
+
+    service._openai_client.chat.completions.create.assert_not_called()
+    assert service.list_translations() == []
+    # The detection call that did run is still accounted for.
+    assert service.usage_report(days=1).total.total_tokens == 22
+
+
+@pytest.mark.asyncio
+async def test_groups_are_routed_by_size_and_upgraded_on_request(tmp_path):
+    service = TranslationService(
+        storage_dir=tmp_path,
+        openai_api_key="test-key",
+        openai_model="main",
+        openai_fast_model="fast",
+        fast_model_max_tokens=20,
+    )
+    long_text = " ".join(["word"] * 20) + "."
+    docx_content = _make_docx(["Short line.", "Title", long_text])
+
+    def _translate(strategy_self, texts, on_item=None):
+        return [f"{strategy_self.model}:{t}" for t in texts]
+
+    with (
+        patch(_DETECT_LANG, new_callable=AsyncMock) as mock_detect,
+        patch(_BATCH_TRANSLATE, autospec=True, side_effect=_translate),
+    ):
+        mock_detect.return_value = TranslationDirection.EN_TO_ZH
+        result = await service.translate_document(docx_content, "test.docx")
+
+    # All three are NORMAL and grouped together, over the fast-model limit.
+    assert [p.model for p in result.paragraphs] == ["main", "main", "main"]
+
+    stored = result.model_copy(deep=True)
+    stored.paragraphs[0].model = "fast"
+    stored.paragraphs[0].translated = "fast:Short line."
+    service._store.save(stored)
+
+    with patch(_BATCH_TRANSLATE, autospec=True, side_effect=_translate) as mock_translate:
+        upgraded = await service.retranslate(str(result.id), upgrade=True)
+
+    mock_translate.assert_called_once()
+    assert mock_translate.call_args.args[1] == ["Short line."]
+    assert upgraded.paragraphs[0].model == "main"
+    assert upgraded.paragraphs[0].translated == "main:Short line."
+    assert upgraded.paragraphs[1:] == result.paragraphs[1:]
+
+
+@pytest.mark.asyncio
+async def test_repeated_table_cells_are_translated_once(service):
+    from src.services.document_parser import ParsedParagraph
+
+    table = (
+        "<table><tr><th>Year</th><th>Unit</th><th>Result</th></tr>"
+        "<tr><td>2021</td><td>mm &amp; kg</td><td>N/A</td></tr>"
+        "<tr><td>2022</td><td>mm &amp; kg</td><td>N/A</td></tr></table>"
+    )
+    parsed = [
+        ParsedParagraph(text="Result", style=ParagraphStyle.NORMAL),
+        ParsedParagraph(text=table, style=ParagraphStyle.TABLE),
+    ]
+
+    async def _translate(texts, on_item=None):
+        return [f"<{t}>" for t in texts]
+
+    with (
+        patch.object(service, "_parser") as mock_parser,
+        patch(_DETECT_LANG, new_callable=AsyncMock) as mock_detect,
+        patch(_BATCH_TRANSLATE, side_effect=_translate) as mock_translate,
+    ):
+        mock_parser.iter_parse.return_value = iter(parsed)
+        mock_detect.return_value = TranslationDirection.EN_TO_ZH
+        result = await service.translate_document(b"fake", "test.pdf")
+
+    mock_translate.assert_called_once()
+    assert mock_translate.call_args.args[0] == ["Result", "Year", "Unit", "mm & kg", "N/A"]
+    assert result.paragraphs[1].translated == (
+        "<table><tr><th>&lt;Year&gt;</th><th>&lt;Unit&gt;</th><th>&lt;Result&gt;</th></tr>"
+        "<tr><td>2021</td><td>&lt;mm &amp; kg&gt;</td><td>&lt;N/A&gt;</td></tr>"
+        "<tr><td>2022</td><td>&lt;mm &amp; kg&gt;</td><td>&lt;N/A&gt;</td></tr></table>"
+    )
+    assert result.paragraphs[1].original == table
+
+
+@pytest.mark.asyncio
+async def test_resubmitted_document_resumes_from_checkpoint(service, tmp_path):
+    doc = Document()
+    doc.add_paragraph("Introduction paragraph.")
+    doc.add_heading("Methods", level=1)
+    doc.add_paragraph("Method details here.")
+    buf = BytesIO()
+    doc.save(buf)
+    content = buf.getvalue()
+    answers = {
+        "Introduction paragraph.": "介紹段落。",
+        "Methods": "方法",
+        "Method details here.": "方法細節在此。",
+    }
+    sent: list[list[str]] = []
+
+    async def crash_on_last_group(texts, on_item=None):
+        if texts == ["Method details here."]:
+            # Let the other groups finish first, as a worker killed mid-run.
+            await asyncio.sleep(0.01)
+            raise RuntimeError("worker killed")
+        return [answers[t] for t in texts]
+
+    async def translate(texts, on_item=None):
+        sent.append(texts)
+        return [answers[t] for t in texts]
+
+    with (
+        patch(_DETECT_LANG, new_callable=AsyncMock) as mock_detect,
+        patch(_BATCH_TRANSLATE, side_effect=crash_on_last_group),
+    ):
+        mock_detect.return_value = TranslationDirection.EN_TO_ZH
+        with pytest.raises(RuntimeError):
+            await service.translate_document(content, "test.docx")
+
+    with (
+        patch(_DETECT_LANG, new_callable=AsyncMock) as mock_detect,
+        patch(_BATCH_TRANSLATE, side_effect=translate),
+    ):
+        result = await service.translate_document(content, "test.docx")
+
+    mock_detect.assert_not_called()
+    assert sent == [["Method details here."]]
+    assert result.direction == TranslationDirection.EN_TO_ZH
+    assert [p.translated for p in result.paragraphs] == list(answers.values())
+    assert list((tmp_path / "checkpoints").iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_failed_groups_are_flagged_and_retried_on_request(service):
+    doc = Document()
+    doc.add_paragraph("Introduction paragraph.")
+    doc.add_heading("Methods", level=1)
+    doc.add_paragraph("Method details here.")
+    buf = BytesIO()
+    doc.save(buf)
+    answers = {
+        "Introduction paragraph.": "介紹段落。",
+        "Methods": "方法",
+        "Method details here.": "方法細節在此。",
+    }
+    sent: list[list[str]] = []
+
+    async def time_out_on_methods(texts, on_item=None):
+        if texts == ["Methods"]:
+            raise TimeoutError()
+        return [answers[t] for t in texts]
+
+    async def translate(texts, on_item=None):
+        sent.append(texts)
+        return [answers[t] for t in texts]
+
+    with (
+        patch(_DETECT_LANG, new_callable=AsyncMock) as mock_detect,
+        patch(_BATCH_TRANSLATE, side_effect=time_out_on_methods),
+    ):
+        mock_detect.return_value = TranslationDirection.EN_TO_ZH
+        result = await service.translate_document(buf.getvalue(), "test.docx")
+
+    assert [p.failed for p in result.paragraphs] == [False, True, False]
+    assert result.paragraphs[1].translated == ""
+    assert service.get_translation(str(result.id)).paragraphs[1].failed
+
+    with patch(_BATCH_TRANSLATE, side_effect=translate):
+        retried = await service.retranslate(str(result.id), failed_only=True)
+
+    assert sent == [["Methods"]]
+    assert [p.translated for p in retried.paragraphs] == list(answers.values())
+    assert not any(p.failed for p in retried.paragraphs)
+
+
+@pytest.mark.asyncio
+async def test_fatal_errors_still_abort_the_document(service):
+    with (
+        patch(_DETECT_LANG, new_callable=AsyncMock) as mock_detect,
+        patch(_BATCH_TRANSLATE, side_effect=ValueError("bug")),
+    ):
+        mock_detect.return_value = TranslationDirection.EN_TO_ZH
+        with pytest.raises(ValueError):
+            await service.translate_document(_make_docx(["Hello."]), "test.docx")
+    assert service.list_translations() == []
+
+
+def test_plan_replaces_streamed_items_the_final_result_corrects():
+    emitted: list[tuple[int, str]] = []
+    group = [ParsedParagraph(text="Hello.", style=ParagraphStyle.NORMAL)]
+    plan = _DocumentPlan.from_parsed(
+        group, lambda index, p: emitted.append((index, p.translated))
+    )
+    strategy = SimpleNamespace(model_for=lambda _text: "gpt-4o-mini")
+
+    plan.item_callback(group, strategy)(0, "哈囉。")
+    plan.fill(group, ["你好。"], strategy)
+    plan.fill(group, ["你好。"], strategy)
+
+    assert emitted == [(0, "哈囉。"), (0, "你好。")]
+    assert plan.result()[0].translated == "你好。"
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_flags_only_its_own_paragraphs(service):
+    async def second_batch_fails(texts, on_item=None):
+        raise PartialTranslationError(["你好。", None], TimeoutError())
+
+    with (
+        patch(_DETECT_LANG, new_callable=AsyncMock) as mock_detect,
+        patch(_BATCH_TRANSLATE, side_effect=second_batch_fails),
+    ):
+        mock_detect.return_value = TranslationDirection.EN_TO_ZH
+        result = await service.translate_document(
+            _make_docx(["Hello.", "Goodbye."]), "test.docx"
+        )
+
+    assert [p.translated for p in result.paragraphs] == ["你好。", ""]
+    assert [p.failed for p in result.paragraphs] == [False, True]
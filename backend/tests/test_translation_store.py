@@ -1,6 +1,15 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import UTC, datetime
+
 import pytest
 
-from src.core.exceptions import NotFoundError
+from src.core.exceptions import AppException, NotFoundError
 from src.models.translation import TranslatedParagraph, TranslationResult
 from src.services.translation_store import TranslationStore
 
@@ -58,3 +67,369 @@ def test_load_upload_returns_path_and_ext(store, sample_result):
 
 def test_load_upload_returns_none_when_missing(store):
     assert store.load_upload("nonexistent-id") is None
+
+
+def test_save_leaves_no_temp_files(store, sample_result, tmp_path):
+    store.save(sample_result)
+    store.save(sample_result)
+    assert [p.name for p in tmp_path.glob("*.tmp")] == []
+
+
+def test_concurrent_saves_never_expose_partial_files(store, sample_result):
+    store.save(sample_result)
+    stop = threading.Event()
+    errors: list[Exception] = []
+
+    def writer():
+        while not stop.is_set():
+            store.save(sample_result)
+
+    def reader():
+        for _ in range(200):
+            try:
+                store.load(str(sample_result.id))
+                store.list_all()
+            # What a torn or missing file would raise.
+            except (AppException, OSError, ValueError) as exc:  # pragma: no cover
+                errors.append(exc)
+
+    threads = [threading.Thread(target=writer) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    reader()
+    stop.set()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_lock_serializes_access_to_one_id(store):
+    events: list[str] = []
+    first = store.lock("abc")
+    first.acquire()
+
+    def contender():
+        with store.lock("abc"):
+            events.append("second")
+
+    thread = threading.Thread(target=contender)
+    thread.start()
+    time.sleep(0.05)
+    events.append("first")
+    first.release()
+    thread.join()
+    assert events == ["first", "second"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_async_lock_wait_never_takes_the_lock(store):
+    holder = store.lock("abc")
+    holder.acquire()
+    waiter = asyncio.create_task(store.lock("abc").__aenter__())
+    await asyncio.sleep(0.05)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    holder.release()
+
+    # Nothing left behind holds it, so a plain non-blocking attempt succeeds.
+    async with asyncio.timeout(1):
+        async with store.lock("abc"):
+            pass
+
+
+def test_waiter_relocks_after_holder_removes_lock_file(store, tmp_path):
+    holder = store.lock("abc")
+    holder.acquire()
+    acquired = threading.Event()
+    waiter = store.lock("abc")
+
+    def contender():
+        waiter.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=contender)
+    thread.start()
+    time.sleep(0.05)
+    holder.remove()
+    holder.release()
+    assert acquired.wait(1)
+    # The waiter ended up on the live lock file, which excludes newcomers.
+    newcomer = store.lock("abc")
+    assert not newcomer._try_acquire(blocking=False)
+    waiter.release()
+    thread.join()
+
+
+def test_delete_removes_lock_files(store, sample_result, tmp_path):
+    store.save(sample_result)
+    store.save_upload(str(sample_result.id), "test.docx", b"docx")
+    with store.lock(str(sample_result.id)):
+        pass
+
+    store.delete(str(sample_result.id))
+
+    assert list((tmp_path / ".locks").glob(f"{sample_result.id}.lock")) == []
+    assert list((tmp_path / ".locks").glob("sha256-*.lock")) == []
+
+
+def test_list_all_skips_unreadable_files(store, sample_result, tmp_path):
+    store.save(sample_result)
+    (tmp_path / "half-written.json").write_text('{"id": "x", "filen')
+    summaries = store.list_all()
+    assert [s.id for s in summaries] == [sample_result.id]
+
+
+def _write_legacy(tmp_path, result):
+    (tmp_path / f"{result.id}.json").write_text(
+        json.dumps(result.model_dump(mode="json"), ensure_ascii=False, indent=2),
+        encoding="utf-8",
+    )
+
+
+def test_save_uses_compact_sharded_layout(store, sample_result, tmp_path):
+    translation_id = str(sample_result.id)
+    store.save(sample_result)
+    assert (tmp_path / translation_id[:2] / f"{translation_id}.pbt").exists()
+    assert not (tmp_path / f"{translation_id}.json").exists()
+
+
+def test_reads_legacy_json_files(store, sample_result, tmp_path):
+    _write_legacy(tmp_path, sample_result)
+    assert store.load(str(sample_result.id)) == sample_result
+    assert store.list_all()[0].paragraph_count == 2
+
+
+def test_migrate_rewrites_legacy_files(store, sample_result, tmp_path):
+    _write_legacy(tmp_path, sample_result)
+    assert store.migrate() == 1
+    assert not (tmp_path / f"{sample_result.id}.json").exists()
+    assert store.load(str(sample_result.id)) == sample_result
+    assert store.migrate() == 0
+
+
+def test_migrate_keeps_history_in_recency_order(store, sample_result, tmp_path):
+    results = [
+        sample_result.model_copy(
+            update={
+                "id": uuid.uuid4(),
+                "filename": f"doc{n}.docx",
+                "created_at": datetime(2024, 1, 1 + n, tzinfo=UTC),
+            }
+        )
+        for n in range(3)
+    ]
+    for n, result in enumerate(results):
+        _write_legacy(tmp_path, result)
+        stamp = time.time() - 3600 * (3 - n)
+        os.utime(tmp_path / f"{result.id}.json", (stamp, stamp))
+
+    assert store.migrate() == 3
+    assert [s.filename for s in store.list_all()] == ["doc2.docx", "doc1.docx", "doc0.docx"]
+    # Rewritten files keep their age for eviction.
+    oldest = min(store.usage(), key=lambda entry: entry.accessed_at)
+    assert oldest.translation_id == str(results[0].id)
+
+
+def test_delete_removes_legacy_file(store, sample_result, tmp_path):
+    _write_legacy(tmp_path, sample_result)
+    store.delete(str(sample_result.id))
+    with pytest.raises(NotFoundError):
+        store.load(str(sample_result.id))
+
+
+def test_upload_path_is_recorded_in_metadata(store, sample_result, tmp_path):
+    translation_id = str(sample_result.id)
+    upload = store.save_upload(translation_id, "paper.PDF", b"%PDF")
+    store.save(sample_result, upload=upload)
+    digest = hashlib.sha256(b"%PDF").hexdigest()
+    assert upload.path == f"uploads/sha256/{digest[:2]}/{digest}"
+    assert upload.sha256 == digest
+
+    # A later save without an upload (e.g. retranslate) keeps the reference.
+    store.save(sample_result)
+    path, ext = store.load_upload(translation_id)
+    assert (path, ext) == (tmp_path / upload.path, "pdf")
+
+
+def test_delete_removes_recorded_upload(store, sample_result, tmp_path):
+    translation_id = str(sample_result.id)
+    store.save(sample_result)
+    upload = store.save_upload(translation_id, "test.docx", b"docx")
+    store.delete(translation_id)
+    assert not (tmp_path / upload.path).exists()
+    assert store.load_upload(translation_id) is None
+
+
+def test_identical_uploads_are_stored_once(store, sample_result, tmp_path):
+    other = sample_result.model_copy(update={"id": uuid.uuid4()})
+    first_id, second_id = str(sample_result.id), str(other.id)
+    store.save(sample_result)
+    store.save(other)
+    first = store.save_upload(first_id, "paper.pdf", b"%PDF same")
+    second = store.save_upload(second_id, "copy.PDF", b"%PDF same")
+    assert first.path == second.path
+    blobs = [p for p in (tmp_path / "uploads" / "sha256").rglob("*") if p.is_file()]
+    assert len([p for p in blobs if not p.name.endswith(".refs")]) == 1
+
+    store.delete(first_id)
+    assert (tmp_path / second.path).read_bytes() == b"%PDF same"
+
+    store.delete(second_id)
+    assert not (tmp_path / second.path).exists()
+    assert not list((tmp_path / "uploads" / "sha256").rglob("*.refs"))
+
+
+def test_replacing_upload_releases_previous_blob(store, sample_result, tmp_path):
+    translation_id = str(sample_result.id)
+    store.save(sample_result)
+    old = store.save_upload(translation_id, "test.docx", b"old")
+    new = store.save_upload(translation_id, "test.docx", b"new")
+    assert not (tmp_path / old.path).exists()
+    assert store.load_upload(translation_id) == (tmp_path / new.path, "docx")
+
+
+def test_migrate_moves_flat_layout_into_shards(store, sample_result, tmp_path):
+    translation_id = str(sample_result.id)
+    _write_legacy(tmp_path, sample_result)
+    (tmp_path / "uploads" / f"{translation_id}.docx").write_bytes(b"docx")
+
+    assert store.migrate() == 1
+    assert list(tmp_path.glob("*.json")) == []
+    assert list((tmp_path / "uploads").glob("*.docx")) == []
+    assert store.load(translation_id) == sample_result
+    path, ext = store.load_upload(translation_id)
+    assert path.read_bytes() == b"docx"
+    assert ext == "docx"
+
+
+def test_flat_uploads_are_only_found_by_migrate(store, sample_result, tmp_path):
+    translation_id = str(sample_result.id)
+    _write_legacy(tmp_path, sample_result)
+    (tmp_path / "uploads" / f"{translation_id}.docx").write_bytes(b"docx")
+
+    assert store.load_upload(translation_id) is None
+    store.migrate()
+    path, _ = store.load_upload(translation_id)
+    assert path.read_bytes() == b"docx"
+
+
+@pytest.fixture
+def cached_store(tmp_path):
+    return TranslationStore(storage_dir=tmp_path, cache_bytes=1024 * 1024)
+
+
+def test_cached_load_skips_decoding(cached_store, sample_result, monkeypatch):
+    cached_store.save(sample_result)
+    first = cached_store.load(str(sample_result.id))
+
+    def _fail(_blob):
+        raise AssertionError("decoded a cached translation")
+
+    monkeypatch.setattr("src.services.translation_store.decode_result", _fail)
+    assert cached_store.load(str(sample_result.id)) is first
+
+
+def test_save_and_delete_invalidate_cache(cached_store, sample_result):
+    translation_id = str(sample_result.id)
+    cached_store.save(sample_result)
+    cached_store.load(translation_id)
+
+    updated = sample_result.model_copy(update={"filename": "renamed.docx"})
+    cached_store.save(updated)
+    assert cached_store.load(translation_id).filename == "renamed.docx"
+
+    cached_store.delete(translation_id)
+    with pytest.raises(NotFoundError):
+        cached_store.load(translation_id)
+
+
+def test_cache_sees_writes_from_other_workers(cached_store, sample_result, tmp_path):
+    translation_id = str(sample_result.id)
+    cached_store.save(sample_result)
+    cached_store.load(translation_id)
+
+    other_worker = TranslationStore(storage_dir=tmp_path)
+    other_worker.save(sample_result.model_copy(update={"filename": "other.docx"}))
+    assert cached_store.load(translation_id).filename == "other.docx"
+
+
+def test_save_writes_response_files_named_by_etag(store, sample_result):
+    translation_id = str(sample_result.id)
+    store.save(sample_result)
+    response = store.load_response(translation_id)
+    assert response is not None
+    body = response.variants["identity"].read_bytes()
+    assert TranslationResult.model_validate_json(body) == sample_result
+    assert response.etag == hashlib.sha256(body).hexdigest()[:32]
+    assert "gzip" in response.variants
+
+    updated = sample_result.model_copy(update={"filename": "renamed.docx"})
+    store.save(updated)
+    new_response = store.load_response(translation_id)
+    assert new_response.etag != response.etag
+    # A request that looked up the previous version can still send it.
+    assert all(path.exists() for path in response.variants.values())
+
+    store.save(updated.model_copy(update={"filename": "again.docx"}))
+    assert not any(path.exists() for path in response.variants.values())
+    assert all(path.exists() for path in new_response.variants.values())
+
+    store.delete(translation_id)
+    assert not any(path.exists() for path in new_response.variants.values())
+
+
+def test_previous_response_files_expire_after_grace_period(store, sample_result):
+    translation_id = str(sample_result.id)
+    store.save(sample_result)
+    previous = store.load_response(translation_id)
+    store.save(sample_result.model_copy(update={"filename": "renamed.docx"}))
+
+    # Retired just now, so still inside the grace period.
+    store.remove_orphans(older_than=time.time() - 60)
+    assert all(path.exists() for path in previous.variants.values())
+
+    store.remove_orphans(older_than=time.time() + 1)
+    assert not any(path.exists() for path in previous.variants.values())
+    assert store.load_response(translation_id) is not None
+
+
+def test_migrate_adds_missing_responses(store, sample_result):
+    translation_id = str(sample_result.id)
+    store.save(sample_result)
+    for path in store.load_response(translation_id).variants.values():
+        path.unlink()
+    assert store.load_response(translation_id) is None
+
+    assert store.migrate() == 1
+    assert store.load_response(translation_id) is not None
+    assert store.migrate() == 0
+
+
+def test_changes_report_saves_and_deletes_after_a_revision(store, sample_result):
+    other = sample_result.model_copy(update={"id": uuid.uuid4(), "filename": "b.docx"})
+    store.save(sample_result)
+    start = store.revision
+
+    store.save(other)
+    store.save(sample_result.model_copy(update={"filename": "renamed.docx"}))
+    changes = store.changes(start)
+
+    assert changes.revision == start + 2
+    assert [s.id for s in changes.created] == [other.id]
+    assert [s.filename for s in changes.updated] == ["renamed.docx"]
+    assert changes.deleted == []
+    assert not changes.reset
+
+    store.delete(str(other.id))
+    changes = store.changes(changes.revision)
+    assert changes.deleted == [other.id]
+    assert changes.created == changes.updated == []
+
+
+def test_changes_since_zero_or_unknown_revision_resets(store, sample_result):
+    store.save(sample_result)
+    for since in (0, store.revision + 5):
+        changes = store.changes(since)
+        assert changes.reset
+        assert [s.id for s in changes.created] == [sample_result.id]
@@ -1,9 +1,18 @@
+import asyncio
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
 from src.models.translation import TranslationDirection
-from src.services.translation_strategy import BatchTranslationStrategy
+from src.services.hedging import RequestHedger
+from src.services.retry_policy import RetryPolicy
+from src.services.token_usage import UsageMeter
+from src.services.translation_strategy import (
+    BatchTranslationStrategy,
+    PartialTranslationError,
+    _NumberedStreamParser,
+    detect_language,
+)
 
 
 @pytest.fixture
@@ -94,3 +103,201 @@ async def test_batch_translate_zh_to_en(mock_openai_client):
     call_args = mock_openai_client.chat.completions.create.call_args
     system_content = call_args.kwargs["messages"][0]["content"]
     assert "Chinese to English" in system_content
+
+
+@pytest.mark.asyncio
+async def test_batch_translate_routes_calls_through_hedger(mock_openai_client):
+    mock_openai_client.chat.completions.create.return_value = (
+        _make_completion_response("<<<1>>> 你好")
+    )
+    hedger = RequestHedger(min_samples=1)
+    strategy = BatchTranslationStrategy(
+        client=mock_openai_client, model="gpt-4o-mini", hedger=hedger
+    )
+    result = await strategy.translate(["Hello"])
+    assert result == ["你好"]
+    assert hedger.hedge_delay("gpt-4o-mini") is not None
+    assert hedger.hedge_delay() is None
+
+
+@pytest.mark.asyncio
+async def test_hedged_call_meters_the_losing_request_too(mock_openai_client):
+    hedge_sent = asyncio.Event()
+
+    async def create(**_kwargs):
+        # The primary waits for the hedge, which returns at once; both then
+        # finish before the hedger looks at either.
+        if mock_openai_client.chat.completions.create.await_count == 1:
+            await hedge_sent.wait()
+        else:
+            hedge_sent.set()
+        response = _make_completion_response("<<<1>>> 你好")
+        response.usage = {"prompt_tokens": 10, "completion_tokens": 5}
+        return response
+
+    mock_openai_client.chat.completions.create.side_effect = create
+    hedger = RequestHedger(min_samples=1, min_delay=0.01, budget_ratio=1.0)
+    hedger.record(0.01, "gpt-4o-mini")
+    meter = UsageMeter("doc")
+    strategy = BatchTranslationStrategy(
+        client=mock_openai_client, model="gpt-4o-mini", hedger=hedger, meter=meter
+    )
+
+    assert await strategy.translate(["Hello"]) == ["你好"]
+    assert hedger.hedges_sent == 1
+    assert meter.usage.total_tokens == 30
+
+
+def _make_stream(deltas: list[str]):
+    async def _stream():
+        for delta in deltas:
+            chunk = MagicMock()
+            chunk.choices = [MagicMock()]
+            chunk.choices[0].delta.content = delta
+            yield chunk
+
+    return _stream()
+
+
+def test_stream_parser_emits_item_once_successor_marker_arrives():
+    parser = _NumberedStreamParser()
+    assert parser.feed("<<<1>>> 你") == []
+    assert parser.feed("好\n<<<") == []
+    assert parser.feed("2>>> 世界") == [(1, "你好")]
+    assert parser.feed("\n<<<3>>> ") == [(2, "世界")]
+
+
+@pytest.mark.asyncio
+async def test_streaming_translate_publishes_items_incrementally(mock_openai_client):
+    published: list[tuple[int, str]] = []
+    deltas = ["<<<1>>> 第", "一\n<<<2>>> 第二", "\n<<<3>>> 第三"]
+
+    async def create(**kwargs):
+        assert kwargs["stream"] is True
+        return _make_stream(deltas)
+
+    mock_openai_client.chat.completions.create.side_effect = create
+    strategy = BatchTranslationStrategy(
+        client=mock_openai_client, model="gpt-4o-mini", stream=True
+    )
+    result = await strategy.translate(
+        ["First", "Second", "Third"],
+        on_item=lambda index, text: published.append((index, text)),
+    )
+    assert result == ["第一", "第二", "第三"]
+    assert published == [(0, "第一"), (1, "第二"), (2, "第三")]
+
+
+@pytest.mark.asyncio
+async def test_hedged_stream_publishes_the_winners_items(mock_openai_client):
+    async def stalled():
+        for delta in ["<<<1>>> 慢一\n<<<2>>> 慢"]:
+            chunk = MagicMock()
+            chunk.choices = [MagicMock()]
+            chunk.choices[0].delta.content = delta
+            yield chunk
+        await asyncio.sleep(10)
+
+    responses = [stalled(), _make_stream(["<<<1>>> 快一\n<<<2>>> 快二"])]
+
+    async def create(**_kwargs):
+        return responses.pop(0)
+
+    mock_openai_client.chat.completions.create.side_effect = create
+    hedger = RequestHedger(min_samples=1, min_delay=0.01, budget_ratio=1.0)
+    hedger.record(0.01, "gpt-4o-mini")
+    strategy = BatchTranslationStrategy(
+        client=mock_openai_client, model="gpt-4o-mini", stream=True, hedger=hedger
+    )
+    published: dict[int, str] = {}
+
+    result = await strategy.translate(["One", "Two"], on_item=published.__setitem__)
+
+    assert hedger.hedges_sent == 1
+    assert result == ["快一", "快二"]
+    # The slow attempt's streamed item was replaced by the winner's.
+    assert published == {0: "快一", 1: "快二"}
+
+
+@pytest.mark.asyncio
+async def test_on_item_indexes_are_offset_per_batch(mock_openai_client):
+    mock_openai_client.chat.completions.create.side_effect = [
+        _make_completion_response("<<<1>>> 第一\n<<<2>>> 第二"),
+        _make_completion_response("<<<1>>> 第三"),
+    ]
+    published: dict[int, str] = {}
+    strategy = BatchTranslationStrategy(
+        client=mock_openai_client, model="gpt-4o-mini", batch_size=2
+    )
+    await strategy.translate(
+        ["First", "Second", "Third"], on_item=published.__setitem__
+    )
+    assert published == {0: "第一", 1: "第二", 2: "第三"}
+
+
+@pytest.mark.asyncio
+async def test_missing_items_are_repaired_with_repair_model(mock_openai_client):
+    mock_openai_client.chat.completions.create.side_effect = [
+        _make_completion_response("<<<1>>> 你好"),
+        _make_completion_response("<<<1>>> 世界"),
+    ]
+    strategy = BatchTranslationStrategy(
+        client=mock_openai_client, model="main", repair_model="fast"
+    )
+    result = await strategy.translate(["Hello", "World"])
+
+    assert result == ["你好", "世界"]
+    calls = mock_openai_client.chat.completions.create.call_args_list
+    assert [c.kwargs["model"] for c in calls] == ["main", "fast"]
+    assert strategy.model_for("Hello") == "main"
+    assert strategy.model_for("World") == "fast"
+
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_retried_by_the_policy(mock_openai_client):
+    mock_openai_client.chat.completions.create.side_effect = [
+        TimeoutError(),
+        _make_completion_response("<<<1>>> 你好"),
+    ]
+    strategy = BatchTranslationStrategy(
+        client=mock_openai_client,
+        model="gpt-4o-mini",
+        retry=RetryPolicy(retries=1, base_delay=0),
+    )
+    assert await strategy.translate(["Hello"]) == ["你好"]
+    assert mock_openai_client.chat.completions.create.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_keeps_its_siblings_results(mock_openai_client):
+    mock_openai_client.chat.completions.create.side_effect = [
+        _make_completion_response("<<<1>>> 第一\n<<<2>>> 第二"),
+        TimeoutError(),
+    ]
+    strategy = BatchTranslationStrategy(
+        client=mock_openai_client, model="gpt-4o-mini", batch_size=2
+    )
+    with pytest.raises(PartialTranslationError) as raised:
+        await strategy.translate(["First", "Second", "Third"])
+    assert raised.value.translated == ["第一", "第二", None]
+    assert isinstance(raised.value.cause, TimeoutError)
+
+
+@pytest.mark.asyncio
+async def test_language_detection_is_retried_by_the_policy(mock_openai_client):
+    detected = MagicMock()
+    detected.choices = [MagicMock()]
+    detected.choices[0].message.parsed.language = "zh"
+    detected.usage = None
+    mock_openai_client.beta.chat.completions.parse.side_effect = [
+        TimeoutError(),
+        detected,
+    ]
+    direction = await detect_language(
+        mock_openai_client,
+        "gpt-4o-mini",
+        ["你好"],
+        retry=RetryPolicy(retries=1, base_delay=0),
+    )
+    assert direction == TranslationDirection.ZH_TO_EN
+    assert mock_openai_client.beta.chat.completions.parse.await_count == 2
@@ -104,3 +104,30 @@ def test_export_bilingual_skips_figure_and_table():
     assert len(table.rows) == 3
     assert table.rows[1].cells[0].text == "Hello"
     assert table.rows[2].cells[0].text == "World"
+
+
+def test_export_translated_table_as_nested_tables():
+    result = _make_result(
+        paragraphs=[
+            TranslatedParagraph(
+                original=(
+                    '<table><tr><th colspan="2">Size</th></tr>'
+                    "<tr><td>Width</td><td>3 mm</td></tr></table>"
+                ),
+                translated=(
+                    '<table><tr><th colspan="2">尺寸</th></tr>'
+                    "<tr><td>寬度</td><td>3 mm</td></tr></table>"
+                ),
+                style=ParagraphStyle.TABLE,
+            ),
+        ],
+    )
+    docx_bytes = WordExporter().export(result)
+
+    doc = Document(BytesIO(docx_bytes))
+    row = doc.tables[0].rows[1]
+    original, translated = (cell.tables[0] for cell in row.cells)
+    assert original.cell(0, 0).text == "Size"
+    assert original.cell(1, 0).text == "Width"
+    assert translated.cell(0, 1).text == "尺寸"
+    assert [c.text for c in translated.rows[1].cells] == ["寬度", "3 mm"]
@@ -1,5 +1,5 @@
 import { useEffect, useState } from "react"
-import { ArrowUp, Download, RefreshCw } from "lucide-react"
+import { ArrowUp, Download, RefreshCw, RotateCcw } from "lucide-react"
 import { Button } from "@/components/ui/button"
 import { FontSizeControl } from "@/components/FontSizeControl"
 import { useRetranslate } from "@/hooks/queries/use-retranslate"
@@ -48,6 +48,10 @@ function getTopSpacing(style: ParagraphStyle, index: number, prevIsNormal: boole
   return "pt-4"
 }
 
+function FailedNote() {
+  return <span className="text-xs text-destructive">翻譯失敗</span>
+}
+
 function useShowScrollTop(threshold = 300) {
   const [show, setShow] = useState(false)
   useEffect(() => {
@@ -63,6 +67,8 @@ function useShowScrollTop(threshold = 300) {
 export function TranslationView({ result }: Props) {
   const retranslate = useRetranslate()
   const showScrollTop = useShowScrollTop()
+  const failedCount = result.paragraphs.filter((p) => p.failed).length
+  const retryingFailed = retranslate.isPending && !!retranslate.variables?.failedOnly
 
   return (
     <div>
@@ -80,11 +86,24 @@ export function TranslationView({ result }: Props) {
             variant="ghost"
             size="sm"
             disabled={retranslate.isPending}
-            onClick={() => retranslate.mutate(result.id)}
+            onClick={() => retranslate.mutate({ id: result.id })}
           >
-            <RefreshCw className={retranslate.isPending ? "animate-spin" : ""} />
-            {retranslate.isPending ? "重翻中..." : "重翻"}
+            <RefreshCw
+              className={retranslate.isPending && !retryingFailed ? "animate-spin" : ""}
+            />
+            {retranslate.isPending && !retryingFailed ? "重翻中..." : "重翻"}
           </Button>
+          {failedCount > 0 && (
+            <Button
+              variant="ghost"
+              size="sm"
+              disabled={retranslate.isPending}
+              onClick={() => retranslate.mutate({ id: result.id, failedOnly: true })}
+            >
+              <RotateCcw className={retryingFailed ? "animate-spin" : ""} />
+              {retryingFailed ? "重試中..." : `重試失敗段落 (${failedCount})`}
+            </Button>
+          )}
           <Button variant="ghost" size="sm" asChild>
             <a href={getDownloadUrl(result.id)} download>
               <Download />
@@ -122,13 +141,19 @@ export function TranslationView({ result }: Props) {
                 >
                   <div className="px-3 py-1.5 text-xs text-muted-foreground font-medium">
                     {p.style === "figure" ? "Figure" : "Table"}
+                    {p.failed && <> &middot; <FailedNote /></>}
                   </div>
                   {p.style === "table" ? (
-                    <div
-                      className="px-3 pb-3 text-sm leading-relaxed overflow-x-auto [&_table]:w-full [&_table]:border-collapse [&_td]:border [&_td]:border-border/40 [&_td]:px-2 [&_td]:py-1 [&_td]:text-xs [&_th]:border [&_th]:border-border/40 [&_th]:px-2 [&_th]:py-1 [&_th]:text-xs [&_th]:font-medium"
-                      style={{ fontSize }}
-                      dangerouslySetInnerHTML={{ __html: p.original }}
-                    />
+                    <div className={p.translated ? "grid grid-cols-2 gap-x-8" : undefined}>
+                      {[p.original, p.translated].filter(Boolean).map((html, side) => (
+                        <div
+                          key={side}
+                          className="px-3 pb-3 text-sm leading-relaxed overflow-x-auto [&_table]:w-full [&_table]:border-collapse [&_td]:border [&_td]:border-border/40 [&_td]:px-2 [&_td]:py-1 [&_td]:text-xs [&_th]:border [&_th]:border-border/40 [&_th]:px-2 [&_th]:py-1 [&_th]:text-xs [&_th]:font-medium"
+                          style={{ fontSize }}
+                          dangerouslySetInnerHTML={{ __html: html }}
+                        />
+                      ))}
+                    </div>
                   ) : p.image ? (
                     <div className="px-3 pb-3">
                       <img
@@ -159,7 +184,7 @@ export function TranslationView({ result }: Props) {
                     {p.original}
                   </div>
                   <div className={`px-1 pb-2 leading-relaxed ${weight}`} style={{ fontSize }}>
-                    {p.translated}
+                    {p.failed ? <FailedNote /> : p.translated}
                   </div>
                 </div>
               )
@@ -174,7 +199,7 @@ export function TranslationView({ result }: Props) {
                   {p.original}
                 </div>
                 <div className={`px-1 py-2 leading-relaxed ${weight}`} style={{ fontSize }}>
-                  {p.translated}
+                  {p.failed ? <FailedNote /> : p.translated}
                 </div>
               </div>
             )
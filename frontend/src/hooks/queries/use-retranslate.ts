@@ -6,7 +6,7 @@ export function useRetranslate() {
   const queryClient = useQueryClient()
   return useMutation({
     mutationFn: retranslateDocument,
-    onSettled: (_data, _error, id) => {
+    onSettled: (_data, _error, { id }) => {
       queryClient.invalidateQueries({ queryKey: translationKeys.detail(id) })
       queryClient.invalidateQueries({ queryKey: translationKeys.lists() })
     },
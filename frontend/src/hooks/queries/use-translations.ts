@@ -1,11 +1,45 @@
-import { useQuery } from "@tanstack/react-query"
-import { fetchTranslations, fetchTranslation } from "@/lib/api"
+import { useQuery, useQueryClient } from "@tanstack/react-query"
+import { fetchTranslationChanges, fetchTranslation } from "@/lib/api"
+import type { TranslationChanges, TranslationSummary } from "@/lib/api"
 import { translationKeys } from "./translation-keys"
 
+interface TranslationList {
+  revision: number
+  items: TranslationSummary[]
+}
+
+function applyChanges(
+  list: TranslationList | undefined,
+  changes: TranslationChanges,
+): TranslationList {
+  if (!list || changes.reset) {
+    return { revision: changes.revision, items: changes.created }
+  }
+  const changed = [...changes.created, ...changes.updated]
+  const stale = new Set([...changes.deleted, ...changed.map((s) => s.id)])
+  // Changed entries move to the top, as in the server's newest-first order.
+  return {
+    revision: changes.revision,
+    items: [...changed, ...list.items.filter((s) => !stale.has(s.id))],
+  }
+}
+
+function selectItems(list: TranslationList): TranslationSummary[] {
+  return list.items
+}
+
 export function useTranslations() {
+  const queryClient = useQueryClient()
   return useQuery({
     queryKey: translationKeys.lists(),
-    queryFn: fetchTranslations,
+    queryFn: async () => {
+      const current = queryClient.getQueryData<TranslationList>(
+        translationKeys.lists(),
+      )
+      const changes = await fetchTranslationChanges(current?.revision ?? 0)
+      return applyChanges(current, changes)
+    },
+    select: selectItems,
   })
 }
 
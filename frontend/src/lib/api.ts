@@ -16,6 +16,7 @@ export interface TranslatedParagraph {
   translated: string
   style: ParagraphStyle
   image: string | null
+  failed: boolean
 }
 
 export type TranslationDirection = "en_to_zh" | "zh_to_en"
@@ -49,8 +50,18 @@ export async function uploadDocument(file: File): Promise<TranslationResult> {
   return res.json()
 }
 
-export async function fetchTranslations(): Promise<TranslationSummary[]> {
-  const res = await fetch(`${BASE_URL}/translations`)
+export interface TranslationChanges {
+  revision: number
+  created: TranslationSummary[]
+  updated: TranslationSummary[]
+  deleted: string[]
+  reset: boolean
+}
+
+export async function fetchTranslationChanges(
+  since: number,
+): Promise<TranslationChanges> {
+  const res = await fetch(`${BASE_URL}/translations/changes?since=${since}`)
   if (!res.ok) throw new Error("Failed to fetch translations")
   return res.json()
 }
@@ -70,10 +81,18 @@ export async function deleteTranslation(id: string): Promise<void> {
   if (!res.ok) throw new Error("Failed to delete translation")
 }
 
-export async function retranslateDocument(
-  id: string,
-): Promise<TranslationResult> {
-  const res = await fetch(`${BASE_URL}/translations/${id}/retranslate`, {
+export interface RetranslateRequest {
+  id: string
+  /** Only redo paragraphs whose translation failed. */
+  failedOnly?: boolean
+}
+
+export async function retranslateDocument({
+  id,
+  failedOnly = false,
+}: RetranslateRequest): Promise<TranslationResult> {
+  const query = failedOnly ? "?failed_only=true" : ""
+  const res = await fetch(`${BASE_URL}/translations/${id}/retranslate${query}`, {
     method: "POST",
   })
   if (!res.ok) {